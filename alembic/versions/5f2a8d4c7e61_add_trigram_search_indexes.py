@@ -0,0 +1,33 @@
+"""Add trigram search indexes
+
+Revision ID: 5f2a8d4c7e61
+Revises: 3b7e9c1d5a24
+Create Date: 2025-04-23 19:46:05.104388
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import fastapi_users_db_sqlalchemy
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2a8d4c7e61'
+down_revision: Union[str, None] = '3b7e9c1d5a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_todos_content_trgm', 'todos', ['content'], unique=False, postgresql_using='gin', postgresql_ops={'content': 'gin_trgm_ops'})
+    op.create_index('ix_reminders_message_trgm', 'reminders', ['message'], unique=False, postgresql_using='gin', postgresql_ops={'message': 'gin_trgm_ops'})
+    op.create_index('ix_tags_name_trgm', 'tags', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tags_name_trgm', table_name='tags', postgresql_using='gin')
+    op.drop_index('ix_reminders_message_trgm', table_name='reminders', postgresql_using='gin')
+    op.drop_index('ix_todos_content_trgm', table_name='todos', postgresql_using='gin')
+    # pg_trgm 扩展可能被其他对象使用，降级时保留
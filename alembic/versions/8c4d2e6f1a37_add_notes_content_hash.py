@@ -0,0 +1,55 @@
+"""Add notes content hash
+
+Revision ID: 8c4d2e6f1a37
+Revises: 5f2a8d4c7e61
+Create Date: 2025-04-24 20:41:09.237514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import fastapi_users_db_sqlalchemy
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4d2e6f1a37'
+down_revision: Union[str, None] = '5f2a8d4c7e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# 与 Note.hash_content 一致：content 的 UTF-8 字节做 SHA-256，再转为十六进制
+CONTENT_HASH_SQL = "encode(sha256(convert_to(content, 'UTF8')), 'hex')"
+
+
+def upgrade() -> None:
+    op.add_column('notes', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    # 按 id 区间分批回填，每批单独提交，避免一次长事务锁住整张表
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        max_id = conn.execute(sa.text("SELECT coalesce(max(id), 0) FROM notes")).scalar()
+        for lower in range(0, max_id, BACKFILL_BATCH_SIZE):
+            conn.execute(
+                sa.text(
+                    f"UPDATE notes SET content_hash = {CONTENT_HASH_SQL} "
+                    "WHERE id > :lower AND id <= :upper AND content_hash IS NULL"
+                ),
+                {"lower": lower, "upper": lower + BACKFILL_BATCH_SIZE},
+            )
+        # 回填期间新写入的笔记
+        conn.execute(sa.text(
+            f"UPDATE notes SET content_hash = {CONTENT_HASH_SQL} WHERE content_hash IS NULL"
+        ))
+
+    op.alter_column('notes', 'content_hash', existing_type=sa.String(length=64), nullable=False)
+    op.create_index('ix_notes_user_id_content_hash', 'notes', ['user_id', 'content_hash'], unique=True)
+    op.drop_constraint('_user_content_unique_constraint', 'notes', type_='unique')
+
+
+def downgrade() -> None:
+    op.create_unique_constraint('_user_content_unique_constraint', 'notes', ['user_id', 'content'])
+    op.drop_index('ix_notes_user_id_content_hash', table_name='notes')
+    op.drop_column('notes', 'content_hash')
@@ -0,0 +1,224 @@
+import asyncio
+from datetime import datetime, timezone
+
+from pydantic import BaseModel, ValidationError
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.local_cache import TTLCache
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.core.redis_db import cache_redis
+from app.schemas.schemas import NoteResponse
+
+logger = get_logger(__name__)
+
+
+class CachedNote(BaseModel):
+    version: str | None = None
+    note: NoteResponse
+
+
+class NoteCache:
+    """
+    Read-through cache of fully loaded notes (NoteResponse JSON) keyed by note id.
+    Redis errors are logged and treated as misses, so the cache can never fail a request.
+    Writers invalidate after their commit. Entries carry the version (fingerprint)
+    of the note they were filled under; readers that know the current version
+    skip stale entries, otherwise the TTL bounds their lifetime.
+    """
+
+    def __init__(self, redis: Redis, ttl: int):
+        self.redis = redis
+        self.ttl = ttl
+
+    @staticmethod
+    def key(note_id: int) -> str:
+        return f"note:{note_id}"
+
+    async def get(
+        self, note_id: int, user_id: int | None, version: str | None = None
+    ) -> NoteResponse | None:
+        """
+        Return the cached note if it exists and belongs to `user_id`.
+        Notes of other users count as misses, so the database lookup raises the usual 404.
+        `user_id=None` skips the ownership check, for callers that authorize the
+        read otherwise (public share links check the share code).
+        Given a `version`, entries filled under another version count as misses too.
+        """
+        try:
+            raw = await self.redis.get(self.key(note_id))
+        except RedisError as e:
+            metrics.incr("note_cache.errors")
+            logger.warning(f"Note cache read failed for note {note_id}: {e}")
+            return None
+        if raw is None:
+            metrics.incr("note_cache.misses")
+            return None
+        try:
+            entry = CachedNote.model_validate_json(raw)
+        except ValidationError:
+            entry = None
+        if (
+            entry is None
+            or (user_id is not None and entry.note.user_id != user_id)
+            or (version is not None and entry.version != version)
+        ):
+            metrics.incr("note_cache.misses")
+            return None
+        metrics.incr("note_cache.hits")
+        return entry.note
+
+    async def set(self, note: NoteResponse, version: str | None = None) -> None:
+        entry = CachedNote(version=version, note=note)
+        try:
+            await self.redis.set(
+                self.key(note.id),
+                entry.model_dump_json(exclude={"note": {"share_url"}}),
+                ex=self.ttl,
+            )
+        except RedisError as e:
+            metrics.incr("note_cache.errors")
+            logger.warning(f"Note cache write failed for note {note.id}: {e}")
+
+    async def invalidate(self, *note_ids: int | None) -> None:
+        keys = [self.key(note_id) for note_id in note_ids if note_id is not None]
+        if not keys:
+            return
+        try:
+            await self.redis.delete(*keys)
+            metrics.incr("note_cache.invalidations", len(keys))
+        except RedisError as e:
+            metrics.incr("note_cache.errors")
+            logger.warning(f"Note cache invalidation failed for {keys}: {e}")
+
+
+class ShareCache:
+    """
+    Maps public share codes to note ids; the notes themselves live in `note_cache`,
+    which every write path already invalidates. Unknown or expired codes are cached
+    as a short-lived negative entry holding the 404 detail, so probing random
+    codes does not reach the database.
+    """
+
+    MISSING_PREFIX = "!"
+
+    def __init__(self, redis: Redis, ttl: int, negative_ttl: int):
+        self.redis = redis
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    @staticmethod
+    def key(share_code: str) -> str:
+        return f"share:{share_code}"
+
+    async def get(self, share_code: str) -> int | str | None:
+        """
+        Returns:
+            int | str | None: The note id, the 404 detail of a negatively cached
+            code, or None on a miss.
+        """
+        try:
+            raw = await self.redis.get(self.key(share_code))
+        except RedisError as e:
+            metrics.incr("share_cache.errors")
+            logger.warning(f"Share cache read failed: {e}")
+            return None
+        if raw is None:
+            metrics.incr("share_cache.misses")
+            return None
+        if raw.startswith(self.MISSING_PREFIX):
+            metrics.incr("share_cache.negative_hits")
+            return raw.removeprefix(self.MISSING_PREFIX)
+        metrics.incr("share_cache.hits")
+        return int(raw)
+
+    async def set(self, share_code: str, note_id: int, expires_at: datetime | None) -> None:
+        """Cache a valid share code, never past the moment the share expires."""
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, int((expires_at - datetime.now(timezone.utc)).total_seconds()))
+        if ttl <= 0:
+            return
+        await self._set(share_code, str(note_id), ttl)
+
+    async def set_missing(self, share_code: str, detail: str) -> None:
+        await self._set(share_code, self.MISSING_PREFIX + detail, self.negative_ttl)
+
+    async def invalidate(self, *share_codes: str | None) -> None:
+        keys = [self.key(code) for code in share_codes if code]
+        if not keys:
+            return
+        try:
+            await self.redis.delete(*keys)
+        except RedisError as e:
+            metrics.incr("share_cache.errors")
+            logger.warning(f"Share cache invalidation failed: {e}")
+
+    async def _set(self, share_code: str, value: str, ttl: int) -> None:
+        try:
+            await self.redis.set(self.key(share_code), value, ex=ttl)
+        except RedisError as e:
+            metrics.incr("share_cache.errors")
+            logger.warning(f"Share cache write failed: {e}")
+
+
+note_cache = NoteCache(cache_redis, settings.NOTE_CACHE_TTL)
+share_cache = ShareCache(
+    cache_redis, settings.NOTE_CACHE_TTL, settings.SHARE_NEGATIVE_CACHE_TTL
+)
+# 笔记 id -> 所属用户 id，笔记的所属用户不会改变，只需在删除时失效
+note_owner_cache = TTLCache(
+    "note_owner_cache", settings.NOTE_OWNER_CACHE_SIZE, settings.NOTE_OWNER_CACHE_TTL
+)
+# 已认证用户的列值快照，按用户 id 缓存，省去每个请求一次 SELECT user
+user_cache = TTLCache("user_cache", settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+
+USER_INVALIDATION_CHANNEL = "user_cache:invalidate"
+NOTE_OWNER_INVALIDATION_CHANNEL = "note_owner_cache:invalidate"
+
+# 频道 -> 收到失效消息时要清理的本地缓存
+_INVALIDATION_CHANNELS = {
+    USER_INVALIDATION_CHANNEL: user_cache,
+    NOTE_OWNER_INVALIDATION_CHANNEL: note_owner_cache,
+}
+
+
+async def _publish_invalidation(channel: str, cache: TTLCache, key: int) -> None:
+    cache.invalidate(key)
+    try:
+        await cache_redis.publish(channel, str(key))
+    except RedisError as e:
+        metrics.incr(f"{cache.name}.errors")
+        logger.error(f"Failed to publish {cache.name} invalidation for {key}: {str(e)}")
+
+
+async def invalidate_user(user_id: int) -> None:
+    """Drop a user from the user cache of this process and, via pub/sub, of all others."""
+    await _publish_invalidation(USER_INVALIDATION_CHANNEL, user_cache, user_id)
+
+
+async def invalidate_note_owner(note_id: int) -> None:
+    """Drop a deleted note from the note owner cache of this process and, via pub/sub, of all others."""
+    await _publish_invalidation(NOTE_OWNER_INVALIDATION_CHANNEL, note_owner_cache, note_id)
+
+
+async def listen_cache_invalidations() -> None:
+    """Apply invalidations published by other processes; runs for the lifetime of the app."""
+    while True:
+        try:
+            async with cache_redis.pubsub() as pubsub:
+                await pubsub.subscribe(*_INVALIDATION_CHANNELS)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        cache = _INVALIDATION_CHANNELS[message["channel"]]
+                        cache.invalidate(int(message["data"]))
+        except RedisError as e:
+            # 断线期间可能错过失效消息，清空本地缓存后重新订阅
+            for cache in _INVALIDATION_CHANNELS.values():
+                cache.clear()
+                metrics.incr(f"{cache.name}.errors")
+            logger.error(f"Cache invalidation listener disconnected: {str(e)}")
+            await asyncio.sleep(1)
+
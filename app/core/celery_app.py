@@ -12,7 +12,12 @@ celery_app = Celery(
     "memenote",
     broker=CELERY_BROKER_URL,
     backend=CELERY_RESULT_BACKEND,
-    include=["app.tasks.reminder_task", "app.tasks.mail_task"],
+    include=[
+        "app.tasks.reminder_task",
+        "app.tasks.mail_task",
+        "app.tasks.import_task",
+        "app.tasks.scheduler_task",
+    ],
 )
 
 celery_app.conf.update(
@@ -23,7 +28,17 @@ celery_app.conf.update(
     enable_utc=True,
     result_expires=3600,
     task_routes={"app.tasks.reminder_task.*": {"queue": "reminder_queue"}},
+    beat_schedule={
+        # 到期提醒由数据库轮询触发，不再为每个提醒投递 ETA 任务
+        "trigger-due-reminders": {
+            "task": "app.tasks.scheduler_task.trigger_due_reminders",
+            "schedule": settings.REMINDER_SCHEDULER_INTERVAL,
+            # 积压的扫描没有意义，过期未执行的直接丢弃
+            "options": {"expires": settings.REMINDER_SCHEDULER_INTERVAL},
+        },
+    },
 )
 
 
 # uv run celery -A app.core.celery_app worker --loglevel=info --pool=threads -Q celery,reminder_queue --autoscale=4,2
+# uv run celery -A app.core.celery_app beat --loglevel=info
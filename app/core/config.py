@@ -7,7 +7,11 @@ class Settings(BaseSettings):
     BASE_URL: str = "http://localhost:8000"
     JWT_SECRET: str = "your-jwt-secret"
     JWT_ALGORITHM: str = "HS256"
-    JWT_EXPIRATION: int = 30
+    JWT_EXPIRATION: int = 30  # 访问令牌有效期（分钟）
+    TOKEN_REVOCATION_REFRESH_INTERVAL: float = 2.0  # 拉取其他进程撤销的令牌的间隔（秒）
+    PASSWORD_HASH_WORKERS: int = 2  # 每个进程中计算密码哈希的线程数
+    PASSWORD_HASH_MAX_PENDING: int = 32  # 同时排队和计算中的哈希请求上限
+    PASSWORD_HASH_WAIT_TIMEOUT: float = 5.0  # 超过上限时等待的最长时间（秒），超时返回 503
     DEBUG: bool = False
     
     # PostgreSQL 配置
@@ -24,6 +28,13 @@ class Settings(BaseSettings):
     
     # Redis 配置
     REDIS_HOST: str = "localhost:6379"
+    NOTE_CACHE_TTL: int = 300  # 单条笔记缓存的过期时间（秒）
+    SHARE_NEGATIVE_CACHE_TTL: int = 30  # 无效/过期分享码的缓存时间（秒）
+    SHARE_CACHE_MAX_AGE: int = 60  # 公开分享页允许代理缓存的时间（秒）
+    NOTE_OWNER_CACHE_TTL: int = 30  # 进程内 笔记 -> 所属用户 缓存的过期时间（秒）
+    NOTE_OWNER_CACHE_SIZE: int = 10000  # 进程内 笔记 -> 所属用户 缓存的最大条目数
+    USER_CACHE_TTL: int = 60  # 进程内已认证用户缓存的过期时间（秒）
+    USER_CACHE_SIZE: int = 10000  # 进程内已认证用户缓存的最大条目数
 
     # S3/MinIO 配置
     MINIO_ENDPOINT: str = "localhost:9000"
@@ -31,6 +42,30 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str = "miniosecret"
     MINIO_USE_SSL: bool = False
     MINIO_BUCKET: str = "memenote"
+
+    # 异步任务投递配置
+    TASK_QUEUE_MAXSIZE: int = 10000  # 等待投递到 RabbitMQ 的任务上限，超出则丢弃并计数
+    TASK_PUBLISH_BATCH_SIZE: int = 100  # 每批投递的最大任务数
+    TASK_PUBLISH_MAX_RETRIES: int = 5  # 投递失败后的最大重试次数
+    TASK_PUBLISH_RETRY_DELAY: float = 1.0  # 重试间隔基数（秒），按次数指数增长
+
+    # 事务性发件箱配置
+    OUTBOX_BATCH_SIZE: int = 100  # relay 每个事务领取的消息数
+    OUTBOX_POLL_INTERVAL: float = 1.0  # 没有新消息时的轮询间隔（秒）
+    OUTBOX_RETRY_DELAY: float = 5.0  # 投递失败的消息延后多久再试（秒）
+    OUTBOX_LEASE: float = 60.0  # 领取的消息在投递期间对其他 relay 隐藏的时长（秒），需长于一次投递的超时
+    TASK_DEDUP_TTL: int = 86400  # 消费端记录已处理 task_id 的时长（秒）
+    TASK_DEDUP_PENDING_TTL: int = 300  # 任务执行期间占用 task_id 的时长（秒），需长于任务执行时间
+
+    # 到期提醒调度配置
+    REMINDER_SCHEDULER_INTERVAL: float = 5.0  # celery beat 触发扫描的间隔（秒），也是提醒的最大延迟
+    REMINDER_SCHEDULER_BATCH_SIZE: int = 500  # 每个事务领取的到期提醒数
+    REMINDER_SCHEDULER_MAX_BATCHES: int = 20  # 单次扫描最多处理的批次数，剩余的留给下一次
+    REMINDER_RECONCILE_TIMEOUT: float = 5.0  # 等待各 worker 回复 inspect 的时间（秒）
+
+    # 批量导入配置
+    IMPORT_BATCH_SIZE: int = 1000  # 每个事务处理的输入行数，也是断点续传的粒度
+    IMPORT_STALE_AFTER: float = 600.0  # 等待中或运行中的任务超过该时长（秒）没有进展，视为中断，可以恢复
     
     # Resend 配置
     RESEND_API_KEY: str
@@ -1,4 +1,4 @@
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
@@ -6,6 +6,8 @@ from fastapi_users.db import SQLAlchemyUserDatabase
 
 from app.core.config import settings
 from app.models.models import Base, User, Note, Todo, Reminder
+from app.repository.outbox_repo import enqueue_task
+from app.schemas.schemas import UserRead
 
 
 # 构建数据库 URL
@@ -35,11 +37,37 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Dependency for work that outlives the request handler, such as streamed bodies.
+    The session from get_db is closed before a StreamingResponse starts sending,
+    so the stream opens its own session from this factory.
+    """
+    return SessionLocal
+
+
 # Use Alembic, deprecated
 async def create_db_and_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
         
         
+class UserDatabase(SQLAlchemyUserDatabase[User, int]):
+    async def create(self, create_dict: dict[str, Any]) -> User:
+        """Create a user and queue the welcome email in the same transaction, via the outbox."""
+        user = self.user_table(**create_dict)
+        self.session.add(user)
+        await self.session.flush()
+        await self.session.refresh(user)
+        enqueue_task(
+            self.session,
+            "app.tasks.mail_task.register_email",
+            [UserRead.model_validate(user).model_dump(mode="json")],
+            f"register_email_sent_{user.id}",
+        )
+        await self.session.commit()
+        return user
+
+
 async def get_user_db(session: AsyncSession = Depends(get_db)):
-    yield SQLAlchemyUserDatabase(session, User)
+    yield UserDatabase(session, User)
@@ -1,8 +1,10 @@
 from typing import Annotated
 
 from fastapi import Query, Path, Depends
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import note_owner_cache
 from app.core.database import get_db
 from app.core.user_manage import get_current_user
 # from app.core.security import get_current_user
@@ -13,10 +15,18 @@ from app.core.exceptions import NotFoundException, ForbiddenException
 
 
 async def validate_note(note_id: int, session: AsyncSession, current_user: UserResponse) -> None:
-    note = await session.get(Note, note_id)
-    if note is None:
-        raise NotFoundException(f"Note with id {note_id} not found")
-    if note.user_id != current_user.id:
+    """
+    Check that a note exists and belongs to the current user.
+    Only the owner id is selected, never the note and its relations; known
+    owners are served from a short-lived per-process cache.
+    """
+    owner_id = note_owner_cache.get(note_id)
+    if owner_id is None:
+        owner_id = await session.scalar(select(Note.user_id).where(Note.id == note_id))
+        if owner_id is None:
+            raise NotFoundException(f"Note with id {note_id} not found")
+        note_owner_cache.set(note_id, owner_id)
+    if owner_id != current_user.id:
         raise ForbiddenException("You do not have permission to access this note")
 
 async def get_note_id(
@@ -26,4 +26,18 @@ class ForbiddenException(HTTPException):
     """Base exception for forbidden access errors."""
 
     def __init__(self, detail: str = "Access forbidden"):
-        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
\ No newline at end of file
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+class BadRequestException(HTTPException):
+    """Base exception for malformed request errors."""
+
+    def __init__(self, detail: str = "Bad request"):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class ServiceUnavailableException(HTTPException):
+    """Base exception for temporarily overloaded or unavailable services."""
+
+    def __init__(self, detail: str = "Service temporarily unavailable"):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
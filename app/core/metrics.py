@@ -0,0 +1,49 @@
+import threading
+from collections import Counter, deque
+from collections.abc import Callable
+
+
+class Metrics:
+    """Process-local counters, gauges and latency samples, exposed on GET /metrics."""
+
+    # 每个指标保留的最近样本数，用于计算分位数
+    SAMPLE_SIZE = 1024
+
+    def __init__(self):
+        self._counters: Counter[str] = Counter()
+        self._samples: dict[str, deque[float]] = {}
+        self._gauges: dict[str, Callable[[], int | float]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one measurement, e.g. a latency in seconds."""
+        with self._lock:
+            self._counters[f"{name}.count"] += 1
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.SAMPLE_SIZE)
+            samples.append(value)
+
+    def gauge(self, name: str, read: Callable[[], int | float]) -> None:
+        """Register a value that is read when a snapshot is taken, e.g. a queue depth."""
+        with self._lock:
+            self._gauges[name] = read
+
+    def snapshot(self) -> dict[str, int | float]:
+        with self._lock:
+            result: dict[str, int | float] = dict(self._counters)
+            for name, read in self._gauges.items():
+                result[name] = read()
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                for label, quantile in (("p50", 0.5), ("p99", 0.99)):
+                    result[f"{name}.{label}"] = ordered[int(quantile * (len(ordered) - 1))]
+                result[f"{name}.max"] = ordered[-1]
+            return result
+
+
+metrics = Metrics()
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from fastapi_users.password import PasswordHelper
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class AsyncPasswordHasher:
+    """
+    Runs password hashing and verification in a bounded thread pool.
+    Argon2 and bcrypt are CPU-heavy by design and release the GIL, so running
+    them in threads keeps the event loop free for other requests. At most
+    `max_pending` calls are queued or running; beyond that callers wait up to
+    `wait_timeout` seconds and then get a 503, so a login storm is shed instead
+    of piling up behind the pool.
+    """
+
+    def __init__(
+        self,
+        helper: PasswordHelper,
+        workers: int,
+        max_pending: int,
+        wait_timeout: float,
+    ):
+        self.helper = helper
+        self.wait_timeout = wait_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self._slots = asyncio.Semaphore(max_pending)
+
+    async def _run(self, name: str, func: Callable[..., T], *args) -> T:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.wait_timeout)
+        except TimeoutError:
+            metrics.incr("password.rejected")
+            raise ServiceUnavailableException("Too many concurrent logins, try again later")
+
+        def timed() -> tuple[float, T, float]:
+            # 在工作线程内取开始时间，排在线程池队列里的时间不计入哈希耗时
+            began = time.perf_counter()
+            result = func(*args)
+            return began, result, time.perf_counter()
+
+        try:
+            submitted = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            began, result, finished = await loop.run_in_executor(self._executor, timed)
+            # wait_seconds 为开始计算前的全部排队时间：等待名额加上线程池队列
+            metrics.observe("password.wait_seconds", began - started)
+            metrics.observe("password.executor_queue_seconds", began - submitted)
+            metrics.observe(f"password.{name}_seconds", finished - began)
+            return result
+        finally:
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.helper.hash, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await self._run(
+            "verify", self.helper.verify_and_update, plain_password, hashed_password
+        )
+
+
+class InlinePasswordHelper(PasswordHelper):
+    """
+    PasswordHelper that counts the calls made inline on the event loop.
+    UserManager hashes through `password_hasher`; a fastapi-users path it does
+    not override (such as an OAuth signup) still lands here and is counted as
+    password.inline.
+    """
+
+    def hash(self, password: str) -> str:
+        metrics.incr("password.inline")
+        return super().hash(password)
+
+    def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        metrics.incr("password.inline")
+        return super().verify_and_update(plain_password, hashed_password)
+
+
+password_hasher = AsyncPasswordHasher(
+    PasswordHelper(),
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    wait_timeout=settings.PASSWORD_HASH_WAIT_TIMEOUT,
+)
+password_helper = InlinePasswordHelper()
@@ -8,6 +8,12 @@ auth_pool = ConnectionPool.from_url(
     f"redis://{settings.REDIS_HOST}", db=2, max_connections=10, decode_responses=True
 )
 
+# 读缓存单独使用 db=1，与认证 token 和 Celery 结果互不干扰
+cache_pool = ConnectionPool.from_url(
+    f"redis://{settings.REDIS_HOST}", db=1, max_connections=20, decode_responses=True
+)
+cache_redis = Redis(connection_pool=cache_pool)
+
 
 async def redis_connect():
     try:
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.core.redis_db import auth_pool
+
+logger = get_logger(__name__)
+
+
+class RevocationList:
+    """
+    Deny list of revoked access token ids (jti), mirrored in process.
+    Revocations go to a Redis sorted set scored by revocation time, members are
+    "jti:exp". Each process checks tokens against its local copy only, so
+    verifying a token never waits on Redis, and pulls new revocations in the
+    background every refresh interval. Entries are dropped once the token would
+    have expired anyway.
+    """
+
+    KEY = "auth:revoked_tokens"
+    # 增量拉取时向前多取一段，容忍各进程之间的时钟偏差
+    OVERLAP_SECONDS = 5.0
+
+    def __init__(self, redis: Redis, max_token_lifetime: int):
+        self.redis = redis
+        self.max_token_lifetime = max_token_lifetime
+        self._revoked: dict[str, float] = {}
+        self._since = 0.0
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    async def revoke(self, jti: str, exp: float) -> None:
+        """Revoke a token in this process now and in every other one within a refresh interval."""
+        self._revoked[jti] = exp
+        await self.redis.zadd(self.KEY, {f"{jti}:{exp}": time.time()})
+        metrics.incr("auth.tokens_revoked")
+
+    async def refresh(self) -> None:
+        """Pull revocations made since the last refresh and forget expired ones."""
+        now = time.time()
+        entries = await self.redis.zrangebyscore(
+            self.KEY, max(self._since - self.OVERLAP_SECONDS, 0), "+inf", withscores=True
+        )
+        for member, revoked_at in entries:
+            jti, _, exp = member.rpartition(":")
+            self._revoked[jti] = float(exp)
+            self._since = max(self._since, revoked_at)
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        # 撤销时间早于最长有效期的令牌必然已过期
+        await self.redis.zremrangebyscore(self.KEY, "-inf", now - self.max_token_lifetime)
+
+    async def try_refresh(self) -> bool:
+        """Refresh, keeping the last known list if Redis fails; returns whether it worked."""
+        try:
+            await self.refresh()
+        except RedisError as e:
+            metrics.incr("auth.revocation_refresh_errors")
+            logger.error(f"Failed to refresh the token revocation list: {str(e)}")
+            return False
+        return True
+
+    async def run(self, interval: float) -> None:
+        """Refresh forever; Redis errors keep the last known list and are retried."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.try_refresh()
+
+
+revocation_list = RevocationList(
+    Redis(connection_pool=auth_pool), settings.JWT_EXPIRATION * 60
+)
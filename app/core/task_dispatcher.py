@@ -0,0 +1,192 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from celery import Celery
+from kombu import Connection, Producer
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class TaskMessage:
+    name: str
+    args: list | None
+    options: dict[str, Any]
+    attempts: int = field(default=0)
+
+
+class TaskDispatcher:
+    """
+    Publishes Celery tasks off the event loop.
+    `dispatch` only appends to a bounded in-process queue and never waits on the
+    broker. A background publisher drains the queue in batches and sends each
+    batch from a single worker thread over its own broker connection, separate
+    from Celery's shared producer pool. Failed sends are retried with exponential
+    backoff; when the queue is full or the retries run out the task is dropped
+    and counted, so a broker outage degrades to lost notifications rather than
+    slow requests.
+    """
+
+    def __init__(
+        self,
+        app: Celery,
+        maxsize: int,
+        batch_size: int,
+        max_retries: int,
+        retry_delay: float,
+    ):
+        self.app = app
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: asyncio.Queue[TaskMessage] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        # 单线程执行器独占一条连接，连接和 producer 都不是线程安全的
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-publisher")
+        self._connection: Connection | None = None
+        self._producer: Producer | None = None
+        metrics.gauge("tasks.queue_depth", self.queue_depth)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def dispatch(self, name: str, args: list | None = None, **options: Any) -> bool:
+        """
+        Queue a task for publishing without blocking.
+        Args:
+            name (str): The registered task name.
+            args (list | None): Positional task arguments.
+            **options: Options passed on to `send_task`, e.g. task_id or eta.
+        Returns:
+            bool: False if the queue was full and the task was dropped.
+        """
+        self._ensure_running()
+        return self._enqueue(TaskMessage(name=name, args=args, options=options))
+
+    async def publish(self, messages: list[TaskMessage]) -> list[TaskMessage]:
+        """
+        Publish messages right away and wait for the broker, bypassing the queue.
+        Used where a message may only be forgotten once it is known to be sent,
+        such as the outbox relay.
+        Returns:
+            list[TaskMessage]: The messages that could not be published.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._publish, messages)
+
+    def start(self) -> None:
+        """Start the publisher on the running event loop."""
+        self._ensure_running()
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Give queued tasks up to `timeout` seconds to be published, then stop."""
+        if self._task is None or self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Stopped with {self._queue.qsize()} tasks still unpublished")
+        self._task.cancel()
+        self._task = self._queue = self._loop = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close)
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        # 首次投递或事件循环更换后（例如测试）重建队列和后台任务
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = loop.create_task(self._run())
+
+    def _enqueue(self, message: TaskMessage) -> bool:
+        if self._queue is None:
+            # 发布器已停止，延迟重试的消息无处可去
+            metrics.incr("tasks.dropped")
+            return False
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            metrics.incr("tasks.dropped")
+            logger.error(f"Task queue is full, dropped {message.name}")
+            return False
+        metrics.incr("tasks.dispatched")
+        return True
+
+    async def _run(self) -> None:
+        queue = self._queue
+        assert queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                failed = await loop.run_in_executor(self._executor, self._publish, batch)
+            except Exception as e:
+                logger.error(f"Task publisher failed: {str(e)}")
+                failed = batch
+            for message in failed:
+                self._retry(loop, message)
+            for _ in batch:
+                queue.task_done()
+
+    def _retry(self, loop: asyncio.AbstractEventLoop, message: TaskMessage) -> None:
+        message.attempts += 1
+        if message.attempts > self.max_retries:
+            metrics.incr("tasks.dropped")
+            logger.error(f"Gave up publishing {message.name} after {self.max_retries} retries")
+            return
+        metrics.incr("tasks.retried")
+        delay = self.retry_delay * 2 ** (message.attempts - 1)
+        loop.call_later(delay, self._enqueue, message)
+
+    def _publish(self, batch: list[TaskMessage]) -> list[TaskMessage]:
+        """Send a batch over the publisher's connection; runs in the publisher thread."""
+        failed: list[TaskMessage] = []
+        for message in batch:
+            if failed:
+                # 同一批中已有发送失败，剩余消息直接进入重试，不再逐条等待超时
+                failed.append(message)
+                continue
+            try:
+                if self._producer is None:
+                    self._connection = self.app.connection_for_write()
+                    self._producer = self._connection.Producer()
+                self.app.send_task(
+                    message.name, args=message.args, producer=self._producer, **message.options
+                )
+            except Exception as e:
+                # 连接可能已失效，下次发送时重新建立
+                logger.error(f"Failed to publish {message.name}: {str(e)}")
+                self._close()
+                failed.append(message)
+            else:
+                metrics.incr("tasks.published")
+        return failed
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.release()
+            except Exception:
+                pass
+        self._connection = self._producer = None
+
+
+task_dispatcher = TaskDispatcher(
+    celery_app,
+    maxsize=settings.TASK_QUEUE_MAXSIZE,
+    batch_size=settings.TASK_PUBLISH_BATCH_SIZE,
+    max_retries=settings.TASK_PUBLISH_MAX_RETRIES,
+    retry_delay=settings.TASK_PUBLISH_RETRY_DELAY,
+)
@@ -1,19 +1,29 @@
-from typing import Optional
+import uuid
+from typing import Any, Optional
 
+import jwt
 from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
 from redis.asyncio import Redis
-from fastapi_users import BaseUserManager, FastAPIUsers, IntegerIDMixin
+from fastapi_users import BaseUserManager, FastAPIUsers, IntegerIDMixin, exceptions
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
+    JWTStrategy,
     RedisStrategy,
 )
+from fastapi_users.jwt import decode_jwt, generate_jwt
 from fastapi_users.db import SQLAlchemyUserDatabase
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from app.core.cache import invalidate_user, user_cache
 from app.core.config import settings
 from app.core.database import User, get_user_db
+from app.core.password import password_hasher, password_helper
 from app.core.redis_db import get_auth_redis
-from app.core.celery_app import celery_app
-from app.schemas.schemas import UserRead
+from app.core.revocation import RevocationList, revocation_list
+from app.schemas.schemas import UserCreate
+from app.service.outbox_service import outbox_relay
 
 SECRET = settings.JWT_SECRET
 
@@ -22,15 +32,140 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     reset_password_token_secret = SECRET
     verification_token_secret = SECRET
 
+    async def get(self, id: int) -> User:
+        """
+        Get a user by id, from the per-process user cache when possible.
+        Every authenticated request resolves its user through here. A hit builds
+        a detached User from the cached column values, so each request still
+        gets its own instance that it can attach to its session.
+        """
+        cached = user_cache.get(id)
+        if cached is not None:
+            user = User(**cached)
+            make_transient_to_detached(user)
+            return user
+        user = await super().get(id)
+        user_cache.set(
+            id, {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        )
+        return user
+
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> User | None:
+        """Same as BaseUserManager.authenticate, with hashing off the event loop."""
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # 用户不存在时同样计算一次哈希，避免通过响应时间探测邮箱是否注册
+            await password_hasher.hash(credentials.password)
+            return None
+
+        verified, updated_password_hash = await password_hasher.verify_and_update(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+        return user
+
+    async def create(
+        self, user_create: UserCreate, safe: bool = False, request: Optional[Request] = None
+    ) -> User:
+        """Same as BaseUserManager.create, with hashing off the event loop."""
+        await self.validate_password(user_create.password, user_create)
+
+        # 先检查邮箱是否已注册，重复注册不必付出一次哈希
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await password_hasher.hash(password)
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def _update(self, user: User, update_dict: dict[str, Any]) -> User:
+        # 密码先在线程池中哈希好，其余字段仍交给父类处理（update、reset_password 都经过这里）
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {
+                key: value for key, value in update_dict.items() if key != "password"
+            }
+            update_dict["hashed_password"] = await password_hasher.hash(password)
+        return await super()._update(user, update_dict)
+
+    async def forgot_password(self, user: User, request: Optional[Request] = None) -> None:
+        """Same as BaseUserManager.forgot_password, with the fingerprint hashed off the event loop."""
+        if not user.is_active:
+            raise exceptions.UserInactive()
+
+        token_data = {
+            "sub": str(user.id),
+            "password_fgpt": await password_hasher.hash(user.hashed_password),
+            "aud": self.reset_password_token_audience,
+        }
+        token = generate_jwt(
+            token_data,
+            self.reset_password_token_secret,
+            self.reset_password_token_lifetime_seconds,
+        )
+        await self.on_after_forgot_password(user, token, request)
+
+    async def reset_password(
+        self, token: str, password: str, request: Optional[Request] = None
+    ) -> User:
+        """Same as BaseUserManager.reset_password, with the fingerprint checked off the event loop."""
+        try:
+            data = decode_jwt(
+                token, self.reset_password_token_secret, [self.reset_password_token_audience]
+            )
+            user_id = data["sub"]
+            password_fingerprint = data["password_fgpt"]
+            parsed_id = self.parse_id(user_id)
+        except (jwt.PyJWTError, KeyError, exceptions.InvalidID):
+            raise exceptions.InvalidResetPasswordToken()
+
+        user = await self.get(parsed_id)
+
+        valid_password_fingerprint, _ = await password_hasher.verify_and_update(
+            user.hashed_password, password_fingerprint
+        )
+        if not valid_password_fingerprint:
+            raise exceptions.InvalidResetPasswordToken()
+        if not user.is_active:
+            raise exceptions.UserInactive()
+
+        updated_user = await self._update(user, {"password": password})
+        await self.on_after_reset_password(user, request)
+        return updated_user
+
+    async def on_after_update(
+        self, user: User, update_dict: dict[str, Any], request: Optional[Request] = None
+    ):
+        # 包括停用账号（is_active=False），必须让所有进程立即失效
+        await invalidate_user(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None):
+        await invalidate_user(user.id)
+
+    async def on_after_verify(self, user: User, request: Optional[Request] = None):
+        await invalidate_user(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        await invalidate_user(user.id)
+
     async def on_after_register(self, user: User, request: Optional[Request] = None):
         print(f"User {user.id} has registered.")
-        user_data = UserRead.model_validate(user)
-        user_data_dict = user_data.model_dump()
-        celery_app.send_task(
-            "app.tasks.mail_task.register_email",
-            args=[user_data_dict],
-            task_id=f"register_email_sent_{user_data_dict['id']}",
-        )
+        # 欢迎邮件已在创建用户的事务中写入发件箱
+        outbox_relay.notify()
 
     async def on_after_forgot_password(
         self, user: User, token: str, request: Optional[Request] = None
@@ -44,7 +179,8 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
 
 
 async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db)):
-    yield UserManager(user_db)
+    # 未覆盖的 fastapi-users 路径仍会同步调用 password_helper，计入 password.inline
+    yield UserManager(user_db, password_helper)
 
 
 bearer_transport = BearerTransport(tokenUrl="auth/redis/login")
@@ -60,7 +196,74 @@ auth_backend = AuthenticationBackend(
     get_strategy=get_redis_strategy,
 )
 
-fastapi_users = FastAPIUsers[User, int](get_user_manager, [auth_backend])
+
+class RevocableJWTStrategy(JWTStrategy[User, int]):
+    """
+    Short-lived signed access tokens that are verified locally.
+    Each token carries a jti. Logout adds it to the revocation list, which is
+    checked in process, so reading a token costs no network round trip.
+    """
+
+    def __init__(self, revocations: RevocationList, **kwargs):
+        super().__init__(**kwargs)
+        self.revocations = revocations
+
+    def _decode(self, token: str) -> dict[str, Any] | None:
+        try:
+            return decode_jwt(
+                token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
+            )
+        except jwt.PyJWTError:
+            return None
+
+    async def read_token(
+        self, token: str | None, user_manager: BaseUserManager[User, int]
+    ) -> User | None:
+        if token is None:
+            return None
+        data = self._decode(token)
+        if data is None:
+            return None
+        user_id, jti = data.get("sub"), data.get("jti")
+        if user_id is None or jti is None or self.revocations.is_revoked(jti):
+            return None
+        try:
+            return await user_manager.get(user_manager.parse_id(user_id))
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+    async def write_token(self, user: User) -> str:
+        data = {"sub": str(user.id), "aud": self.token_audience, "jti": uuid.uuid4().hex}
+        return generate_jwt(
+            data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm
+        )
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        data = self._decode(token)
+        if data is not None and "jti" in data:
+            await self.revocations.revoke(data["jti"], data["exp"])
+
+
+jwt_bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
+
+
+def get_jwt_strategy() -> RevocableJWTStrategy:
+    return RevocableJWTStrategy(
+        revocation_list,
+        secret=SECRET,
+        lifetime_seconds=settings.JWT_EXPIRATION * 60,
+        algorithm=settings.JWT_ALGORITHM,
+    )
+
+
+jwt_backend = AuthenticationBackend(
+    name="jwt",
+    transport=jwt_bearer_transport,
+    get_strategy=get_jwt_strategy,
+)
+
+# JWT 后端排在前面：校验失败只消耗 CPU，Redis 令牌随后再由 redis 后端处理
+fastapi_users = FastAPIUsers[User, int](get_user_manager, [jwt_backend, auth_backend])
 
 get_current_user = fastapi_users.current_user(active=True)
 
@@ -1,14 +1,25 @@
+import asyncio
 from asyncio import to_thread
 from fastapi import FastAPI, Response, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
+from app.core.cache import listen_cache_invalidations
 from app.core.config import settings
 from app.core.logging import setup_logging, get_logger
-from app.core.redis_db import redis_connect
+from app.core.metrics import metrics
+from app.core.redis_db import cache_pool, redis_connect
+from app.core.revocation import revocation_list
 from app.core.s3_client import ensure_minio_bucket_exists
-from app.core.user_manage import auth_backend, get_current_user, fastapi_users
+from app.core.task_dispatcher import task_dispatcher
+from app.core.user_manage import (
+    auth_backend,
+    fastapi_users,
+    get_current_user,
+    jwt_backend,
+)
 from app.models.models import User
+from app.service.outbox_service import outbox_relay
 from app.schemas.schemas import UserRead, UserCreate, UserUpdate
 from app.utils.migrations import run_migrations
 from app.routes import (
@@ -17,6 +28,8 @@ from app.routes import (
     reminder_routes,
     tag_routes,
     public_routes,
+    export_routes,
+    import_routes,
     sse,
 )
 
@@ -35,9 +48,23 @@ async def lifespan(app: FastAPI):
     await to_thread(ensure_minio_bucket_exists, bucket_name=settings.MINIO_BUCKET)
     print("启动: 创建 Redis 连接池...")
     app.state.auth_redis = await redis_connect()
+    cache_invalidations = asyncio.create_task(listen_cache_invalidations())
+    # 先完整加载一次撤销列表，再在后台增量刷新；Redis 不可用时照常启动，由后台刷新补上
+    await revocation_list.try_refresh()
+    revocations = asyncio.create_task(
+        revocation_list.run(settings.TOKEN_REVOCATION_REFRESH_INTERVAL)
+    )
+    task_dispatcher.start()
+    relay = asyncio.create_task(outbox_relay.run(settings.OUTBOX_POLL_INTERVAL))
     yield
+    relay.cancel()
+    # 先把排队中的任务投递出去再关闭
+    await task_dispatcher.stop()
+    revocations.cancel()
+    cache_invalidations.cancel()
     print("关闭: 释放 Redis 连接池...")
     await app.state.auth_redis.aclose()  # type: ignore
+    await cache_pool.aclose()
 
 
 app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
@@ -49,6 +76,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
@@ -56,6 +84,9 @@ app.add_middleware(
 app.include_router(
     fastapi_users.get_auth_router(auth_backend), prefix="/auth/redis", tags=["auth"]
 )
+app.include_router(
+    fastapi_users.get_auth_router(jwt_backend), prefix="/auth/jwt", tags=["auth"]
+)
 app.include_router(
     fastapi_users.get_register_router(UserRead, UserCreate),
     prefix="/auth",
@@ -83,6 +114,8 @@ app.include_router(todo_routes.router)  # Todos Router
 app.include_router(reminder_routes.router)  # Reminders Router
 app.include_router(tag_routes.router)  # Tags Router
 app.include_router(public_routes.router)  # Public Router
+app.include_router(export_routes.router)  # Export Router
+app.include_router(import_routes.router)  # Import Router
 app.include_router(sse.router)  # SSE Router
 
 
@@ -92,6 +125,12 @@ async def health_check(response: Response):
     return {"status": "ok 👍 "}
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Process-local counters, e.g. note_cache.hits / note_cache.misses."""
+    return metrics.snapshot()
+
+
 @app.get("/authenticated-route")
 async def authenticated_route(user: User = Depends(get_current_user)):
     return {"message": f"Hello {user.email}!"}
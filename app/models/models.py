@@ -1,11 +1,22 @@
+import hashlib
 import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi_users.db import SQLAlchemyBaseUserTable
-from sqlalchemy import UniqueConstraint
-from sqlalchemy import Boolean, ForeignKey, Integer, String, Text, DateTime
-from sqlalchemy.orm import Mapped, mapped_column, relationship, DeclarativeBase
+from sqlalchemy import DDL, Computed, Index, UniqueConstraint, event
+from sqlalchemy import BigInteger, Boolean, ForeignKey, Integer, String, Text, DateTime
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+    query_expression,
+    relationship,
+    validates,
+    DeclarativeBase,
+)
+
+from app.utils.search import NOTE_SEARCH_CONFIG
 
 
 # 基类
@@ -13,6 +24,24 @@ class Base(DeclarativeBase):
     pass
 
 
+# 模糊搜索的 GIN 索引依赖 pg_trgm 扩展，建表前确保已启用
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+def trigram_index(name: str, column: str) -> Index:
+    """GIN trigram index, lets ILIKE '%term%' and similarity searches avoid a table scan."""
+    return Index(
+        name,
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    )
+
+
 class DateTimeMixin:
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), index=True, default=lambda: datetime.now(timezone.utc)
@@ -62,12 +91,24 @@ class Note(Base, DateTimeMixin):
     )
     title: Mapped[str] = mapped_column(String(100), nullable=False, default="Untitled")
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    # content 的 SHA-256 摘要，用于定长的重复内容校验
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     share_code: Mapped[str] = mapped_column(
         String(36), index=True, nullable=True, unique=True, default=None
     )
     share_expires_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=True, default=None
     )
+    # 全文检索向量，由数据库根据 title (权重 A) 和 content (权重 B) 自动维护
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{NOTE_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{NOTE_SEARCH_CONFIG}', coalesce(content, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     # 关系映射
     user: Mapped["User"] = relationship("User", back_populates="notes")
@@ -88,9 +129,25 @@ class Note(Base, DateTimeMixin):
     )
 
     __table_args__ = (
-        UniqueConstraint("user_id", "content", name="_user_content_unique_constraint"),
+        Index("ix_notes_user_id_content_hash", "user_id", "content_hash", unique=True),
+        # 游标分页按 (created_at, id) 寻址，避免 OFFSET 扫描被跳过的行
+        Index("ix_notes_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_notes_search_vector", "search_vector", postgresql_using="gin"),
+        # 含中日韩文字的搜索无法分词，退回子串匹配
+        trigram_index("ix_notes_title_trgm", "title"),
+        trigram_index("ix_notes_content_trgm", "content"),
     )
 
+    @staticmethod
+    def hash_content(content: str) -> str:
+        """SHA-256 hex digest of the note content, matches the backfill migration."""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @validates("content")
+    def _sync_content_hash(self, key, content):
+        self.content_hash = self.hash_content(content)
+        return content
+
     def generate_share_code(self):
         """生成唯一的 share_code"""
         self.share_code = str(uuid.uuid4())
@@ -108,7 +165,7 @@ class Todo(Base, DateTimeMixin):
         ForeignKey("user.id", ondelete="CASCADE"), nullable=False
     )
     note_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("notes.id", ondelete="SET NULL"), nullable=True
+        ForeignKey("notes.id", ondelete="SET NULL"), nullable=True, index=True
     )
     content: Mapped[str] = mapped_column(String(255), nullable=False)
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -117,6 +174,11 @@ class Todo(Base, DateTimeMixin):
     user: Mapped["User"] = relationship("User", back_populates="todos")
     note: Mapped[Optional["Note"]] = relationship("Note", back_populates="todos")
 
+    __table_args__ = (
+        Index("ix_todos_user_id_created_at_id", "user_id", "created_at", "id"),
+        trigram_index("ix_todos_content_trgm", "content"),
+    )
+
     def __repr__(self):
         return f"<Todo(id={self.id}, content={self.content})>"
 
@@ -130,7 +192,7 @@ class Reminder(Base, DateTimeMixin):
         ForeignKey("user.id", ondelete="CASCADE"), nullable=False
     )
     note_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("notes.id", ondelete="SET NULL"), nullable=True
+        ForeignKey("notes.id", ondelete="SET NULL"), nullable=True, index=True
     )
     reminder_time: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False
@@ -143,6 +205,13 @@ class Reminder(Base, DateTimeMixin):
     user: Mapped["User"] = relationship("User", back_populates="reminders")
     note: Mapped[Optional["Note"]] = relationship("Note", back_populates="reminders")
 
+    __table_args__ = (
+        Index("ix_reminders_user_id_created_at_id", "user_id", "created_at", "id"),
+        # 调度器按 is_triggered = false AND reminder_time <= now() 扫描到期提醒
+        Index("ix_reminders_is_triggered_reminder_time", "is_triggered", "reminder_time"),
+        trigram_index("ix_reminders_message_trgm", "message"),
+    )
+
     def __repr__(self):
         return f"<Reminder(id={self.id}, message={self.message})>"
 
@@ -182,21 +251,28 @@ class Tag(Base, DateTimeMixin):
     __tablename__ = "tags"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(
-        String(50), nullable=False, unique=True, index=True
-    )
+    # 标签名只在同一用户内唯一，由 (user_id, name) 唯一约束保证
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("user.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
     )
+    # 一个标签可能关联用户的全部笔记，禁止隐式加载；删除时由外键 ON DELETE CASCADE 清理关联
     notes: Mapped[list["Note"]] = relationship(
-        "Note", secondary="note_tags", back_populates="tags", lazy="selectin"
+        "Note",
+        secondary="note_tags",
+        back_populates="tags",
+        lazy="raise",
+        passive_deletes=True,
     )
     user: Mapped["User"] = relationship("User", back_populates="tags")
+    # 使用该标签的笔记数，只在查询时通过 with_expression 按需计算
+    note_count: Mapped[Optional[int]] = query_expression()
 
     __table_args__ = (
         UniqueConstraint("user_id", "name", name="_user_tag_name_unique_constraint"),
+        trigram_index("ix_tags_name_trgm", "name"),
     )
 
     def __repr__(self):
@@ -212,3 +288,56 @@ class NoteTag(Base):
     tag_id: Mapped[int] = mapped_column(
         ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
     )
+
+    # 主键以 note_id 开头，按 tag_id 过滤需要单独的索引
+    __table_args__ = (Index("ix_note_tags_tag_id_note_id", "tag_id", "note_id"),)
+
+
+# 批量导入任务，processed_lines 为已提交的输入行数，中断后从这里继续
+class ImportJob(Base, DateTimeMixin):
+    __tablename__ = "import_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    object_name: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
+    original_filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    processed_lines: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    notes_imported: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duplicates: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tags_created: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    todos_imported: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_lines: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<ImportJob(id={self.id}, status={self.status})>"
+
+
+
+# 事务性发件箱：与业务数据在同一事务中写入，由 relay 投递到 Celery 后删除
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    # 用作 Celery task_id，重复投递时消费端据此去重
+    dedup_id: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+    task_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    args: Mapped[list] = mapped_column(JSONB, nullable=False)
+    eta: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self):
+        return f"<OutboxMessage(id={self.id}, task_name={self.task_name})>"
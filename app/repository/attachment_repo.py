@@ -1,10 +1,14 @@
+from collections.abc import Iterable
+
 from sqlalchemy import select, desc, asc
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import AlreadyExistsException, NotFoundException
 from app.models.models import Attachment
+from app.repository.base import is_foreign_key_violation
 from app.schemas.schemas import AttachmentCreate
+from app.utils.fieldsets import sparse_load_options
 
 
 class AttachmentRepository:
@@ -28,8 +32,11 @@ class AttachmentRepository:
             await self.session.commit()
             await self.session.refresh(new_attachment)
             return new_attachment
-        except IntegrityError:
+        except IntegrityError as e:
             await self.session.rollback()
+            # 笔记可能在其他进程校验通过后被删除
+            if is_foreign_key_violation(e):
+                raise NotFoundException(f"Note with id {note_id} not found")
             raise AlreadyExistsException(
                 f"Attachment with content {data.original_filename} already exists"
             )
@@ -55,10 +62,13 @@ class AttachmentRepository:
         offset: int,
         order_by: str | None,
         current_user,
+        fields: Iterable[str] | None = None,
     ) -> list[Attachment]:
         query = select(Attachment).where(
             Attachment.note_id == note_id, Attachment.user_id == current_user.id
         )
+        if fields:
+            query = query.options(*sparse_load_options(Attachment, fields))
         
         if order_by:
             if order_by == "created_at desc":
@@ -0,0 +1,58 @@
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import Row, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# PostgreSQL foreign_key_violation
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def is_foreign_key_violation(error: IntegrityError) -> bool:
+    """Whether an IntegrityError was raised by a foreign key, e.g. a parent row deleted concurrently."""
+    return getattr(error.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION
+
+
+async def update_returning(
+    session: AsyncSession,
+    model,
+    row_id: int,
+    user_id: int,
+    values: dict[str, Any],
+    exclude: Iterable[str] = (),
+    commit: bool = True,
+) -> Row | None:
+    """
+    Update one row owned by a user in a single round trip:
+    UPDATE ... WHERE id = :id AND user_id = :uid RETURNING <columns>, then commit.
+    Column onupdate defaults such as updated_at still apply.
+    Args:
+        session (AsyncSession): The session to run the statement in.
+        model: The mapped class, which must have `id` and `user_id` columns.
+        row_id (int): The ID of the row to update.
+        user_id (int): The ID of the user who must own the row.
+        values (dict[str, Any]): Column values to set.
+        exclude (Iterable[str]): Columns to leave out of RETURNING.
+        commit (bool): Commit right away; pass False to write more in the same transaction.
+    Returns:
+        Row | None: The updated row, attribute-accessible like the ORM object so
+        it can be validated straight into a response schema; None if no row
+        with that id belongs to the user.
+    """
+    excluded = set(exclude)
+    columns = [column for column in model.__table__.columns if column.key not in excluded]
+    query = (
+        update(model)
+        .where(model.id == row_id, model.user_id == user_id)
+        .values(**values)
+        .returning(*columns)
+    )
+    result = await session.execute(
+        query, execution_options={"synchronize_session": False}
+    )
+    row = result.one_or_none()
+    if commit:
+        await session.commit()
+    return row
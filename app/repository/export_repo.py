@@ -0,0 +1,71 @@
+from collections.abc import AsyncIterator
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+
+from app.models.models import Note, NoteTag, Reminder, Tag, Todo
+from app.utils.pagination import STREAM_BATCH_SIZE
+
+
+class ExportRepository:
+    def __init__(self, session: AsyncSession):
+        """Repository layer for exporting all of a user's data."""
+        self.session = session
+
+    async def begin_snapshot(self) -> None:
+        """
+        Start a REPEATABLE READ transaction, so every section of the export sees
+        the same snapshot and note_tag records only reference exported rows.
+        Must be called before any other query on the session.
+        """
+        await self.session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+
+    async def _stream_scalars(self, query: Select) -> AsyncIterator:
+        """Yield the entities of `query` through a server-side cursor, a batch at a time."""
+        result = await self.session.stream_scalars(
+            query.execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for item in result:
+            yield item
+
+    def stream_tags(self, current_user) -> AsyncIterator[Tag]:
+        query = select(Tag).where(Tag.user_id == current_user.id).order_by(Tag.id)
+        return self._stream_scalars(query)
+
+    def stream_notes(self, current_user) -> AsyncIterator[Note]:
+        # 关联数据以单独的记录导出，这里禁止任何关联加载
+        query = (
+            select(Note)
+            .options(raiseload("*"))
+            .where(Note.user_id == current_user.id)
+            .order_by(Note.id)
+        )
+        return self._stream_scalars(query)
+
+    async def stream_note_tags(self, current_user) -> AsyncIterator:
+        query = (
+            select(NoteTag.note_id, NoteTag.tag_id)
+            .join(Note, Note.id == NoteTag.note_id)
+            .where(Note.user_id == current_user.id)
+            .order_by(NoteTag.note_id, NoteTag.tag_id)
+        )
+        result = await self.session.stream(
+            query.execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for row in result:
+            yield row
+
+    def stream_todos(self, current_user) -> AsyncIterator[Todo]:
+        query = select(Todo).where(Todo.user_id == current_user.id).order_by(Todo.id)
+        return self._stream_scalars(query)
+
+    def stream_reminders(self, current_user) -> AsyncIterator[Reminder]:
+        query = (
+            select(Reminder)
+            .where(Reminder.user_id == current_user.id)
+            .order_by(Reminder.id)
+        )
+        return self._stream_scalars(query)
@@ -0,0 +1,291 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundException
+from app.models.models import ImportJob, Note
+from app.repository.outbox_repo import enqueue_task
+from app.schemas.schemas import ImportNote
+
+
+IMPORT_TASK = "app.tasks.import_task.run_import"
+
+# 暂存表只在当前事务内存在，COPY 写入后一次性合并到正式表
+_STAGING_TABLES = (
+    """
+    CREATE TEMP TABLE import_stage_notes (
+        line_no integer NOT NULL,
+        title varchar(100) NOT NULL,
+        content text NOT NULL,
+        content_hash varchar(64) NOT NULL,
+        created_at timestamptz
+    ) ON COMMIT DROP
+    """,
+    """
+    CREATE TEMP TABLE import_stage_note_tags (
+        line_no integer NOT NULL,
+        tag_name varchar(50) NOT NULL
+    ) ON COMMIT DROP
+    """,
+    """
+    CREATE TEMP TABLE import_stage_todos (
+        line_no integer NOT NULL,
+        position integer NOT NULL,
+        content varchar(255) NOT NULL,
+        is_completed boolean NOT NULL
+    ) ON COMMIT DROP
+    """,
+    """
+    CREATE TEMP TABLE import_stage_note_ids (
+        line_no integer NOT NULL,
+        note_id integer NOT NULL
+    ) ON COMMIT DROP
+    """,
+)
+
+_MERGE_TAGS = text(
+    """
+    WITH created AS (
+        INSERT INTO tags (name, user_id, created_at, updated_at)
+        SELECT DISTINCT tag_name, :user_id, now(), now() FROM import_stage_note_tags
+        ON CONFLICT (user_id, name) DO NOTHING
+        RETURNING 1
+    )
+    SELECT count(*) FROM created
+    """
+)
+
+# 内容已存在的笔记跳过，其标签和待办也不再导入，重复导入同一文件不会产生重复数据
+_MERGE_NOTES = text(
+    """
+    WITH inserted AS (
+        INSERT INTO notes (user_id, title, content, content_hash, created_at, updated_at)
+        SELECT :user_id, title, content, content_hash, coalesce(created_at, now()), now()
+        FROM import_stage_notes
+        ORDER BY line_no
+        ON CONFLICT (user_id, content_hash) DO NOTHING
+        RETURNING id, content_hash
+    )
+    INSERT INTO import_stage_note_ids (line_no, note_id)
+    SELECT DISTINCT ON (inserted.id) stage.line_no, inserted.id
+    FROM inserted
+    JOIN import_stage_notes AS stage ON stage.content_hash = inserted.content_hash
+    ORDER BY inserted.id, stage.line_no
+    """
+)
+
+_MERGE_NOTE_TAGS = text(
+    """
+    INSERT INTO note_tags (note_id, tag_id)
+    SELECT DISTINCT ids.note_id, tags.id
+    FROM import_stage_note_tags AS stage
+    JOIN import_stage_note_ids AS ids ON ids.line_no = stage.line_no
+    JOIN tags ON tags.user_id = :user_id AND tags.name = stage.tag_name
+    ON CONFLICT DO NOTHING
+    """
+)
+
+_MERGE_TODOS = text(
+    """
+    INSERT INTO todos (user_id, note_id, content, is_completed, created_at, updated_at)
+    SELECT :user_id, ids.note_id, stage.content, stage.is_completed, now(), now()
+    FROM import_stage_todos AS stage
+    JOIN import_stage_note_ids AS ids ON ids.line_no = stage.line_no
+    ORDER BY stage.line_no, stage.position
+    """
+)
+
+
+class ImportRepository:
+    def __init__(self, session: AsyncSession):
+        """Repository layer for bulk import jobs."""
+        self.session = session
+
+    async def create_job(
+        self, object_name: str, original_filename: str, size: int, current_user
+    ) -> ImportJob:
+        """Create a job and queue its import task in the same transaction, via the outbox."""
+        job = ImportJob(
+            object_name=object_name,
+            original_filename=original_filename,
+            size=size,
+            user_id=current_user.id,
+        )
+        self.session.add(job)
+        await self.session.flush()
+        enqueue_task(self.session, IMPORT_TASK, [job.id], f"run_import_{job.id}")
+        await self.session.commit()
+        await self.session.refresh(job)
+        return job
+
+    async def get_job(self, job_id: int, current_user) -> ImportJob:
+        query = select(ImportJob).where(
+            ImportJob.id == job_id, ImportJob.user_id == current_user.id
+        )
+        result = await self.session.scalars(query)
+        job = result.one_or_none()
+        if not job:
+            raise NotFoundException(f"Import job with id {job_id} not found")
+        return job
+
+    async def get_job_for_worker(self, job_id: int) -> ImportJob | None:
+        """Load a job without an owner check, for the import worker."""
+        return await self.session.get(ImportJob, job_id)
+
+    async def set_status(
+        self,
+        job_id: int,
+        status: str,
+        error: str | None = None,
+        from_statuses: tuple[str, ...] | None = None,
+    ) -> bool:
+        """
+        Move a job to `status`, optionally only from one of `from_statuses`.
+        Returns:
+            bool: Whether the job was updated.
+        """
+        query = update(ImportJob).where(ImportJob.id == job_id)
+        if from_statuses:
+            query = query.where(ImportJob.status.in_(from_statuses))
+        result = await self.session.execute(
+            query.values(status=status, error=error).returning(ImportJob.id),
+            execution_options={"synchronize_session": False},
+        )
+        updated = result.one_or_none() is not None
+        await self.session.commit()
+        return updated
+
+    async def resume_job(self, job_id: int, stale_after: float) -> bool:
+        """
+        Put a job back to pending and queue its import task again, in one transaction.
+        Failed jobs can always be resumed. Pending and running jobs only once
+        they have not advanced for `stale_after` seconds, i.e. their task was
+        lost or their worker died; a run that is in fact still alive is stopped
+        by the checkpoint check in load_batch.
+        Args:
+            job_id (int): The job to resume.
+            stale_after (float): Seconds without progress before a job counts as stuck.
+        Returns:
+            bool: Whether the job was resumed.
+        """
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+        result = await self.session.execute(
+            update(ImportJob)
+            .where(
+                ImportJob.id == job_id,
+                or_(
+                    ImportJob.status == "failed",
+                    and_(
+                        ImportJob.status.in_(("pending", "running")),
+                        ImportJob.updated_at < stale_before,
+                    ),
+                ),
+            )
+            .values(status="pending", error=None)
+            .returning(ImportJob.id),
+            execution_options={"synchronize_session": False},
+        )
+        if result.one_or_none() is None:
+            await self.session.rollback()
+            return False
+        # 每次恢复都是一次新的投递，去重 ID 不能与创建时相同
+        enqueue_task(
+            self.session, IMPORT_TASK, [job_id], f"run_import_{job_id}_{uuid.uuid4().hex}"
+        )
+        await self.session.commit()
+        return True
+
+    async def load_batch(
+        self,
+        job_id: int,
+        user_id: int,
+        start_line: int,
+        end_line: int,
+        notes: list[tuple[int, ImportNote]],
+        failed_lines: int,
+    ) -> dict[str, int] | None:
+        """
+        Load a batch of parsed notes and advance the job's checkpoint, in one transaction.
+        Rows are COPYed into temporary staging tables and merged from there with
+        a few set-based INSERT ... SELECT statements: missing tags are created by
+        name, notes whose content already exists are skipped, then tag links and
+        todos are attached to the notes that were inserted.
+        Args:
+            job_id (int): The import job.
+            user_id (int): The owner of the imported rows.
+            start_line (int): The checkpoint this batch continues from.
+            end_line (int): The checkpoint after this batch.
+            notes (list[tuple[int, ImportNote]]): (line number, note) pairs of the batch.
+            failed_lines (int): Lines of the batch that could not be parsed.
+        Returns:
+            dict[str, int] | None: Counts of what was imported, or None if another
+            worker already moved the checkpoint past `start_line`.
+        """
+        # 锁定任务行并核对断点，同一任务被重复投递时只有一个 worker 能提交
+        checkpoint = await self.session.scalar(
+            select(ImportJob.processed_lines)
+            .where(ImportJob.id == job_id)
+            .with_for_update()
+        )
+        if checkpoint != start_line:
+            await self.session.rollback()
+            return None
+
+        for ddl in _STAGING_TABLES:
+            await self.session.execute(text(ddl))
+
+        note_rows, tag_rows, todo_rows = [], [], []
+        for line_no, note in notes:
+            created_at = note.created_at
+            if created_at is not None and created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            note_rows.append(
+                (line_no, note.title, note.content, Note.hash_content(note.content), created_at)
+            )
+            tag_rows.extend((line_no, name) for name in dict.fromkeys(note.tags))
+            todo_rows.extend(
+                (line_no, position, todo.content, todo.is_completed)
+                for position, todo in enumerate(note.todos)
+            )
+
+        # 通过 asyncpg 的 COPY 协议写入暂存表，比逐行 INSERT 快一个数量级
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver = raw_connection.driver_connection
+        for table, columns, records in (
+            ("import_stage_notes", ("line_no", "title", "content", "content_hash", "created_at"), note_rows),
+            ("import_stage_note_tags", ("line_no", "tag_name"), tag_rows),
+            ("import_stage_todos", ("line_no", "position", "content", "is_completed"), todo_rows),
+        ):
+            if records:
+                await driver.copy_records_to_table(table, records=records, columns=columns)
+
+        params = {"user_id": user_id}
+        tags_created = await self.session.scalar(_MERGE_TAGS, params)
+        await self.session.execute(_MERGE_NOTES, params)
+        notes_imported = await self.session.scalar(
+            text("SELECT count(*) FROM import_stage_note_ids")
+        )
+        await self.session.execute(_MERGE_NOTE_TAGS, params)
+        todos_result = await self.session.execute(_MERGE_TODOS, params)
+
+        counts = {
+            "notes_imported": notes_imported,
+            "duplicates": len(note_rows) - notes_imported,
+            "tags_created": tags_created,
+            "todos_imported": todos_result.rowcount,
+            "failed_lines": failed_lines,
+        }
+        await self.session.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id)
+            .values(
+                processed_lines=end_line,
+                **{key: getattr(ImportJob, key) + value for key, value in counts.items()},
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        await self.session.commit()
+        return counts
@@ -1,18 +1,94 @@
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select, desc, asc, or_
-from sqlalchemy.exc import IntegrityError
+from collections.abc import Iterable
+
+from sqlalchemy import (
+    Select,
+    delete,
+    desc,
+    false,
+    func,
+    literal_column,
+    select,
+    true,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, load_only, noload, selectinload
 
 from app.core.exceptions import AlreadyExistsException, NotFoundException
-from app.models.models import Note, Tag, NoteTag
+from app.models.models import Attachment, Note, NoteTag, Reminder, Tag, Todo
+from app.repository.base import update_returning
+from app.schemas.param_schemas import NOTE_RELATIONS
 from app.schemas.schemas import NoteCreate, NoteUpdate
+from app.utils.fieldsets import sparse_load_options
+from app.utils.pagination import apply_keyset, sort_direction
+from app.utils.search import (
+    NOTE_SEARCH_CONFIG,
+    apply_substring_search,
+    contains_cjk,
+    to_prefix_tsquery,
+)
 
 
 class NoteRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @staticmethod
+    def _load_options(relations: Iterable[str] | None, summary: bool = False) -> list:
+        """
+        Loader options that fetch only the requested relations.
+        Relations left out are not queried at all instead of going through their
+        default selectin load. `relations=None` loads every relation.
+        """
+        wanted = set(NOTE_RELATIONS if relations is None else relations)
+        options = [
+            selectinload(getattr(Note, name))
+            if name in wanted
+            else noload(getattr(Note, name))
+            for name in NOTE_RELATIONS
+        ]
+        if summary:
+            options.append(defer(Note.content, raiseload=True))
+        return options
+
+    @staticmethod
+    def _fingerprint_columns(relations: Iterable[str] | None) -> list:
+        """
+        Columns that change whenever the note's response with `relations` changes:
+        the note's own updated_at plus, per relation, the row count and newest
+        updated_at. Tags list their ids, since swapping one tag keeps the count.
+        """
+        wanted = set(NOTE_RELATIONS if relations is None else relations)
+        columns = [Note.id, Note.updated_at]
+        for name, model in (
+            ("todos", Todo),
+            ("reminders", Reminder),
+            ("attachments", Attachment),
+        ):
+            if name in wanted:
+                columns.append(
+                    select(func.concat(func.count(), "/", func.max(model.updated_at)))
+                    .where(model.note_id == Note.id)
+                    .scalar_subquery()
+                )
+        if "tags" in wanted:
+            entry = func.concat(NoteTag.tag_id, "@", Tag.updated_at)
+            columns.append(
+                select(
+                    func.string_agg(
+                        entry, aggregate_order_by(literal_column("','"), NoteTag.tag_id)
+                    )
+                )
+                .select_from(NoteTag)
+                .join(Tag, Tag.id == NoteTag.tag_id)
+                .where(NoteTag.note_id == Note.id)
+                .scalar_subquery()
+            )
+        return columns
+
     async def create(self, data: NoteCreate, current_user) -> Note:
         """
         Create a new note in the database.
@@ -36,20 +112,80 @@ class NoteRepository:
                 f"Note with content {data.content} already exists"
             )
 
-    async def get_by_id(self, note_id: int, current_user) -> Note:
+    async def bulk_create(self, items: list[NoteCreate], current_user) -> list:
+        """
+        Insert many notes with a single multi-row INSERT ... ON CONFLICT DO NOTHING
+        ... RETURNING, in one transaction.
+        Args:
+            items (list[NoteCreate]): The notes to create.
+            current_user: The current authenticated user.
+        Returns:
+            list: One entry per item, in order: the inserted row (id, user_id, title,
+            timestamps and sharing columns), or None if the user already has a
+            note with that content, including an earlier item of the same batch.
+        Raises:
+            Exception: If the database operation fails.
+        """
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "user_id": current_user.id,
+                "title": item.title,
+                "content": item.content,
+                "content_hash": Note.hash_content(item.content),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for item in items
+        ]
+        query = (
+            pg_insert(Note)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["user_id", "content_hash"])
+            .returning(
+                Note.id,
+                Note.user_id,
+                Note.title,
+                Note.content_hash,
+                Note.created_at,
+                Note.updated_at,
+                Note.share_code,
+                Note.share_expires_at,
+            )
+        )
+        try:
+            result = await self.session.execute(query)
+            inserted = {row.content_hash: row for row in result.all()}
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise Exception(f"Database operation failed, bulk create failed {e}")
+        # RETURNING 不保证顺序，按内容摘要对应回请求条目；同批重复的只有第一条算新建
+        return [inserted.pop(row["content_hash"], None) for row in rows]
+
+    async def get_by_id(
+        self,
+        note_id: int,
+        current_user,
+        relations: Iterable[str] | None = None,
+        summary: bool = False,
+    ) -> Note:
         """
         Retrieves a note by its ID for the current user.
         Args:
             note_id (int): The ID of the note to retrieve
             current_user: The current authenticated user
+            relations (Iterable[str] | None): Relations to load, None loads all of them
+            summary (bool): Skip loading the note content
         Returns:
             Note: The note object if found
         Raises:
             NotFoundException: If note with given ID doesn't exist for current user
         """
         query = (
-            select(Note).where(Note.id == note_id, Note.user_id == current_user.id)
-            # .options(selectinload(Note.todos),selectinload(Note.reminders))  #  models里定义了lazy属性就无需这条
+            select(Note)
+            .where(Note.id == note_id, Note.user_id == current_user.id)
+            .options(*self._load_options(relations, summary))
         )
         result = await self.session.scalars(query)
         note = result.one_or_none()
@@ -57,16 +193,39 @@ class NoteRepository:
             raise NotFoundException(f"Note with id {note_id} not found")
         return note
 
-    async def get_all(
+    async def get_fingerprint(self, note_id: int, current_user) -> tuple:
+        """
+        Fetch what the note's full response depends on, without loading any relation.
+        Args:
+            note_id (int): The ID of the note.
+            current_user: The current authenticated user.
+        Returns:
+            tuple: id, updated_at and per-relation aggregates of the note.
+        Raises:
+            NotFoundException: If note with given ID doesn't exist for current user
+        """
+        query = select(*self._fingerprint_columns(None)).where(
+            Note.id == note_id, Note.user_id == current_user.id
+        )
+        result = await self.session.execute(query)
+        row = result.one_or_none()
+        if not row:
+            raise NotFoundException(f"Note with id {note_id} not found")
+        return tuple(row)
+
+    async def _page_query(
         self,
+        query: Select,
         search: str | None,
         order_by: str | None,
         tag_id: int | None,
         limit: int,
         offset: int,
         current_user,
-    ) -> list[Note]:
-        query = select(Note).where(Note.user_id == current_user.id)
+        cursor: str | None,
+    ) -> Select:
+        """Apply the filters, ordering and paging of a notes listing to `query`."""
+        query = query.where(Note.user_id == current_user.id)
 
         if tag_id is not None:
             tag_query = select(Tag).where(
@@ -76,56 +235,173 @@ class NoteRepository:
             tag = tag_result.one_or_none()
             if not tag:
                 raise NotFoundException(f"Tag with id {tag_id} not found")
-            query = query.join(NoteTag).join(Tag).where(Tag.id == tag_id)
-
-        if search:
-            query = query.where(
-                or_(Note.content.ilike(f"%{search}%"), Note.title.ilike(f"%{search}%"))
+            query = query.join(NoteTag, NoteTag.note_id == Note.id).where(
+                NoteTag.tag_id == tag_id
             )
 
-        if order_by:
-            if order_by == "created_at desc":
-                query = query.order_by(desc(Note.created_at))
-            elif order_by == "created_at asc":
-                query = query.order_by(asc(Note.created_at))
-
-        # 分页功能
-        query = query.limit(limit).offset(offset)
+        rank = None
+        if search and contains_cjk(search):
+            # 连续的中日韩文字在 search_vector 中是一整个词，改用 trigram 索引支持的子串匹配
+            query = apply_substring_search(query, (Note.title, Note.content), search)
+        elif search:
+            # 走 search_vector 上的 GIN 索引，而不是对 content 做 ILIKE 全表扫描
+            expression = to_prefix_tsquery(search)
+            if expression is None:
+                query = query.where(false())
+            else:
+                ts_query = func.to_tsquery(NOTE_SEARCH_CONFIG, expression)
+                query = query.where(Note.search_vector.op("@@")(ts_query))
+                rank = func.ts_rank(Note.search_vector, ts_query)
+
+        direction = sort_direction(order_by, cursor)
+        if direction:
+            # 以 id 作为次级排序键，保证相同 created_at 的行顺序稳定
+            query = apply_keyset(query, Note, direction, cursor)
+        elif rank is not None:
+            # 未指定排序时，搜索结果按相关度排序
+            query = query.order_by(desc(rank), desc(Note.id))
+        else:
+            # 未指定排序时按 id 排序，保证同一页的内容与其 ETag 一致
+            query = query.order_by(Note.id)
+
+        # 分页功能：有游标时按键集翻页，否则沿用 offset
+        query = query.limit(limit)
+        if not cursor:
+            query = query.offset(offset)
+        return query
 
+    async def get_all(
+        self,
+        search: str | None,
+        order_by: str | None,
+        tag_id: int | None,
+        limit: int,
+        offset: int,
+        current_user,
+        cursor: str | None = None,
+        relations: Iterable[str] | None = None,
+        summary: bool = False,
+        fields: Iterable[str] | None = None,
+    ) -> list[Note]:
+        """
+        Retrieve a page of notes for the current user.
+        Args:
+            search, order_by, tag_id: Optional filters and sort order.
+            limit (int): Maximum number of notes to return.
+            offset (int): Rows to skip; ignored when a cursor is given.
+            current_user: The current authenticated user.
+            cursor (str | None): Keyset cursor from the previous page.
+            relations (Iterable[str] | None): Relations to load, None loads all of them.
+            summary (bool): Skip loading the note content.
+            fields (Iterable[str] | None): Only load these columns/relations; overrides relations and summary.
+        Returns:
+            list[Note]: The notes on the requested page.
+        Raises:
+            NotFoundException: If the tag filter refers to an unknown tag.
+            BadRequestException: If the cursor is malformed.
+        """
+        load_options = (
+            sparse_load_options(Note, fields)
+            if fields
+            else self._load_options(relations, summary)
+        )
+        query = await self._page_query(
+            select(Note).options(*load_options),
+            search=search,
+            order_by=order_by,
+            tag_id=tag_id,
+            limit=limit,
+            offset=offset,
+            current_user=current_user,
+            cursor=cursor,
+        )
         result = await self.session.scalars(query)
         return list(result.all())
 
-    async def update(self, data: NoteUpdate, note_id: int, current_user) -> Note:
+    async def get_all_fingerprints(
+        self,
+        search: str | None,
+        order_by: str | None,
+        tag_id: int | None,
+        limit: int,
+        offset: int,
+        current_user,
+        cursor: str | None = None,
+        relations: Iterable[str] | None = None,
+    ) -> list[tuple]:
+        """
+        Fingerprint the page `get_all` would return with the same arguments,
+        one row of id, updated_at and relation aggregates per note.
+        Raises:
+            NotFoundException: If the tag filter refers to an unknown tag.
+            BadRequestException: If the cursor is malformed.
+        """
+        query = await self._page_query(
+            select(*self._fingerprint_columns(relations)),
+            search=search,
+            order_by=order_by,
+            tag_id=tag_id,
+            limit=limit,
+            offset=offset,
+            current_user=current_user,
+            cursor=cursor,
+        )
+        result = await self.session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def update(self, data: NoteUpdate, note_id: int, current_user):
         """
         Update a note with the given data for the current user.
+        The columns come back from a single UPDATE ... RETURNING; the relations
+        are then selectin-loaded for that id only, without reading the note row again.
         Args:
             data (NoteUpdate): The data to update the note with.
             note_id (int): The ID of the note to update.
             current_user: The current user performing the update.
         Returns:
-            Note: The updated note.
+            dict: The updated note's columns and all of its relations.
         Raises:
             NotFoundException: If the note with the given ID is not found or does not belong to the current user.
+            AlreadyExistsException: If another note of the user already has the new content.
             ValueError: If there are no fields to update.
         """
-        query = select(Note).where(Note.id == note_id, Note.user_id == current_user.id)
-        result = await self.session.scalars(query)
-        note = result.one_or_none()
-        if not note:
-            raise NotFoundException(
-                f"Note with id {note_id} not found or does not belong to the current user"
-            )
         update_data = data.model_dump(exclude_unset=True, exclude_none=True)
         # 确保不修改 id 和 user_id
         update_data.pop("id", None)
         update_data.pop("user_id", None)
         if not update_data:
             raise ValueError("No fields to update")
-        for key, value in update_data.items():
-            setattr(note, key, value)
-        await self.session.commit()
-        await self.session.refresh(note)
-        return note
+        if "content" in update_data:
+            # UPDATE 语句不经过 @validates，需要手动同步摘要
+            update_data["content_hash"] = Note.hash_content(update_data["content"])
+        try:
+            note = await update_returning(
+                self.session,
+                Note,
+                note_id,
+                current_user.id,
+                update_data,
+                exclude=("search_vector", "content_hash"),
+            )
+        except IntegrityError:
+            await self.session.rollback()
+            raise AlreadyExistsException(
+                f"Note with content {data.content} already exists"
+            )
+        if not note:
+            raise NotFoundException(
+                f"Note with id {note_id} not found or does not belong to the current user"
+            )
+        relations = await self.session.scalar(
+            select(Note)
+            .where(Note.id == note.id)
+            .options(load_only(Note.id), *self._load_options(None))
+            .execution_options(populate_existing=True)
+        )
+        return {
+            **note._asdict(),
+            **{name: getattr(relations, name) for name in NOTE_RELATIONS},
+        }
 
     async def delete(self, note_id: int, current_user) -> None:
         """
@@ -233,6 +509,76 @@ class NoteRepository:
         await self.session.refresh(note)
         return note
 
+    async def bulk_add_tags(
+        self, note_ids: list[int], tag_ids: list[int], current_user
+    ) -> list[int]:
+        """
+        Attach every tag to every note with one INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+        Notes and tags of other users are filtered out in SQL; existing links are skipped.
+        Returns:
+            list[int]: The note id of each link that was created.
+        """
+        pairs = (
+            select(Note.id, Tag.id)
+            .join(Tag, true())
+            .where(
+                Note.id.in_(note_ids),
+                Note.user_id == current_user.id,
+                Tag.id.in_(tag_ids),
+                Tag.user_id == current_user.id,
+            )
+        )
+        query = (
+            pg_insert(NoteTag)
+            .from_select(["note_id", "tag_id"], pairs)
+            .on_conflict_do_nothing()
+            .returning(NoteTag.note_id)
+        )
+        result = await self.session.scalars(query)
+        linked = list(result.all())
+        await self.session.commit()
+        return linked
+
+    async def bulk_remove_tags(
+        self, note_ids: list[int], tag_ids: list[int], current_user
+    ) -> list[int]:
+        """
+        Detach every tag from every note with one DELETE scoped to the user's notes and tags.
+        Returns:
+            list[int]: The note id of each link that was removed.
+        """
+        query = (
+            delete(NoteTag)
+            .where(
+                NoteTag.note_id.in_(
+                    select(Note.id).where(
+                        Note.id.in_(note_ids), Note.user_id == current_user.id
+                    )
+                ),
+                NoteTag.tag_id.in_(
+                    select(Tag.id).where(
+                        Tag.id.in_(tag_ids), Tag.user_id == current_user.id
+                    )
+                ),
+            )
+            .returning(NoteTag.note_id)
+        )
+        result = await self.session.scalars(
+            query, execution_options={"synchronize_session": False}
+        )
+        unlinked = list(result.all())
+        await self.session.commit()
+        return unlinked
+
+    async def get_share_code(self, note_id: int, current_user) -> str | None:
+        """Current share code of the note, None if it is not shared."""
+        result = await self.session.scalars(
+            select(Note.share_code).where(
+                Note.id == note_id, Note.user_id == current_user.id
+            )
+        )
+        return result.one_or_none()
+
     async def get_by_share_code(self, share_code: str) -> Note:
         query = select(Note).where(Note.share_code == share_code)
         result = await self.session.scalars(query)
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Row, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import OutboxMessage
+
+
+def enqueue_task(
+    session: AsyncSession,
+    task_name: str,
+    args: list,
+    dedup_id: str,
+    eta: datetime | None = None,
+) -> None:
+    """
+    Add a Celery task to the outbox of the session's current transaction.
+    Nothing is sent here: the task is published by the outbox relay once the
+    transaction commits, and is discarded with it if it rolls back.
+    Args:
+        session (AsyncSession): The session whose transaction writes the entity.
+        task_name (str): The registered task name.
+        args (list): JSON-serializable positional task arguments.
+        dedup_id (str): Unique id of this event, used as the Celery task_id.
+        eta (datetime | None): When the task should run, if not right away.
+    """
+    session.add(OutboxMessage(task_name=task_name, args=args, dedup_id=dedup_id, eta=eta))
+
+
+class OutboxRepository:
+    def __init__(self, session: AsyncSession):
+        """Repository layer for the transactional outbox."""
+        self.session = session
+
+    async def claim(self, limit: int, lease: float) -> list[Row]:
+        """
+        Lease up to `limit` due messages, oldest first, and return them, without committing.
+        Due rows are locked with SKIP LOCKED only for this short transaction,
+        and their available_at is pushed `lease` seconds ahead. Once committed,
+        other relays leave them alone while they are published outside any
+        transaction; rows that are neither deleted nor deferred by then (the
+        relay crashed) become due again.
+        Args:
+            limit (int): The maximum number of messages to claim.
+            lease (float): How long the claimed messages stay hidden, in seconds.
+        Returns:
+            list[Row]: The claimed messages' columns, oldest first.
+        """
+        now = datetime.now(timezone.utc)
+        due = (
+            select(OutboxMessage.id)
+            .where(OutboxMessage.available_at <= now)
+            .order_by(OutboxMessage.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("due")
+        )
+        result = await self.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == due.c.id)
+            .values(available_at=now + timedelta(seconds=lease))
+            .returning(*OutboxMessage.__table__.columns),
+            execution_options={"synchronize_session": False},
+        )
+        return sorted(result.all(), key=lambda row: row.id)
+
+    async def delete(self, ids: list[int]) -> None:
+        if ids:
+            await self.session.execute(
+                delete(OutboxMessage).where(OutboxMessage.id.in_(ids)),
+                execution_options={"synchronize_session": False},
+            )
+
+    async def defer(self, ids: list[int], delay: float) -> None:
+        """Count a failed attempt and hide the messages for `delay` seconds."""
+        if ids:
+            await self.session.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(ids))
+                .values(
+                    attempts=OutboxMessage.attempts + 1,
+                    available_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+                ),
+                execution_options={"synchronize_session": False},
+            )
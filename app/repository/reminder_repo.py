@@ -1,10 +1,36 @@
-from sqlalchemy import select, desc, asc
-from sqlalchemy.exc import SQLAlchemyError
+import uuid
+from collections.abc import AsyncIterator, Iterable
+
+from sqlalchemy import Row, Select, case, desc, false, func, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundException
 from app.models.models import Reminder
+from app.repository.base import is_foreign_key_violation, update_returning
+from app.repository.outbox_repo import enqueue_task
 from app.schemas.schemas import ReminderCreate, ReminderUpdate
+from app.utils.fieldsets import sparse_load_options
+from app.utils.pagination import STREAM_BATCH_SIZE, apply_keyset, sort_direction
+from app.utils.search import apply_trigram_search
+
+
+NOTIFY_TASK = "app.tasks.reminder_task.notify_reminder_action"
+TRIGGER_TASK = "app.tasks.reminder_task.trigger_reminder"
+
+
+def reminder_event(reminder, action: str) -> dict:
+    """The JSON payload of a reminder notification; `reminder` may be an ORM object or a Row."""
+    return {
+        "action": action,
+        "reminder_id": reminder.id,
+        "reminder_time": reminder.reminder_time.isoformat(),
+        "message": reminder.message,
+        "is_acknowledged": reminder.is_acknowledged,
+        "is_triggered": reminder.is_triggered,
+        "user_id": reminder.user_id,
+        "note_id": reminder.note_id,
+    }
 
 
 class ReminderRepository:
@@ -17,6 +43,8 @@ class ReminderRepository:
     ) -> Reminder:
         """
         Asynchronously creates a new reminder in the database.
+        The create notification is written to the outbox in the same transaction;
+        the reminder itself is fired by the due-reminder scheduler.
         Args:
             data (ReminderCreate): The data required to create a new reminder.
             note_id (int | None): The ID of the note associated with the reminder, if any.
@@ -24,6 +52,7 @@ class ReminderRepository:
         Returns:
             Reminder: The newly created reminder object.
         Raises:
+            NotFoundException: If the note was deleted in the meantime.
             Exception: If the database operation fails.
         """        
         new_reminder = Reminder(
@@ -34,9 +63,22 @@ class ReminderRepository:
         )
         self.session.add(new_reminder)
         try:
-            await self.session.commit()
+            await self.session.flush()
             await self.session.refresh(new_reminder)
+            enqueue_task(
+                self.session,
+                NOTIFY_TASK,
+                [reminder_event(new_reminder, "create")],
+                f"notify_reminder_create_{new_reminder.id}",
+            )
+            await self.session.commit()
             return new_reminder
+        except IntegrityError as e:
+            await self.session.rollback()
+            # 笔记可能在其他进程校验通过后被删除
+            if note_id is not None and is_foreign_key_violation(e):
+                raise NotFoundException(f"Note with id {note_id} not found")
+            raise Exception(f"Database operation failed, create failed {e}")
         except SQLAlchemyError as e:
             await self.session.rollback()
             raise Exception(f"Database operation failed, create failed {e}")
@@ -61,84 +103,189 @@ class ReminderRepository:
             raise NotFoundException(f"Reminder with id {reminder_id} not found")
         return reminder
 
+    @staticmethod
+    def _filter(
+        query: Select,
+        note_id: int | None,
+        search: str | None,
+        current_user,
+        search_mode: str | None,
+    ):
+        """Apply the filters of a reminder listing; returns the query and the search rank, if any."""
+        query = query.where(Reminder.user_id == current_user.id)
+
+        if note_id:
+            query = query.where(Reminder.note_id == note_id)
+
+        if search:
+            return apply_trigram_search(query, Reminder.message, search, search_mode)
+        return query, None
+
+    @staticmethod
+    def _order(query: Select, order_by: str | None, cursor: str | None, rank) -> Select:
+        """Order a reminder listing; ordered listings continue with a keyset cursor."""
+        direction = sort_direction(order_by, cursor)
+        if direction:
+            return apply_keyset(query, Reminder, direction, cursor)
+        if rank is not None:
+            return query.order_by(desc(rank), desc(Reminder.id))
+        # 未指定排序时按 id 排序，保证分页结果稳定
+        return query.order_by(Reminder.id)
+
     async def get_all(
         self,
         note_id: int | None,
         search: str | None,
         order_by: str | None,
+        limit: int,
+        offset: int,
         current_user,
+        cursor: str | None = None,
+        search_mode: str | None = None,
+        fields: Iterable[str] | None = None,
     ) -> list[Reminder]:
         """
-        Retrieve all reminders for the current user.
+        Retrieve a page of reminders for the current user.
         Args:
             current_user: The user whose reminders are to be retrieved.
+            limit (int): Maximum number of reminders to return.
+            offset (int): Rows to skip; ignored when `cursor` is given.
+            cursor (str | None): Keyset cursor returned with the previous page.
+            search_mode (str | None): "substring" or "fuzzy" matching of `search`.
+            fields (Iterable[str] | None): Only load these columns.
         Returns:
             A list of Reminder objects associated with the current user.
         """
-        query = select(Reminder).where(Reminder.user_id == current_user.id)
+        query = select(Reminder)
+        if fields:
+            query = query.options(*sparse_load_options(Reminder, fields))
 
-        if note_id:
-            query = query.where(Reminder.note_id == note_id)
-
-        if search:
-            query = query.where(Reminder.message.ilike(f"%{search}%"))
-
-        if order_by:
-            if order_by == "created_at desc":
-                query = query.order_by(desc(Reminder.created_at))
-            elif order_by == "created_at asc":
-                query = query.order_by(asc(Reminder.created_at))
+        query, rank = self._filter(query, note_id, search, current_user, search_mode)
+        query = self._order(query, order_by, cursor, rank).limit(limit)
+        if not cursor:
+            query = query.offset(offset)
 
         result = await self.session.scalars(query)
         return list(result.all())
 
-    async def update(
-        self, data: ReminderUpdate, reminder_id: int, current_user
-    ) -> Reminder:
+    async def stream_all(
+        self,
+        note_id: int | None,
+        search: str | None,
+        order_by: str | None,
+        current_user,
+        search_mode: str | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> AsyncIterator[Reminder]:
         """
-        Updates an existing reminder with the provided data.
+        Yield every reminder a listing matches through a server-side cursor.
+        Rows are fetched STREAM_BATCH_SIZE at a time, so memory stays bounded no
+        matter how many reminders the user has.
+        """
+        query = select(Reminder)
+        if fields:
+            query = query.options(*sparse_load_options(Reminder, fields))
+
+        query, rank = self._filter(query, note_id, search, current_user, search_mode)
+        query = self._order(query, order_by, None, rank)
+
+        result = await self.session.stream_scalars(
+            query.execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for reminder in result:
+            yield reminder
+
+    async def update(self, data: ReminderUpdate, reminder_id: int, current_user):
+        """
+        Updates an existing reminder with the provided data, in one round trip.
+        Moving reminder_time reschedules the reminder: it becomes due again for
+        the scheduler. The update notification is written to the outbox in the same transaction.
         Args:
             data (ReminderUpdate): The data to update the reminder with.
             reminder_id (int): The ID of the reminder to update.
             current_user: The current user performing the update.
         Returns:
-            Reminder: The updated reminder object.
+            Row: The updated reminder's columns.
         Raises:
             NotFoundException: If the reminder with the given ID is not found or does not belong to the current user.
             ValueError: If there are no fields to update.
         """
-        query = select(Reminder).where(
-            Reminder.id == reminder_id, Reminder.user_id == current_user.id
-        )
-        result = await self.session.scalars(query)
-        reminder = result.one_or_none()
-        if not reminder:
-            raise NotFoundException(
-                f"Reminder with id {reminder_id} not found or does not belong to the current user"
-            )
         update_data = data.model_dump(exclude_unset=True, exclude_none=True)
         update_data.pop("id", None)
         update_data.pop("user_id", None)
         update_data.pop("note_id", None)
         if not update_data:
             raise ValueError("No fields to update")
-        for key, value in update_data.items():
-            setattr(reminder, key, value)
+        if "reminder_time" in update_data:
+            # SET 中的列引用取更新前的值，时间确实改变时才重新等待触发
+            update_data["is_triggered"] = case(
+                (Reminder.reminder_time != update_data["reminder_time"], false()),
+                else_=Reminder.is_triggered,
+            )
+        reminder = await update_returning(
+            self.session, Reminder, reminder_id, current_user.id, update_data, commit=False
+        )
+        if not reminder:
+            await self.session.rollback()
+            raise NotFoundException(
+                f"Reminder with id {reminder_id} not found or does not belong to the current user"
+            )
+        # 每次更新都是独立事件，去重 ID 不能只由 reminder_id 决定
+        enqueue_task(
+            self.session,
+            NOTIFY_TASK,
+            [reminder_event(reminder, "update")],
+            f"notify_reminder_update_{reminder.id}_{uuid.uuid4().hex}",
+        )
         await self.session.commit()
-        await self.session.refresh(reminder)
         return reminder
 
-    async def delete(self, reminder_id: int, current_user) -> None:
+    async def claim_due(self, limit: int) -> list[Row]:
+        """
+        Mark up to `limit` due reminders as triggered and return them, without committing.
+        Due rows are found through the (is_triggered, reminder_time) index and
+        locked with SKIP LOCKED, so schedulers on several workers claim disjoint
+        batches. The caller fires the triggers and then commits; rolling back
+        instead leaves the reminders due for the next pass.
+        Args:
+            limit (int): The maximum number of reminders to claim.
+        Returns:
+            list[Row]: The claimed reminders' columns, earliest first.
+        """
+        # 锁定的 SELECT 放在 CTE 中只执行一次，领取的 id 集合固定，不会超过 limit
+        due = (
+            select(Reminder.id)
+            .where(Reminder.is_triggered == false(), Reminder.reminder_time <= func.now())
+            .order_by(Reminder.reminder_time)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("due")
+        )
+        result = await self.session.execute(
+            update(Reminder)
+            .where(Reminder.id == due.c.id)
+            .values(is_triggered=True)
+            .returning(*Reminder.__table__.columns),
+            execution_options={"synchronize_session": False},
+        )
+        return sorted(result.all(), key=lambda row: row.reminder_time)
+
+    async def delete(self, reminder_id: int, current_user) -> int | None:
         """
         Deletes a reminder from the repository.
+        The scheduler only fires reminders that still exist.
         Args:
             reminder_id (int): The ID of the reminder to delete.
             current_user: The user attempting to delete the reminder.
+        Returns:
+            int | None: The ID of the note the reminder belonged to, if any.
         Raises:
             NotFoundException: If the reminder does not exist or does not belong to the current user.
         """
         todo = await self.session.get(Reminder, reminder_id)
         if not todo or todo.user_id != current_user.id:
             raise NotFoundException(f"Reminder with id {reminder_id} not found")
+        note_id = todo.note_id
         await self.session.delete(todo)
         await self.session.commit()
+        return note_id
@@ -1,10 +1,17 @@
-from sqlalchemy import select, desc, asc
+from collections.abc import Iterable
+
+from sqlalchemy import Select, func, literal_column, select, desc, asc
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import with_expression
 
 from app.core.exceptions import AlreadyExistsException, NotFoundException
-from app.models.models import Tag
+from app.models.models import Tag, NoteTag
+from app.repository.base import update_returning
 from app.schemas.schemas import TagCreate, TagUpdate
+from app.utils.fieldsets import sparse_load_options
+from app.utils.search import apply_trigram_search
 
 
 class TagRepository:
@@ -23,7 +30,17 @@ class TagRepository:
             raise AlreadyExistsException(f"Tag with name {data.name} already exists")
 
     async def get_by_id(self, tag_id: int, current_user) -> Tag:
-        query = select(Tag).where(Tag.id == tag_id, Tag.user_id == current_user.id)
+        note_count = (
+            select(func.count())
+            .where(NoteTag.tag_id == Tag.id)
+            .correlate(Tag)
+            .scalar_subquery()
+        )
+        query = (
+            select(Tag)
+            .where(Tag.id == tag_id, Tag.user_id == current_user.id)
+            .options(with_expression(Tag.note_count, note_count))
+        )
         result = await self.session.scalars(query)
         tag = result.one_or_none()
         if not tag:
@@ -38,6 +55,31 @@ class TagRepository:
             raise NotFoundException(f"Tag with name {name} not found")
         return tag
 
+    @staticmethod
+    def _filter(query: Select, search: str | None, current_user, search_mode: str | None):
+        query = query.where(Tag.user_id == current_user.id)
+        if search:
+            return apply_trigram_search(query, Tag.name, search, search_mode)
+        return query, None
+
+    @staticmethod
+    def _with_note_counts(query: Select, current_user):
+        """
+        Outer join per-tag note counts, grouped over the user's rows in note_tags
+        (served by the (tag_id, note_id) index) instead of loading Tag.notes.
+        Returns:
+            tuple[Select, ColumnElement]: The joined query and the note count expression.
+        """
+        counts = (
+            select(NoteTag.tag_id, func.count().label("note_count"))
+            .join(Tag, Tag.id == NoteTag.tag_id)
+            .where(Tag.user_id == current_user.id)
+            .group_by(NoteTag.tag_id)
+            .subquery()
+        )
+        note_count = func.coalesce(counts.c.note_count, 0)
+        return query.outerjoin(counts, counts.c.tag_id == Tag.id), note_count
+
     async def get_all(
         self,
         search: str | None,
@@ -45,17 +87,44 @@ class TagRepository:
         limit: int,
         offset: int,
         current_user,
+        search_mode: str | None = None,
+        fields: Iterable[str] | None = None,
+        with_counts: bool = False,
     ) -> list[Tag]:
-        query = select(Tag).where(Tag.user_id == current_user.id)
+        """
+        Retrieve a page of the current user's tags; Tag.notes is never loaded.
+        Args:
+            with_counts (bool): Fill note_count. Implied by ordering by note_count
+                or asking for it in `fields`.
+        Returns:
+            list[Tag]: The tags on the requested page.
+        """
+        query = select(Tag)
+        if fields:
+            query = query.options(*sparse_load_options(Tag, fields))
 
-        if search:
-            query = query.where(Tag.name.ilike(f"%{search}%"))
+        query, rank = self._filter(query, search, current_user, search_mode)
+
+        note_count = None
+        if (
+            with_counts
+            or (order_by or "").startswith("note_count")
+            or (fields and "note_count" in fields)
+        ):
+            query, note_count = self._with_note_counts(query, current_user)
+            query = query.options(with_expression(Tag.note_count, note_count))
 
         if order_by:
             if order_by == "created_at desc":
                 query = query.order_by(desc(Tag.created_at))
             elif order_by == "created_at asc":
                 query = query.order_by(asc(Tag.created_at))
+            elif order_by == "note_count desc":
+                query = query.order_by(desc(note_count), asc(Tag.id))
+            elif order_by == "note_count asc":
+                query = query.order_by(asc(note_count), asc(Tag.id))
+        elif rank is not None:
+            query = query.order_by(desc(rank), desc(Tag.id))
 
         # 分页功能
         query = query.limit(limit).offset(offset)
@@ -63,24 +132,58 @@ class TagRepository:
         result = await self.session.scalars(query)
         return list(result.all())
 
-    async def update(self, data: TagUpdate, tag_id: int, current_user) -> Tag:
-        query = select(Tag).where(Tag.id == tag_id, Tag.user_id == current_user.id)
-        result = await self.session.scalars(query)
-        tag = result.one_or_none()
-        if not tag:
-            raise NotFoundException(
-                f"Tag with id {tag_id} not found or does not belong to the current user"
+    async def get_list_version(
+        self,
+        search: str | None,
+        current_user,
+        search_mode: str | None = None,
+        with_counts: bool = False,
+    ) -> tuple:
+        """
+        (count, max(updated_at)) of all tags matched by a listing, for conditional GETs.
+        With counts, a digest of every tag's note count is added, since tagging
+        a note changes the counts but not the tags.
+        """
+        columns = [func.count(Tag.id), func.max(Tag.updated_at)]
+        query, _ = self._filter(select(*columns), search, current_user, search_mode)
+        if with_counts:
+            query, note_count = self._with_note_counts(query, current_user)
+            entry = func.concat(Tag.id, ":", note_count)
+            query = query.add_columns(
+                func.md5(
+                    func.string_agg(
+                        entry, aggregate_order_by(literal_column("','"), Tag.id)
+                    )
+                )
             )
+        result = await self.session.execute(query)
+        return tuple(result.one())
+
+    async def get_note_ids(self, tag_id: int) -> list[int]:
+        """IDs of the notes carrying the tag, e.g. to invalidate their cached copies."""
+        result = await self.session.scalars(
+            select(NoteTag.note_id).where(NoteTag.tag_id == tag_id)
+        )
+        return list(result.all())
+
+    async def update(self, data: TagUpdate, tag_id: int, current_user):
         update_data = data.model_dump(exclude_unset=True, exclude_none=True)
         # 确保不修改 id 和 user_id
         update_data.pop("id", None)
         update_data.pop("user_id", None)
         if not update_data:
             raise ValueError("No fields to update")
-        for key, value in update_data.items():
-            setattr(tag, key, value)
-        await self.session.commit()
-        await self.session.refresh(tag)
+        try:
+            tag = await update_returning(
+                self.session, Tag, tag_id, current_user.id, update_data
+            )
+        except IntegrityError:
+            await self.session.rollback()
+            raise AlreadyExistsException(f"Tag with name {data.name} already exists")
+        if not tag:
+            raise NotFoundException(
+                f"Tag with id {tag_id} not found or does not belong to the current user"
+            )
         return tag
 
     async def delete(self, tag_id: int, current_user) -> None:
@@ -1,10 +1,18 @@
-from sqlalchemy import select, desc, asc
-from sqlalchemy.exc import SQLAlchemyError
+from collections.abc import AsyncIterator, Iterable
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Select, delete, func, insert, select, update, desc
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundException
 from app.models.models import Todo
+from app.repository.base import is_foreign_key_violation, update_returning
 from app.schemas.schemas import TodoCreate, TodoUpdate
+from app.utils.fieldsets import sparse_load_options
+from app.utils.pagination import STREAM_BATCH_SIZE, apply_keyset, sort_direction
+from app.utils.search import apply_trigram_search
 
 
 class TodoRepository:
@@ -22,6 +30,7 @@ class TodoRepository:
         Returns:
             Todo: The newly created Todo item.
         Raises:
+            NotFoundException: If the note was deleted in the meantime.
             Exception: If the database operation fails.
         """
         new_todo = Todo(content=data.content, note_id=note_id, user_id=current_user.id)
@@ -30,10 +39,59 @@ class TodoRepository:
             await self.session.commit()
             await self.session.refresh(new_todo)
             return new_todo
+        except IntegrityError as e:
+            await self.session.rollback()
+            # 笔记可能在其他进程校验通过后被删除
+            if note_id is not None and is_foreign_key_violation(e):
+                raise NotFoundException(f"Note with id {note_id} not found")
+            raise Exception(f"Database operation failed, create failed {e}")
         except SQLAlchemyError as e:
             await self.session.rollback()
             raise Exception(f"Database operation failed, create failed {e}")
 
+    async def bulk_create(
+        self, items: list[TodoCreate], note_id: int | None, current_user
+    ) -> list[Todo]:
+        """
+        Create many Todo items with a single INSERT ... RETURNING.
+        Args:
+            items (list[TodoCreate]): The Todo items to create.
+            note_id (int | None): The ID of the associated note, if any.
+            current_user: The current user creating the Todo items.
+        Returns:
+            list[Todo]: The created Todo items, in request order.
+        Raises:
+            NotFoundException: If the note was deleted in the meantime.
+            Exception: If the database operation fails.
+        """
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "content": item.content,
+                "note_id": note_id,
+                "user_id": current_user.id,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for item in items
+        ]
+        try:
+            result = await self.session.scalars(
+                insert(Todo).returning(Todo, sort_by_parameter_order=True), rows
+            )
+            todos = list(result.all())
+            await self.session.commit()
+            return todos
+        except IntegrityError as e:
+            await self.session.rollback()
+            # 笔记可能在其他进程校验通过后被删除
+            if note_id is not None and is_foreign_key_violation(e):
+                raise NotFoundException(f"Note with id {note_id} not found")
+            raise Exception(f"Database operation failed, bulk create failed {e}")
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise Exception(f"Database operation failed, bulk create failed {e}")
+
     async def get_by_id(self, todo_id: int, current_user) -> Todo:
         """
         Retrieve a Todo item by its ID for the current user.
@@ -52,18 +110,18 @@ class TodoRepository:
             raise NotFoundException(f"Todo with id {todo_id} not found")
         return todo
 
-    async def get_all(
-        self, note_id: int | None, status: str | None, search: str | None, order_by: str | None, current_user
-    ) -> list[Todo]:
-        """
-        Retrieve all Todo items for the current user.
-        Args:
-            current_user: The user whose Todo items are to be retrieved.
-        Returns:
-            A list of Todo items associated with the current user.
-        """
-        query = select(Todo).where(Todo.user_id == current_user.id)
-        
+    @staticmethod
+    def _filter(
+        query: Select,
+        note_id: int | None,
+        status: str | None,
+        search: str | None,
+        current_user,
+        search_mode: str | None,
+    ):
+        """Apply the filters of a todo listing; returns the query and the search rank, if any."""
+        query = query.where(Todo.user_id == current_user.id)
+
         if note_id:
             query = query.where(Todo.note_id == note_id)
 
@@ -72,57 +130,188 @@ class TodoRepository:
                 query = query.where(Todo.is_completed.is_(True))
             elif status == "unfinished":
                 query = query.where(Todo.is_completed.is_(False))
-        
+
         if search:
-            query = query.where(Todo.content.ilike(f"%{search}%"))
-
-        if order_by:
-            if order_by == "created_at desc":
-                query = query.order_by(desc(Todo.created_at))
-            elif order_by == "created_at asc":
-                query = query.order_by(asc(Todo.created_at))
-                
+            return apply_trigram_search(query, Todo.content, search, search_mode)
+        return query, None
+
+    @staticmethod
+    def _order(query: Select, order_by: str | None, cursor: str | None, rank) -> Select:
+        """Order a todo listing; ordered listings continue with a keyset cursor."""
+        direction = sort_direction(order_by, cursor)
+        if direction:
+            return apply_keyset(query, Todo, direction, cursor)
+        if rank is not None:
+            return query.order_by(desc(rank), desc(Todo.id))
+        # 未指定排序时按 id 排序，保证分页结果稳定
+        return query.order_by(Todo.id)
+
+    async def get_all(
+        self,
+        note_id: int | None,
+        status: str | None,
+        search: str | None,
+        order_by: str | None,
+        limit: int,
+        offset: int,
+        current_user,
+        cursor: str | None = None,
+        search_mode: str | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> list[Todo]:
+        """
+        Retrieve a page of Todo items for the current user.
+        Args:
+            current_user: The user whose Todo items are to be retrieved.
+            limit (int): Maximum number of Todo items to return.
+            offset (int): Rows to skip; ignored when `cursor` is given.
+            cursor (str | None): Keyset cursor returned with the previous page.
+            search_mode (str | None): "substring" or "fuzzy" matching of `search`.
+            fields (Iterable[str] | None): Only load these columns.
+        Returns:
+            A list of Todo items associated with the current user.
+        """
+        query = select(Todo)
+        if fields:
+            query = query.options(*sparse_load_options(Todo, fields))
+
+        query, rank = self._filter(
+            query, note_id, status, search, current_user, search_mode
+        )
+        query = self._order(query, order_by, cursor, rank).limit(limit)
+        if not cursor:
+            query = query.offset(offset)
+
         result = await self.session.scalars(query)
         return list(result.all())
 
-    async def update(self, data: TodoUpdate, todo_id: int, current_user) -> Todo:
+    async def stream_all(
+        self,
+        note_id: int | None,
+        status: str | None,
+        search: str | None,
+        order_by: str | None,
+        current_user,
+        search_mode: str | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> AsyncIterator[Todo]:
+        """
+        Yield every Todo item a listing matches through a server-side cursor.
+        Rows are fetched STREAM_BATCH_SIZE at a time, so memory stays bounded no
+        matter how many Todo items the user has.
+        """
+        query = select(Todo)
+        if fields:
+            query = query.options(*sparse_load_options(Todo, fields))
+
+        query, rank = self._filter(
+            query, note_id, status, search, current_user, search_mode
+        )
+        query = self._order(query, order_by, None, rank)
+
+        result = await self.session.stream_scalars(
+            query.execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for todo in result:
+            yield todo
+
+    async def get_list_version(
+        self,
+        note_id: int | None,
+        status: str | None,
+        search: str | None,
+        current_user,
+        search_mode: str | None = None,
+    ) -> tuple:
         """
-        Update a Todo item with the given data.
+        Aggregate the todos matched by a listing, for conditional GETs.
+        Returns:
+            tuple: (count, max(updated_at)) of the matched todos; any create,
+            update or delete in the set changes it.
+        """
+        query, _ = self._filter(
+            select(func.count(Todo.id), func.max(Todo.updated_at)),
+            note_id, status, search, current_user, search_mode,
+        )
+        result = await self.session.execute(query)
+        return tuple(result.one())
+
+    async def update(self, data: TodoUpdate, todo_id: int, current_user):
+        """
+        Update a Todo item with the given data, in one round trip.
         Args:
             data (TodoUpdate): The data to update the Todo item with.
             todo_id (int): The ID of the Todo item to update.
             current_user: The current user performing the update.
         Returns:
-            Todo: The updated Todo item.
+            Row: The updated Todo item's columns.
         Raises:
             NotFoundException: If the Todo item with the given ID is not found or does not belong to the current user.
             ValueError: If there are no fields to update.
         """
-        query = select(Todo).where(Todo.id == todo_id, Todo.user_id == current_user.id)
-        result = await self.session.scalars(query)
-        todo = result.one_or_none()
-        if not todo:
-            raise NotFoundException(
-                f"Todo with id {todo_id} not found or does not belong to the current user"
-            )
         update_data = data.model_dump(exclude_unset=True, exclude_none=True)
         update_data.pop("id", None)
         update_data.pop("user_id", None)
         update_data.pop("note_id", None)
         if not update_data:
             raise ValueError("No fields to update")
-        for key, value in update_data.items():
-            setattr(todo, key, value)
-        await self.session.commit()
-        await self.session.refresh(todo)
+        todo = await update_returning(
+            self.session, Todo, todo_id, current_user.id, update_data
+        )
+        if not todo:
+            raise NotFoundException(
+                f"Todo with id {todo_id} not found or does not belong to the current user"
+            )
         return todo
 
-    async def delete(self, todo_id: int, current_user) -> None:
+    async def bulk_set_completed(
+        self, todo_ids: list[int], is_completed: bool, current_user
+    ) -> list:
+        """
+        Set is_completed on many Todo items with one UPDATE scoped to the current user.
+        Returns:
+            list: (id, note_id) rows of the Todo items that were updated; ids that
+            do not exist or belong to another user are absent.
+        """
+        query = (
+            update(Todo)
+            .where(Todo.user_id == current_user.id, Todo.id.in_(todo_ids))
+            .values(is_completed=is_completed)
+            .returning(Todo.id, Todo.note_id)
+        )
+        result = await self.session.execute(
+            query, execution_options={"synchronize_session": False}
+        )
+        rows = list(result.all())
+        await self.session.commit()
+        return rows
+
+    async def bulk_delete(self, todo_ids: list[int], current_user) -> list:
+        """
+        Delete many Todo items with one DELETE scoped to the current user.
+        Returns:
+            list: (id, note_id) rows of the Todo items that were deleted.
+        """
+        query = (
+            delete(Todo)
+            .where(Todo.user_id == current_user.id, Todo.id.in_(todo_ids))
+            .returning(Todo.id, Todo.note_id)
+        )
+        result = await self.session.execute(
+            query, execution_options={"synchronize_session": False}
+        )
+        rows = list(result.all())
+        await self.session.commit()
+        return rows
+
+    async def delete(self, todo_id: int, current_user) -> int | None:
         """
         Deletes a todo item from the database.
         Args:
             todo_id (int): The ID of the todo item to delete.
             current_user: The current authenticated user.
+        Returns:
+            int | None: The ID of the note the todo item belonged to, if any.
         Raises:
             NotFoundException: If the todo item is not found or does not belong to the current user.
         """
@@ -131,5 +320,7 @@ class TodoRepository:
         if not todo or todo.user_id != current_user.id:
             raise NotFoundException(f"Todo with id {todo_id} not found")
 
+        note_id = todo.note_id
         await self.session.delete(todo)
         await self.session.commit()
+        return note_id
@@ -12,6 +12,7 @@ from app.service.attachment_service import AttachmentService
 from app.repository.attachment_repo import AttachmentRepository
 from app.schemas.schemas import UserResponse, AttachmentResponse, PresignedUrlResponse
 from app.schemas.param_schemas import AttachmentQueryParams
+from app.utils.fieldsets import sparse_response
 
 
 logger = get_logger(__name__)
@@ -115,8 +116,11 @@ async def get_all_attachments(
             limit=params.limit,
             offset=params.offset,
             current_user=current_user,
+            fields=params.fields,
         )
         logger.info(f"Retrieved {len(all_attachments)} attachments")
+        if params.fields:
+            return sparse_response(all_attachments)
         return all_attachments
     except Exception as e:
         logger.error(f"Failed to fetch all attachments: {str(e)}")
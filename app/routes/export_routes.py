@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import get_session_factory
+from app.core.logging import get_logger
+from app.core.user_manage import get_current_user
+from app.repository.export_repo import ExportRepository
+from app.service.export_service import ExportService
+from app.schemas.schemas import UserResponse
+from app.utils.streaming import (
+    NDJSON_MEDIA_TYPE,
+    accepts_gzip,
+    gzip_chunks,
+    ndjson_lines,
+)
+
+
+# Set up logger for this module
+logger = get_logger(__name__)
+
+
+router = APIRouter(
+    prefix="/export", tags=["Export"], dependencies=[Depends(get_current_user)]
+)
+
+
+@router.get("", response_class=StreamingResponse)
+async def export_data(
+    request: Request,
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    current_user: UserResponse = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Export all tags, notes, note/tag links, todos and reminders as NDJSON.
+    Each line is {"type": ..., "data": {...}}. The body is gzip-compressed when
+    the client's Accept-Encoding allows it.
+    """
+
+    async def records():
+        async with session_factory() as session:
+            service = ExportService(ExportRepository(session))
+            async for record in service.stream_export(current_user):
+                yield record
+
+    body = ndjson_lines(records())
+    headers = {
+        "Content-Disposition": 'attachment; filename="memenote-export.ndjson"',
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_gzip(request.headers.get("Accept-Encoding")):
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    logger.info(f"Exporting data for user {current_user.id}")
+    return StreamingResponse(body, media_type=NDJSON_MEDIA_TYPE, headers=headers)
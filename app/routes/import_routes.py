@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, File, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.logging import get_logger
+from app.core.user_manage import get_current_user
+from app.repository.import_repo import ImportRepository
+from app.service.import_service import ImportService
+from app.schemas.schemas import ImportJobResponse, UserResponse
+
+
+# Set up logger for this module
+logger = get_logger(__name__)
+
+
+router = APIRouter(
+    prefix="/imports", tags=["Imports"], dependencies=[Depends(get_current_user)]
+)
+
+
+def get_import_service(session: AsyncSession = Depends(get_db)) -> ImportService:
+    """Dependency for getting ImportService instance."""
+    repository = ImportRepository(session)
+    return ImportService(repository)
+
+
+@router.post(
+    "", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def create_import(
+    file: UploadFile = File(..., description="NDJSON file or ZIP of NDJSON files"),
+    service: ImportService = Depends(get_import_service),
+    current_user: UserResponse = Depends(get_current_user),
+) -> ImportJobResponse:
+    """
+    Import notes in bulk. Each line is a JSON note:
+    {"title": ..., "content": ..., "tags": ["name"], "todos": [{"content": ...}]}.
+    """
+    try:
+        job = await service.create_import(file=file, current_user=current_user)
+        logger.info(f"Queued import job {job.id}")
+        return job
+    except Exception as e:
+        logger.error(f"Failed to queue import: {str(e)}")
+        raise
+
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+async def get_import(
+    job_id: int,
+    service: ImportService = Depends(get_import_service),
+    current_user: UserResponse = Depends(get_current_user),
+) -> ImportJobResponse:
+    """Get the status and progress of an import job."""
+    try:
+        return await service.get_import(job_id=job_id, current_user=current_user)
+    except Exception as e:
+        logger.error(f"Failed to get import job {job_id}: {str(e)}")
+        raise
+
+
+@router.post(
+    "/{job_id}/resume",
+    response_model=ImportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def resume_import(
+    job_id: int,
+    service: ImportService = Depends(get_import_service),
+    current_user: UserResponse = Depends(get_current_user),
+) -> ImportJobResponse:
+    """Resume a failed or stuck import job from its last committed batch."""
+    try:
+        job = await service.resume_import(job_id=job_id, current_user=current_user)
+        logger.info(f"Resumed import job {job_id}")
+        return job
+    except Exception as e:
+        logger.error(f"Failed to resume import job {job_id}: {str(e)}")
+        raise
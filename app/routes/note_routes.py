@@ -1,6 +1,6 @@
-from typing import Annotated
+from typing import Annotated, Union
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
@@ -9,13 +9,20 @@ from app.core.user_manage import get_current_user
 from app.repository.note_repo import NoteRepository
 from app.service.note_service import NoteService
 from app.schemas.schemas import (
+    NoteBulkCreate,
+    NoteBulkCreateResponse,
+    NoteBulkTag,
+    NoteBulkTagResponse,
     NoteCreate,
     NoteUpdate,
     NoteResponse,
+    NoteSummaryResponse,
     UserResponse,
 )
-from app.schemas.param_schemas import NoteQueryParams
+from app.schemas.param_schemas import NoteQueryParams, NoteViewParams
 from app.routes import attachment_routes
+from app.utils.etag import etag_matches, make_etag, not_modified
+from app.utils.fieldsets import sparse_response
 
 
 # Set up logger for this module
@@ -52,39 +59,118 @@ async def create_note(
         raise
 
 
-@router.get("", response_model=list[NoteResponse])
+@router.post("/bulk", response_model=NoteBulkCreateResponse)
+async def bulk_create_notes(
+    data: NoteBulkCreate,
+    service: NoteService = Depends(get_note_service),
+    current_user: UserResponse = Depends(get_current_user),
+) -> NoteBulkCreateResponse:
+    """Create many notes at once; duplicate contents are reported per item."""
+    try:
+        result = await service.bulk_create_notes(data.items, current_user=current_user)
+        logger.info(
+            f"Bulk created {result.created} notes, skipped {result.duplicates} duplicates"
+        )
+        return result
+    except Exception as e:
+        logger.error(f"Failed to bulk create notes: {str(e)}")
+        raise
+
+
+@router.post("/bulk/tags", response_model=NoteBulkTagResponse)
+async def bulk_tag_notes(
+    data: NoteBulkTag,
+    service: NoteService = Depends(get_note_service),
+    current_user: UserResponse = Depends(get_current_user),
+) -> NoteBulkTagResponse:
+    """[Tags] Attach or detach tags across many notes at once."""
+    try:
+        result = await service.bulk_tag_notes(data, current_user=current_user)
+        logger.info(
+            f"Bulk {data.action} tags {data.tag_ids}: {result.affected} links on {result.notes} notes"
+        )
+        return result
+    except Exception as e:
+        logger.error(f"Failed to bulk {data.action} tags: {str(e)}")
+        raise
+
+
+@router.get("", response_model=Union[list[NoteResponse], list[NoteSummaryResponse]])
 async def get_all_notes(
     params: Annotated[NoteQueryParams, Query()],
+    request: Request,
+    response: Response,
     service: NoteService = Depends(get_note_service),
     current_user: UserResponse = Depends(get_current_user),
-) -> list[NoteResponse]:
-    """Get all notes."""
+) -> list[NoteResponse | NoteSummaryResponse]:
+    """
+    Get all notes. Ordered listings return the next page cursor in X-Next-Cursor.
+    Supports If-None-Match; the 304 check only fingerprints the page.
+    """
     try:
-        all_notes = await service.get_notes(
+        version = await service.get_notes_version(
+            search=params.search,
+            order_by=params.order_by,
+            tag_id=params.tag_id,
+            limit=params.limit,
+            offset=params.offset,
+            current_user=current_user,
+            cursor=params.cursor,
+            relations=params.relations(),
+            fields=params.fields,
+        )
+        etag = make_etag(version, sorted(request.query_params.multi_items()))
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return not_modified(etag)
+        all_notes, next_cursor = await service.get_notes(
             search=params.search,
             order_by=params.order_by,
             tag_id=params.tag_id,
             limit=params.limit,
             offset=params.offset,
             current_user=current_user,
+            cursor=params.cursor,
+            view=params.view,
+            relations=params.relations(),
+            fields=params.fields,
         )
+        headers = {"ETag": etag}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
         logger.info(f"Retrieved {len(all_notes)} notes")
+        if params.fields:
+            return sparse_response(all_notes, headers=headers)
+        response.headers.update(headers)
         return all_notes
     except Exception as e:
         logger.error(f"Failed to fetch all notes: {str(e)}")
         raise
 
 
-@router.get("/{note_id}", response_model=NoteResponse)
+@router.get("/{note_id}", response_model=Union[NoteResponse, NoteSummaryResponse])
 async def get_note(
     note_id: int,
+    params: Annotated[NoteViewParams, Query()],
+    request: Request,
+    response: Response,
     service: NoteService = Depends(get_note_service),
     current_user: UserResponse = Depends(get_current_user),
-) -> NoteResponse:
-    """Get note by id."""
+) -> NoteResponse | NoteSummaryResponse:
+    """Get note by id. Supports If-None-Match without loading the note's relations."""
     try:
-        note = await service.get_note(note_id=note_id, current_user=current_user)
+        version = await service.get_note_version(note_id, current_user)
+        etag = make_etag(version, params.view, sorted(params.relations()))
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return not_modified(etag)
+        note = await service.get_note(
+            note_id=note_id,
+            current_user=current_user,
+            view=params.view,
+            relations=params.relations(),
+            version=version,
+        )
         logger.info(f"Retrieved note {note_id}")
+        response.headers["ETag"] = etag
         return note
     except Exception as e:
         logger.error(f"Failed to get note {note_id}: {str(e)}")
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.database import get_db
 from app.repository.note_repo import NoteRepository
@@ -18,12 +22,23 @@ def get_note_service(session: AsyncSession = Depends(get_db)) -> NoteService:
 @router.get("/notes/{share_code}", response_model=NoteResponse)
 async def get_shared_note(
     share_code: str,
+    response: Response,
     service: NoteService = Depends(get_note_service),
 ):
     try:
         note = await service.get_note_by_share_code(share_code)
         logger.info(f"Retrieved shared note {share_code}")
+        # 允许代理/CDN 短暂缓存，且不超过分享的过期时间
+        now = datetime.now(timezone.utc)
+        max_age = settings.SHARE_CACHE_MAX_AGE
+        if note.share_expires_at:
+            remaining = int((note.share_expires_at - now).total_seconds())
+            max_age = max(0, min(max_age, remaining))
+        response.headers["Cache-Control"] = f"public, max-age={max_age}"
+        response.headers["Expires"] = format_datetime(
+            now + timedelta(seconds=max_age), usegmt=True
+        )
         return note
     except Exception as e:
         logger.error(f"Failed to get shared note: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -1,8 +1,9 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.database import get_db
+from app.core.database import get_db, get_session_factory
 from app.core.logging import get_logger
 from app.core.user_manage import get_current_user
 from app.core.dependencies import get_note_id
@@ -14,7 +15,9 @@ from app.schemas.schemas import (
     ReminderResponse,
     UserResponse,
 )
-from app.schemas.param_schemas import ReminderQueryParams
+from app.schemas.param_schemas import ReminderFilterParams, ReminderQueryParams
+from app.utils.fieldsets import sparse_response
+from app.utils.streaming import NDJSON_MEDIA_TYPE, ndjson_lines
 
 
 # Set up logger for this module
@@ -54,25 +57,62 @@ async def create_reminder(
 @router.get("/reminders", response_model=list[ReminderResponse])
 async def get_all_reminders(
     params: Annotated[ReminderQueryParams, Query()],
+    response: Response,
     note_id: int | None = Depends(get_note_id),
     service: ReminderService = Depends(get_reminder_service),
     current_user: UserResponse = Depends(get_current_user),
 ) -> list[ReminderResponse]:
-    """Get all reminders."""
+    """Get a page of reminders. Ordered listings return the next page cursor in X-Next-Cursor."""
     try:
-        all_reminders = await service.get_reminders(
+        all_reminders, next_cursor = await service.get_reminders(
             note_id=note_id,
             search=params.search,
             order_by=params.order_by,
+            limit=params.limit,
+            offset=params.offset,
             current_user=current_user,
+            cursor=params.cursor,
+            search_mode=params.search_mode,
+            fields=params.fields,
         )
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
         logger.info(f"Retrieved {len(all_reminders)} reminders")
+        if params.fields:
+            return sparse_response(all_reminders, headers=headers)
+        if headers:
+            response.headers.update(headers)
         return all_reminders
     except Exception as e:
         logger.error(f"Failed to fetch all reminders: {str(e)}")
         raise
 
 
+@router.get("/reminders/stream", response_class=StreamingResponse)
+async def stream_reminders(
+    params: Annotated[ReminderFilterParams, Query()],
+    note_id: int | None = Depends(get_note_id),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    current_user: UserResponse = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream every matching reminder as NDJSON, for clients that need the whole list."""
+
+    async def reminders():
+        async with session_factory() as session:
+            service = ReminderService(ReminderRepository(session))
+            async for reminder in service.stream_reminders(
+                note_id=note_id,
+                search=params.search,
+                order_by=params.order_by,
+                current_user=current_user,
+                search_mode=params.search_mode,
+                fields=params.fields,
+            ):
+                yield reminder
+
+    logger.info(f"Streaming reminders for user {current_user.id}")
+    return StreamingResponse(ndjson_lines(reminders()), media_type=NDJSON_MEDIA_TYPE)
+
+
 @router.get("/reminders/{reminder_id}", response_model=ReminderResponse)
 async def get_reminder(
     reminder_id: int,
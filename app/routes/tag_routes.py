@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
@@ -15,6 +15,8 @@ from app.schemas.schemas import (
     UserResponse,
 )
 from app.schemas.param_schemas import TagQueryParams
+from app.utils.etag import etag_matches, make_etag, not_modified
+from app.utils.fieldsets import sparse_response
 
 
 
@@ -53,19 +55,36 @@ async def create_tag(
 @router.get("", response_model=list[TagResponse])
 async def get_all_tags(
     params: Annotated[TagQueryParams, Query()],
+    request: Request,
+    response: Response,
     service: TagService = Depends(get_tag_service),
     current_user: UserResponse = Depends(get_current_user),
 ) -> list[TagResponse]:
-    """Get all tags."""
+    """Get all tags. Supports If-None-Match."""
     try:
+        version = await service.get_tags_version(
+            search=params.search,
+            current_user=current_user,
+            search_mode=params.search_mode,
+            with_counts=params.needs_counts(),
+        )
+        etag = make_etag(version, sorted(request.query_params.multi_items()))
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return not_modified(etag)
         all_tags = await service.get_tags(
             search=params.search,
             order_by=params.order_by,
             limit=params.limit,
             offset=params.offset,
             current_user=current_user,
+            search_mode=params.search_mode,
+            fields=params.fields,
+            with_counts=params.needs_counts(),
         )
         logger.info(f"Retrieved {len(all_tags)} tags")
+        if params.fields:
+            return sparse_response(all_tags, headers={"ETag": etag})
+        response.headers["ETag"] = etag
         return all_tags
     except Exception as e:
         logger.error(f"Failed to fetch all tags: {str(e)}")
@@ -75,13 +94,19 @@ async def get_all_tags(
 @router.get("/{tag_id}", response_model=TagResponse)
 async def get_tag(
     tag_id: int,
+    request: Request,
+    response: Response,
     service: TagService = Depends(get_tag_service),
     current_user: UserResponse = Depends(get_current_user),
 ) -> TagResponse:
-    """Get tag by id."""
+    """Get tag by id. Supports If-None-Match."""
     try:
         tag = await service.get_tag(tag_id=tag_id, current_user=current_user)
         logger.info(f"Retrieved tag {tag_id}")
+        etag = make_etag(tag.id, tag.updated_at, tag.note_count)
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
         return tag
     except Exception as e:
         logger.error(f"Failed to get tag {tag_id}: {str(e)}")
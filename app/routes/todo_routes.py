@@ -1,16 +1,29 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.database import get_db
+from app.core.database import get_db, get_session_factory
 from app.core.logging import get_logger
 from app.core.user_manage import get_current_user
 from app.core.dependencies import get_note_id
 from app.repository.todo_repo import TodoRepository
 from app.service.todo_service import TodoService
-from app.schemas.schemas import TodoCreate, TodoUpdate, TodoResponse, UserResponse
-from app.schemas.param_schemas import TodoQueryParams
+from app.schemas.schemas import (
+    BulkResponse,
+    TodoBulkComplete,
+    TodoBulkCreate,
+    TodoBulkIds,
+    TodoCreate,
+    TodoUpdate,
+    TodoResponse,
+    UserResponse,
+)
+from app.schemas.param_schemas import TodoFilterParams, TodoQueryParams
+from app.utils.etag import etag_matches, make_etag, not_modified
+from app.utils.fieldsets import sparse_response
+from app.utils.streaming import NDJSON_MEDIA_TYPE, ndjson_lines
 
 
 # Set up logger for this module
@@ -45,39 +58,158 @@ async def create_todo(
         raise
 
 
+# 批量路由需声明在 /todos/{todo_id} 之前，避免 "bulk" 被当作 todo_id 匹配
+@router.post(
+    "/todos/bulk",
+    response_model=list[TodoResponse],
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_todos(
+    data: TodoBulkCreate,
+    note_id: int | None = Depends(get_note_id),
+    service: TodoService = Depends(get_todo_service),
+    current_user: UserResponse = Depends(get_current_user),
+) -> list[TodoResponse]:
+    """Create many todos at once."""
+    try:
+        created_todos = await service.bulk_create_todos(
+            items=data.items, note_id=note_id, current_user=current_user
+        )
+        logger.info(f"Bulk created {len(created_todos)} todos")
+        return created_todos
+    except Exception as e:
+        logger.error(f"Failed to bulk create todos: {str(e)}")
+        raise
+
+
+@router.patch("/todos/bulk", response_model=BulkResponse)
+async def bulk_complete_todos(
+    data: TodoBulkComplete,
+    service: TodoService = Depends(get_todo_service),
+    current_user: UserResponse = Depends(get_current_user),
+) -> BulkResponse:
+    """Set is_completed on many todos at once."""
+    try:
+        result = await service.bulk_set_completed(
+            todo_ids=data.ids, is_completed=data.is_completed, current_user=current_user
+        )
+        logger.info(f"Bulk updated {result.affected} todos")
+        return result
+    except Exception as e:
+        logger.error(f"Failed to bulk update todos: {str(e)}")
+        raise
+
+
+@router.post("/todos/bulk/delete", response_model=BulkResponse)
+async def bulk_delete_todos(
+    data: TodoBulkIds,
+    service: TodoService = Depends(get_todo_service),
+    current_user: UserResponse = Depends(get_current_user),
+) -> BulkResponse:
+    """Delete many todos at once."""
+    try:
+        result = await service.bulk_delete_todos(
+            todo_ids=data.ids, current_user=current_user
+        )
+        logger.info(f"Bulk deleted {result.affected} todos")
+        return result
+    except Exception as e:
+        logger.error(f"Failed to bulk delete todos: {str(e)}")
+        raise
+
+
 @router.get("/todos", response_model=list[TodoResponse])
 async def get_all_todos(    
     params: Annotated[TodoQueryParams, Query()],
+    request: Request,
+    response: Response,
     note_id: int | None = Depends(get_note_id),
     service: TodoService = Depends(get_todo_service),
     current_user: UserResponse = Depends(get_current_user),
 ) -> list[TodoResponse]:
-    """Get all todos."""
+    """
+    Get a page of todos. Ordered listings return the next page cursor in X-Next-Cursor.
+    Supports If-None-Match.
+    """
     try:
-        all_todos = await service.get_todos(
+        version = await service.get_todos_version(
+            note_id=note_id,
+            status=params.status,
+            search=params.search,
+            current_user=current_user,
+            search_mode=params.search_mode,
+        )
+        etag = make_etag(version, sorted(request.query_params.multi_items()))
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return not_modified(etag)
+        all_todos, next_cursor = await service.get_todos(
             note_id=note_id,
             status=params.status,
             search=params.search,
             order_by=params.order_by,
+            limit=params.limit,
+            offset=params.offset,
             current_user=current_user,
+            cursor=params.cursor,
+            search_mode=params.search_mode,
+            fields=params.fields,
         )
+        headers = {"ETag": etag}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
         logger.info(f"Retrieved {len(all_todos)} todos")
+        if params.fields:
+            return sparse_response(all_todos, headers=headers)
+        response.headers.update(headers)
         return all_todos
     except Exception as e:
         logger.error(f"Failed to fetch all todos: {str(e)}")
         raise
 
 
+@router.get("/todos/stream", response_class=StreamingResponse)
+async def stream_todos(
+    params: Annotated[TodoFilterParams, Query()],
+    note_id: int | None = Depends(get_note_id),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    current_user: UserResponse = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream every matching todo as NDJSON, for clients that need the whole list."""
+
+    async def todos():
+        async with session_factory() as session:
+            service = TodoService(TodoRepository(session))
+            async for todo in service.stream_todos(
+                note_id=note_id,
+                status=params.status,
+                search=params.search,
+                order_by=params.order_by,
+                current_user=current_user,
+                search_mode=params.search_mode,
+                fields=params.fields,
+            ):
+                yield todo
+
+    logger.info(f"Streaming todos for user {current_user.id}")
+    return StreamingResponse(ndjson_lines(todos()), media_type=NDJSON_MEDIA_TYPE)
+
+
 @router.get("/todos/{todo_id}", response_model=TodoResponse)
 async def get_todo(
     todo_id: int,
+    request: Request,
+    response: Response,
     service: TodoService = Depends(get_todo_service),
     current_user: UserResponse = Depends(get_current_user),
 ) -> TodoResponse:
-    """Get todo by id."""
+    """Get todo by id. Supports If-None-Match."""
     try:
         todo = await service.get_todo(todo_id=todo_id, current_user=current_user)
         logger.info(f"Retrieved todo {todo_id}")
+        etag = make_etag(todo.id, todo.updated_at)
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
         return todo
     except Exception as e:
         logger.error(f"Failed to get todo {todo_id}: {str(e)}")
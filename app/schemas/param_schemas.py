@@ -1,5 +1,27 @@
-from typing import Annotated, Literal
-from pydantic import BaseModel, Field
+from typing import Annotated, ClassVar, Literal, get_args
+from pydantic import BaseModel, Field, field_validator
+
+from app.schemas.schemas import (
+    AttachmentResponse,
+    NoteResponse,
+    ReminderResponse,
+    TagResponse,
+    TodoResponse,
+)
+
+
+# 笔记可按需加载的关联关系
+NoteRelation = Literal["tags", "todos", "reminders", "attachments"]
+NOTE_RELATIONS: tuple[str, ...] = get_args(NoteRelation)
+
+
+def split_comma_separated(value):
+    """Accept both ?key=a,b and ?key=a&key=b for list-valued query parameters."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = [value]
+    return [item.strip() for part in value for item in part.split(",") if item.strip()]
 
 
 # 基类，包含所有路由共享的查询参数
@@ -13,16 +35,110 @@ class CommonQueryParams(BaseModel):
     ]
 
 
-class NoteQueryParams(CommonQueryParams):
+# 稀疏字段集：只查询并返回客户端需要的字段
+class SparseFieldsParams(BaseModel):
+    response_model: ClassVar[type[BaseModel]]
+
+    fields: Annotated[
+        set[str] | None,
+        Field(
+            default=None,
+            description="Comma separated fields to return, e.g. id,title,updated_at",
+        ),
+    ]
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def split_fields(cls, value):
+        fields = split_comma_separated(value)
+        if fields is None:
+            return None
+        unknown = set(fields) - set(cls.response_model.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return fields
+
+
+# 控制笔记响应的详略程度
+class NoteViewParams(BaseModel):
+    view: Annotated[
+        Literal["full", "summary"],
+        Field(
+            default="full",
+            description="summary returns id, title, timestamps and sharing info only",
+        ),
+    ]
+    include: Annotated[
+        set[NoteRelation] | None,
+        Field(
+            default=None,
+            description="Relations to load in the full view, e.g. tags,todos. Default: all",
+        ),
+    ]
+
+    @field_validator("include", mode="before")
+    @classmethod
+    def split_include(cls, value):
+        return split_comma_separated(value)
+
+    def relations(self) -> frozenset[str]:
+        """The relations that have to be loaded for this view."""
+        if self.view == "summary":
+            return frozenset()
+        if self.include is None:
+            return frozenset(NOTE_RELATIONS)
+        return frozenset(self.include)
+
+
+class NoteQueryParams(CommonQueryParams, NoteViewParams, SparseFieldsParams):
+    response_model = NoteResponse
+
     tag_id: Annotated[int | None, Field(default=None, description="Filter by tag ID")]
     limit: Annotated[
         int,
         Field(default=20, ge=1, le=100, description="Number of notes per page"),
     ]  # 默认每页20条,可被覆盖
     offset: Annotated[int, Field(default=0, ge=0, description="Offset for pagination")]
+    cursor: Annotated[
+        str | None,
+        Field(
+            default=None,
+            description="Opaque cursor from the X-Next-Cursor header, replaces offset",
+        ),
+    ]
 
 
-class TodoQueryParams(CommonQueryParams):    
+# 支持模糊搜索的列表查询参数
+class FuzzySearchQueryParams(CommonQueryParams):
+    search_mode: Annotated[
+        Literal["substring", "fuzzy"],
+        Field(
+            default="substring",
+            description="substring: match the exact text anywhere; fuzzy: typo-tolerant similarity match",
+        ),
+    ]
+
+
+# 列表分页参数，limit 的上限即服务端单页最大条数
+class PageParams(BaseModel):
+    limit: Annotated[
+        int,
+        Field(default=20, ge=1, le=100, description="Number of items per page"),
+    ]
+    offset: Annotated[int, Field(default=0, ge=0, description="Offset for pagination")]
+    cursor: Annotated[
+        str | None,
+        Field(
+            default=None,
+            description="Opaque cursor from the X-Next-Cursor header, replaces offset",
+        ),
+    ]
+
+
+# 过滤参数单独成类，供不分页的流式接口复用
+class TodoFilterParams(FuzzySearchQueryParams, SparseFieldsParams):
+    response_model = TodoResponse
+
     status: Annotated[
         Literal["finished", "unfinished"] | None,
         Field(
@@ -32,11 +148,21 @@ class TodoQueryParams(CommonQueryParams):
     ]
 
 
-class ReminderQueryParams(CommonQueryParams):
+class TodoQueryParams(TodoFilterParams, PageParams):
     pass
 
 
-class AttachmentQueryParams(BaseModel):
+class ReminderFilterParams(FuzzySearchQueryParams, SparseFieldsParams):
+    response_model = ReminderResponse
+
+
+class ReminderQueryParams(ReminderFilterParams, PageParams):
+    pass
+
+
+class AttachmentQueryParams(SparseFieldsParams):
+    response_model = AttachmentResponse
+
     order_by: Annotated[
         Literal["created_at desc", "created_at asc"] | None,
         Field(default=None, description="Order by field"),
@@ -46,9 +172,29 @@ class AttachmentQueryParams(BaseModel):
         Field(default=20, ge=1, le=100, description="Number of attachments per page"),
     ]  # 默认每页20条,可被覆盖
     offset: Annotated[int, Field(default=0, ge=0, description="Offset for pagination")]
-    
-    
-class TagQueryParams(CommonQueryParams):
+
+
+class TagQueryParams(FuzzySearchQueryParams, SparseFieldsParams):
+    response_model = TagResponse
+
+    order_by: Annotated[
+        Literal["created_at desc", "created_at asc", "note_count desc", "note_count asc"]
+        | None,
+        Field(default=None, description="Order by field, note_count sorts by usage"),
+    ]
+    with_counts: Annotated[
+        bool,
+        Field(default=False, description="Include note_count, the number of notes per tag"),
+    ]
+
+    def needs_counts(self) -> bool:
+        """note_count is computed when asked for, sorted by or selected in fields."""
+        return (
+            self.with_counts
+            or (self.order_by or "").startswith("note_count")
+            or "note_count" in (self.fields or ())
+        )
+
     limit: Annotated[
         int,
         Field(default=20, ge=1, le=100, description="Number of notes per page"),
@@ -1,3 +1,5 @@
+from typing import Annotated, Literal
+
 from pydantic import BaseModel, ConfigDict, Field, computed_field
 from datetime import datetime
 
@@ -6,6 +8,10 @@ from fastapi_users import schemas
 from app.core.config import settings
 
 
+# 批量接口单次请求的最大条目数
+BULK_MAX_ITEMS = 500
+
+
 # 配置基类，启用 ORM 模式
 class BaseSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -43,19 +49,15 @@ class NoteUpdate(BaseModel):
     content: str | None = None
 
 
-class NoteResponse(BaseSchema):
+# 精简视图，不含正文和关联数据，用于标题列表
+class NoteSummaryResponse(BaseSchema):
     id: int
     user_id: int
     title: str
-    content: str
     created_at: datetime
     updated_at: datetime
     share_code: str | None = None
     share_expires_at: datetime | None = None
-    tags: list["TagResponseForNote"] | None = None
-    todos: list["TodoResponse"] | None = None
-    reminders: list["ReminderResponse"] | None = None
-    attachments: list["AttachmentResponse"] | None = None
 
     @computed_field
     def share_url(self) -> str | None:
@@ -64,6 +66,43 @@ class NoteResponse(BaseSchema):
         return None
 
 
+class NoteResponse(NoteSummaryResponse):
+    content: str
+    tags: list["TagResponseForNote"] | None = None
+    todos: list["TodoResponse"] | None = None
+    reminders: list["ReminderResponse"] | None = None
+    attachments: list["AttachmentResponse"] | None = None
+
+
+class NoteBulkCreate(BaseModel):
+    items: list[NoteCreate] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class NoteBulkCreateResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    status: Literal["created", "duplicate"]
+    note: NoteSummaryResponse | None = None
+    detail: str | None = None
+
+
+class NoteBulkCreateResponse(BaseModel):
+    created: int
+    duplicates: int
+    results: list[NoteBulkCreateResult]
+
+
+class NoteBulkTag(BaseModel):
+    note_ids: list[int] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+    tag_ids: list[int] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+    action: Literal["attach", "detach"] = "attach"
+
+
+class NoteBulkTagResponse(BaseModel):
+    action: Literal["attach", "detach"]
+    affected: int = Field(..., description="Note-tag links created or removed")
+    notes: int = Field(..., description="Notes whose tags changed")
+
+
 # 待办事项相关模型
 class TodoCreate(BaseModel):
     content: str = Field(..., max_length=255)
@@ -74,6 +113,28 @@ class TodoUpdate(BaseModel):
     is_completed: bool | None = None
 
 
+class TodoBulkCreate(BaseModel):
+    items: list[TodoCreate] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class TodoBulkIds(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class TodoBulkComplete(TodoBulkIds):
+    is_completed: bool = True
+
+
+class BulkItemResult(BaseModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found"]
+
+
+class BulkResponse(BaseModel):
+    affected: int
+    results: list[BulkItemResult]
+
+
 class TodoResponse(BaseSchema):
     id: int
     user_id: int
@@ -158,3 +219,64 @@ class TagResponse(TagResponseForNote):
     user_id: int
     created_at: datetime
     updated_at: datetime
+    note_count: int | None = Field(
+        None, description="Number of notes with this tag, when requested"
+    )
+
+
+# 数据导出：NDJSON 每行一条记录，type 标明 data 的种类
+class TagExport(TagResponseForNote):
+    created_at: datetime
+    updated_at: datetime
+
+
+class NoteExport(BaseSchema):
+    id: int
+    title: str
+    content: str
+    share_code: str | None = None
+    share_expires_at: datetime | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class NoteTagExport(BaseSchema):
+    note_id: int
+    tag_id: int
+
+
+class ExportRecord(BaseModel):
+    type: Literal["tag", "note", "note_tag", "todo", "reminder"]
+    data: TagExport | NoteExport | NoteTagExport | TodoResponse | ReminderResponse
+
+
+# 批量导入：输入文件每行一条笔记，标签按名称解析，待办随笔记一起导入
+class ImportTodo(BaseModel):
+    content: str = Field(..., max_length=255)
+    is_completed: bool = False
+
+
+class ImportNote(BaseModel):
+    title: str = Field(..., max_length=100)
+    content: str
+    tags: list[Annotated[str, Field(min_length=1, max_length=50)]] = Field(
+        default_factory=list, description="Tag names, created if missing"
+    )
+    todos: list[ImportTodo] = Field(default_factory=list)
+    created_at: datetime | None = None
+
+
+class ImportJobResponse(BaseSchema):
+    id: int
+    status: Literal["pending", "running", "completed", "failed"]
+    original_filename: str
+    size: int
+    processed_lines: int = Field(..., description="Input lines committed so far")
+    notes_imported: int
+    duplicates: int = Field(..., description="Notes skipped because the content already exists")
+    tags_created: int
+    todos_imported: int
+    failed_lines: int = Field(..., description="Lines that were not valid JSON notes")
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
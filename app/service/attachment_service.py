@@ -1,11 +1,14 @@
 import uuid
+from collections.abc import Iterable
 from datetime import datetime, timedelta, timezone
 from urllib.parse import quote
 
 from fastapi import UploadFile, HTTPException
 from fastapi.responses import StreamingResponse
 from botocore.exceptions import ClientError
+from pydantic import BaseModel
 
+from app.core.cache import note_cache
 from app.core.logging import get_logger
 from app.core.config import settings
 from app.core.s3_client import s3_client
@@ -16,6 +19,7 @@ from app.schemas.schemas import (
     AttachmentResponse,
     PresignedUrlResponse,
 )
+from app.utils.fieldsets import sparse_model
 
 logger = get_logger(__name__)
 
@@ -90,6 +94,7 @@ class AttachmentService:
             new_attachment = await self.repository.create(
                 attachment_data, note_id, current_user
             )
+            await note_cache.invalidate(note_id)
             return AttachmentResponse.model_validate(new_attachment)
         except Exception as e:
             # 数据库失败后尝试清理已上传的文件
@@ -119,17 +124,22 @@ class AttachmentService:
         limit: int,
         offset: int,
         current_user,
-    ) -> list[AttachmentResponse]:
+        fields: Iterable[str] | None = None,
+    ) -> list[BaseModel]:
         attachments = await self.repository.get_all(
             note_id=note_id,
             order_by=order_by,
             limit=limit,
             offset=offset,
             current_user=current_user,
+            fields=fields,
         )
-        return [
-            AttachmentResponse.model_validate(attachment) for attachment in attachments
-        ]
+        model = (
+            sparse_model(AttachmentResponse, frozenset(fields))
+            if fields
+            else AttachmentResponse
+        )
+        return [model.model_validate(attachment) for attachment in attachments]
 
     async def delete_attachment(
         self, attachment_id: int, note_id: int, current_user
@@ -139,6 +149,7 @@ class AttachmentService:
             attachment_id=attachment_id, note_id=note_id, current_user=current_user
         )
         await self.repository.delete(attachment.id, current_user)
+        await note_cache.invalidate(note_id)
         logger.info(f"Deleted attachment record {attachment_id} from database")
 
         # 再删除文件
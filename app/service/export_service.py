@@ -0,0 +1,45 @@
+from collections.abc import AsyncIterator
+
+from app.core.metrics import metrics
+from app.repository.export_repo import ExportRepository
+from app.schemas.schemas import (
+    ExportRecord,
+    NoteExport,
+    NoteTagExport,
+    ReminderResponse,
+    TagExport,
+    TodoResponse,
+)
+
+
+class ExportService:
+    def __init__(self, repository: ExportRepository):
+        """Service layer for exporting all of a user's data."""
+
+        self.repository = repository
+
+    async def stream_export(self, current_user) -> AsyncIterator[ExportRecord]:
+        """
+        Yield every tag, note, note/tag link, todo and reminder of the user.
+        Tags come before the notes and links that reference them, so the records
+        can be imported again in order. Rows are yielded as the database returns
+        them; nothing is collected in memory.
+        Args:
+            current_user: The user whose data is exported.
+        Returns:
+            AsyncIterator[ExportRecord]: One record per row.
+        """
+        await self.repository.begin_snapshot()
+        sections = (
+            ("tag", TagExport, self.repository.stream_tags),
+            ("note", NoteExport, self.repository.stream_notes),
+            ("note_tag", NoteTagExport, self.repository.stream_note_tags),
+            ("todo", TodoResponse, self.repository.stream_todos),
+            ("reminder", ReminderResponse, self.repository.stream_reminders),
+        )
+        for record_type, model, stream in sections:
+            count = 0
+            async for row in stream(current_user):
+                count += 1
+                yield ExportRecord(type=record_type, data=model.model_validate(row))
+            metrics.incr(f"export.{record_type}_records", count)
@@ -0,0 +1,201 @@
+import json
+import tempfile
+import uuid
+import zipfile
+from asyncio import to_thread
+from collections.abc import Iterator
+from typing import IO
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.exceptions import BadRequestException
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.core.s3_client import s3_client
+from app.repository.import_repo import ImportRepository
+from app.schemas.schemas import ImportJobResponse, ImportNote
+from app.service.outbox_service import outbox_relay
+
+logger = get_logger(__name__)
+
+# ZIP 包内按文件名顺序读取这些后缀的成员，保证断点对应的行号稳定
+IMPORT_MEMBER_SUFFIXES = (".ndjson", ".jsonl", ".json")
+
+
+def iter_import_lines(fileobj: IO[bytes]) -> Iterator[bytes]:
+    """
+    Yield the raw lines of an NDJSON file, or of the NDJSON members of a ZIP archive.
+    Lines are read one at a time, so memory does not grow with the file size.
+    """
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as archive:
+            for name in sorted(archive.namelist()):
+                if not name.lower().endswith(IMPORT_MEMBER_SUFFIXES):
+                    continue
+                with archive.open(name) as member:
+                    yield from member
+        return
+    fileobj.seek(0)
+    yield from fileobj
+
+
+def parse_import_line(line: bytes) -> ImportNote | None:
+    """Parse one input line; None if it is not a valid note."""
+    try:
+        return ImportNote.model_validate(json.loads(line))
+    except (ValueError, ValidationError):
+        return None
+
+
+class ImportService:
+    def __init__(self, repository: ImportRepository):
+        """Service layer for bulk imports."""
+
+        self.repository = repository
+
+    async def create_import(self, file: UploadFile, current_user) -> ImportJobResponse:
+        """
+        Store an uploaded NDJSON or ZIP file in MinIO and queue an import job for it.
+        Args:
+            file (UploadFile): The file to import, one JSON note per line.
+            current_user: The user who owns the imported notes.
+        Returns:
+            ImportJobResponse: The queued job; poll it for progress.
+        """
+        original_filename = file.filename or f"unnamed_{uuid.uuid4()}"
+        file.file.seek(0, 2)
+        size = file.file.tell()
+        file.file.seek(0)
+        if size == 0:
+            raise BadRequestException("Import file is empty")
+
+        suffix = ".zip" if zipfile.is_zipfile(file.file) else ".ndjson"
+        file.file.seek(0)
+        object_name = f"imports/{uuid.uuid4()}{suffix}"
+        try:
+            await to_thread(
+                s3_client.upload_fileobj,
+                Fileobj=file.file,
+                Bucket=settings.MINIO_BUCKET,
+                Key=object_name,
+            )
+        except ClientError as e:
+            logger.error(f"Failed to upload import file {original_filename}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"S3 upload failed: {str(e)}")
+
+        job = await self.repository.create_job(
+            object_name=object_name,
+            original_filename=original_filename,
+            size=size,
+            current_user=current_user,
+        )
+        outbox_relay.notify()
+        return ImportJobResponse.model_validate(job)
+
+    async def get_import(self, job_id: int, current_user) -> ImportJobResponse:
+        job = await self.repository.get_job(job_id, current_user)
+        return ImportJobResponse.model_validate(job)
+
+    async def resume_import(self, job_id: int, current_user) -> ImportJobResponse:
+        """
+        Queue a failed or stuck job again; it continues after the last committed batch.
+        A pending or running job counts as stuck once it has made no progress
+        for IMPORT_STALE_AFTER seconds, e.g. after its worker crashed.
+        Raises:
+            BadRequestException: If the job is completed or still making progress.
+        """
+        job = await self.repository.get_job(job_id, current_user)
+        if not await self.repository.resume_job(job.id, settings.IMPORT_STALE_AFTER):
+            raise BadRequestException(
+                f"Import job {job_id} is {job.status} and cannot be resumed"
+            )
+        outbox_relay.notify()
+        await self.repository.session.refresh(job)
+        return ImportJobResponse.model_validate(job)
+
+    async def run_import(self, job_id: int) -> None:
+        """
+        Run an import job; called by the import worker.
+        The file is spooled from MinIO to a local temporary file and parsed line by
+        line. Every IMPORT_BATCH_SIZE lines are loaded and checkpointed in one
+        transaction, so a crashed or failed job resumes after its last batch.
+        Args:
+            job_id (int): The job to run.
+        """
+        job = await self.repository.get_job_for_worker(job_id)
+        if job is None or job.status == "completed":
+            return
+        job_id, user_id, object_name = job.id, job.user_id, job.object_name
+        start = job.processed_lines
+        await self.repository.set_status(job_id, "running")
+        logger.info(f"Import job {job_id} started at line {start}")
+
+        try:
+            with tempfile.TemporaryFile() as spool:
+                await to_thread(
+                    s3_client.download_fileobj,
+                    Bucket=settings.MINIO_BUCKET,
+                    Key=object_name,
+                    Fileobj=spool,
+                )
+                batch, failed, line_no = [], 0, start
+                for line_no, line in enumerate(iter_import_lines(spool), start=1):
+                    if line_no <= start:
+                        continue
+                    if line.strip():
+                        note = parse_import_line(line)
+                        if note is None:
+                            failed += 1
+                        else:
+                            batch.append((line_no, note))
+                    if line_no - start >= settings.IMPORT_BATCH_SIZE:
+                        if not await self._load(job_id, user_id, start, line_no, batch, failed):
+                            return
+                        start, batch, failed = line_no, [], 0
+                if line_no > start:
+                    if not await self._load(job_id, user_id, start, line_no, batch, failed):
+                        return
+        except Exception as e:
+            await self.repository.session.rollback()
+            await self.repository.set_status(job_id, "failed", error=str(e))
+            metrics.incr("import.jobs_failed")
+            logger.error(f"Import job {job_id} failed: {str(e)}")
+            raise
+
+        await self.repository.set_status(job_id, "completed")
+        metrics.incr("import.jobs_completed")
+        logger.info(f"Import job {job_id} completed after {line_no} lines")
+        try:
+            await to_thread(
+                s3_client.delete_object, Bucket=settings.MINIO_BUCKET, Key=object_name
+            )
+        except ClientError as e:
+            logger.error(f"Failed to clean up import file {object_name}: {str(e)}")
+
+    async def _load(
+        self,
+        job_id: int,
+        user_id: int,
+        start: int,
+        end: int,
+        batch: list,
+        failed: int,
+    ) -> bool:
+        counts = await self.repository.load_batch(
+            job_id=job_id,
+            user_id=user_id,
+            start_line=start,
+            end_line=end,
+            notes=batch,
+            failed_lines=failed,
+        )
+        if counts is None:
+            logger.warning(f"Import job {job_id} was advanced past line {start} elsewhere, stopping")
+            return False
+        for key, value in counts.items():
+            metrics.incr(f"import.{key}", value)
+        return True
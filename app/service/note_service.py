@@ -1,5 +1,51 @@
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from pydantic import BaseModel
+
+from app.core.cache import invalidate_note_owner, note_cache, share_cache
+from app.core.exceptions import NotFoundException
+from app.models.models import Note
 from app.repository.note_repo import NoteRepository
-from app.schemas.schemas import NoteCreate, NoteUpdate, NoteResponse
+from app.schemas.param_schemas import NOTE_RELATIONS
+from app.schemas.schemas import (
+    NoteBulkCreateResponse,
+    NoteBulkCreateResult,
+    NoteBulkTag,
+    NoteBulkTagResponse,
+    NoteCreate,
+    NoteUpdate,
+    NoteResponse,
+    NoteSummaryResponse,
+)
+from app.utils.etag import make_etag
+from app.utils.fieldsets import sparse_model
+from app.utils.pagination import next_cursor, sort_direction
+
+
+def to_note_response(
+    note: Note | NoteResponse, view: str = "full", relations: Iterable[str] | None = None
+) -> NoteResponse | NoteSummaryResponse:
+    """
+    Serialize a note, or narrow a cached full response, for the requested view.
+    Relations that were not requested come back as null rather than an empty
+    list, so clients can tell "not loaded" from "has none".
+    """
+    if isinstance(note, NoteResponse):
+        # 缓存中的完整响应，按视图裁剪即可，无需再查库
+        if view == "summary":
+            return NoteSummaryResponse.model_validate(
+                note.model_dump(include=set(NoteSummaryResponse.model_fields))
+            )
+        response = note
+    elif view == "summary":
+        return NoteSummaryResponse.model_validate(note)
+    else:
+        response = NoteResponse.model_validate(note)
+    if relations is not None:
+        skipped = {name: None for name in NOTE_RELATIONS if name not in relations}
+        response = response.model_copy(update=skipped)
+    return response
 
 
 class NoteService:
@@ -20,17 +66,81 @@ class NoteService:
         new_note = await self.repository.create(data, current_user)
         return NoteResponse.model_validate(new_note)
 
-    async def get_note(self, note_id: int, current_user) -> NoteResponse:
+    async def bulk_create_notes(
+        self, items: list[NoteCreate], current_user
+    ) -> NoteBulkCreateResponse:
+        """
+        Create many notes in one statement and one transaction.
+        Items whose content the user already has are reported as duplicates
+        instead of failing the batch.
+        Args:
+            items (list[NoteCreate]): The notes to create.
+            current_user: The user who is creating the notes.
+        Returns:
+            NoteBulkCreateResponse: Per-item results, in request order.
+        """
+        rows = await self.repository.bulk_create(items, current_user)
+        results = [
+            NoteBulkCreateResult(
+                index=index, status="created", note=NoteSummaryResponse.model_validate(row)
+            )
+            if row is not None
+            else NoteBulkCreateResult(
+                index=index,
+                status="duplicate",
+                detail=f"Note with content {item.content} already exists",
+            )
+            for index, (item, row) in enumerate(zip(items, rows))
+        ]
+        created = sum(1 for result in results if result.status == "created")
+        return NoteBulkCreateResponse(
+            created=created, duplicates=len(results) - created, results=results
+        )
+
+    async def get_note_version(self, note_id: int, current_user) -> str:
+        """
+        Fingerprint everything the note's full response depends on, without loading
+        its relations. Used for ETags and to validate cached copies of the note.
+        Args:
+            note_id (int): The ID of the note.
+            current_user: The user requesting the note.
+        Returns:
+            str: An opaque version string that changes with every change to the note.
+        """
+        fingerprint = await self.repository.get_fingerprint(note_id, current_user)
+        return make_etag(*fingerprint)
+
+    async def get_note(
+        self,
+        note_id: int,
+        current_user,
+        view: str = "full",
+        relations: Iterable[str] | None = None,
+        version: str | None = None,
+    ) -> NoteResponse | NoteSummaryResponse:
         """
         Retrieve a note by its ID for the current user.
+        Served from the note cache when possible; only fully loaded notes are cached.
         Args:
             note_id (int): The ID of the note to retrieve.
             current_user: The user requesting the note.
+            view (str): "full" or "summary".
+            relations (Iterable[str] | None): Relations to load, None loads all of them.
+            version (str | None): Current version from `get_note_version`; cached
+                copies of other versions are ignored.
         Returns:
-            NoteResponse: The response model containing the note details.
+            NoteResponse | NoteSummaryResponse: The note in the requested view.
         """
-        note = await self.repository.get_by_id(note_id, current_user)
-        return NoteResponse.model_validate(note)
+        cached = await note_cache.get(note_id, current_user.id, version)
+        if cached is not None:
+            return to_note_response(cached, view, relations)
+        note = await self.repository.get_by_id(
+            note_id, current_user, relations=relations, summary=view == "summary"
+        )
+        response = to_note_response(note, view, relations)
+        if view == "full" and (relations is None or set(NOTE_RELATIONS) <= set(relations)):
+            await note_cache.set(response, version)  # type: ignore[arg-type]
+        return response
 
     async def get_notes(
         self,
@@ -40,13 +150,22 @@ class NoteService:
         limit: int,
         offset: int,
         current_user,
-    ) -> list[NoteResponse]:
+        cursor: str | None = None,
+        view: str = "full",
+        relations: Iterable[str] | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> tuple[list[BaseModel], str | None]:
         """
         Asynchronously retrieves a list of notes for the current user.
         Args:
             current_user: The user for whom to retrieve the notes.
+            cursor (str | None): Keyset cursor returned with the previous page.
+            view (str): "full" or "summary".
+            relations (Iterable[str] | None): Relations to load, None loads all of them.
+            fields (Iterable[str] | None): Only return these fields; overrides view and relations.
         Returns:
-            list[NoteResponse]: A list of NoteResponse objects representing the user's notes.
+            tuple[list[BaseModel], str | None]: The notes on the page and the cursor
+            of the next page, or None when there is no next page or the listing is unordered.
         """
         notes = await self.repository.get_all(
             search=search,
@@ -55,10 +174,50 @@ class NoteService:
             limit=limit,
             offset=offset,
             current_user=current_user,
+            cursor=cursor,
+            relations=relations,
+            summary=view == "summary",
+            fields=fields,
         )
-        for note in notes:
-            print(f"Note {note.id} attachments: {note.attachments}")
-        return [NoteResponse.model_validate(note) for note in notes]
+        if fields:
+            model = sparse_model(NoteResponse, frozenset(fields))
+            items = [model.model_validate(note) for note in notes]
+        else:
+            items = [to_note_response(note, view, relations) for note in notes]
+        # 游标取自 ORM 对象，稀疏字段集即使不含 created_at 也能继续翻页
+        return items, next_cursor(notes, limit, sort_direction(order_by, cursor))
+
+    async def get_notes_version(
+        self,
+        search: str | None,
+        order_by: str | None,
+        tag_id: int | None,
+        limit: int,
+        offset: int,
+        current_user,
+        cursor: str | None = None,
+        relations: Iterable[str] | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> str:
+        """
+        Fingerprint the page `get_notes` would return with the same arguments,
+        without loading the notes' content or relations.
+        Returns:
+            str: An opaque version string of the page.
+        """
+        if fields:
+            relations = set(fields) & set(NOTE_RELATIONS)
+        fingerprints = await self.repository.get_all_fingerprints(
+            search=search,
+            order_by=order_by,
+            tag_id=tag_id,
+            limit=limit,
+            offset=offset,
+            current_user=current_user,
+            cursor=cursor,
+            relations=relations,
+        )
+        return make_etag(*fingerprints)
 
     async def update_note(
         self, data: NoteUpdate, note_id: int, current_user
@@ -73,6 +232,7 @@ class NoteService:
             NoteResponse: The response model containing the updated note's details.
         """
         note = await self.repository.update(data, note_id, current_user)
+        await note_cache.invalidate(note_id)
         return NoteResponse.model_validate(note)
 
     async def delete_note(self, note_id: int, current_user) -> None:
@@ -85,29 +245,96 @@ class NoteService:
             None
         """
         await self.repository.delete(note_id, current_user)
+        await invalidate_note_owner(note_id)
+        await note_cache.invalidate(note_id)
 
     async def add_tag_to_note(
         self, note_id: int, tag_id: int, current_user
     ) -> NoteResponse:
         note = await self.repository.add_tag_to_note(note_id, tag_id, current_user)
+        await note_cache.invalidate(note_id)
         return NoteResponse.model_validate(note)
 
     async def remove_tag_from_note(
         self, note_id: int, tag_id: int, current_user
     ) -> NoteResponse:
         note = await self.repository.remove_tag_from_note(note_id, tag_id, current_user)
+        await note_cache.invalidate(note_id)
         return NoteResponse.model_validate(note)
 
+    async def bulk_tag_notes(self, data: NoteBulkTag, current_user) -> NoteBulkTagResponse:
+        """
+        Attach or detach tags across many notes in a single statement.
+        Ids of notes or tags the user does not own are ignored.
+        Args:
+            data (NoteBulkTag): The note ids, tag ids and action.
+            current_user: The user who owns the notes and tags.
+        Returns:
+            NoteBulkTagResponse: How many links and notes changed.
+        """
+        if data.action == "attach":
+            changed = await self.repository.bulk_add_tags(
+                data.note_ids, data.tag_ids, current_user
+            )
+        else:
+            changed = await self.repository.bulk_remove_tags(
+                data.note_ids, data.tag_ids, current_user
+            )
+        note_ids = set(changed)
+        await note_cache.invalidate(*note_ids)
+        return NoteBulkTagResponse(
+            action=data.action, affected=len(changed), notes=len(note_ids)
+        )
+
     async def enable_share(
         self, note_id: int, expires_in: int, current_user
     ) -> NoteResponse:
+        previous_code = await self.repository.get_share_code(note_id, current_user)
         note = await self.repository.enable_share(note_id, expires_in, current_user)
+        await note_cache.invalidate(note_id)
+        await share_cache.invalidate(previous_code, note.share_code)
         return NoteResponse.model_validate(note)
 
     async def disable_share(self, note_id: int, current_user) -> NoteResponse:
+        previous_code = await self.repository.get_share_code(note_id, current_user)
         note = await self.repository.disable_share(note_id, current_user)
+        await note_cache.invalidate(note_id)
+        await share_cache.invalidate(previous_code)
         return NoteResponse.model_validate(note)
 
     async def get_note_by_share_code(self, share_code: str) -> NoteResponse:
-        note = await self.repository.get_by_share_code(share_code)
-        return NoteResponse.model_validate(note)
+        """
+        Retrieve a publicly shared note.
+        Valid codes are resolved through the share and note caches; unknown or
+        expired codes are cached as misses for a short while.
+        Args:
+            share_code (str): The share code from the public link.
+        Returns:
+            NoteResponse: The shared note.
+        Raises:
+            NotFoundException: If the code is unknown, disabled or expired.
+        """
+        cached = await share_cache.get(share_code)
+        if isinstance(cached, str):
+            raise NotFoundException(cached)
+        if cached is not None:
+            note = await note_cache.get(cached, user_id=None)
+            # 笔记缓存随每次写入失效，这里再核对分享码和过期时间即可
+            if (
+                note is not None
+                and note.share_code == share_code
+                and (
+                    note.share_expires_at is None
+                    or note.share_expires_at > datetime.now(timezone.utc)
+                )
+            ):
+                return note
+        try:
+            note = await self.repository.get_by_share_code(share_code)
+        except NotFoundException as e:
+            await share_cache.set_missing(share_code, e.detail)
+            raise
+        response = NoteResponse.model_validate(note)
+        await note_cache.set(response)
+        await share_cache.set(share_code, response.id, response.share_expires_at)
+        return response
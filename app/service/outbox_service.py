@@ -0,0 +1,111 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.core.task_dispatcher import TaskDispatcher, TaskMessage, task_dispatcher
+from app.repository.outbox_repo import OutboxRepository
+
+logger = get_logger(__name__)
+
+
+class OutboxRelay:
+    """
+    Moves tasks from the outbox table to Celery.
+    Each pass leases a batch of due rows in one short transaction, publishes
+    them with no transaction or row lock held, then deletes the sent ones in a
+    second transaction. A broker outage therefore never pins a database
+    connection. A crash after the publish but before the delete sends the
+    batch again once the lease runs out, so delivery is at least once;
+    consumers drop repeats by task_id (the row's dedup_id).
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        dispatcher: TaskDispatcher,
+        batch_size: int,
+        retry_delay: float,
+        lease: float,
+    ):
+        self.session_factory = session_factory
+        self.dispatcher = dispatcher
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self.lease = lease
+        self._wakeup = asyncio.Event()
+
+    def notify(self) -> None:
+        """Wake the relay of this process after committing outbox rows."""
+        self._wakeup.set()
+
+    async def relay_once(self) -> int:
+        """
+        Publish one batch of due messages.
+        Returns:
+            int: The number of messages claimed.
+        """
+        async with self.session_factory() as session:
+            rows = await OutboxRepository(session).claim(self.batch_size, self.lease)
+            if not rows:
+                await session.rollback()
+                return 0
+            await session.commit()
+
+        batch = [
+            TaskMessage(
+                name=row.task_name,
+                args=row.args,
+                options={"task_id": row.dedup_id, "eta": row.eta},
+            )
+            for row in rows
+        ]
+        # 投递可能因 broker 不可用而阻塞到超时，此时不持有事务和行锁
+        failed = await self.dispatcher.publish(batch)
+        failed_ids = {message.options["task_id"] for message in failed}
+
+        async with self.session_factory() as session:
+            repository = OutboxRepository(session)
+            await repository.delete([row.id for row in rows if row.dedup_id not in failed_ids])
+            await repository.defer(
+                [row.id for row in rows if row.dedup_id in failed_ids], self.retry_delay
+            )
+            await session.commit()
+        metrics.incr("outbox.published", len(rows) - len(failed_ids))
+        if failed_ids:
+            metrics.incr("outbox.retried", len(failed_ids))
+        return len(rows)
+
+    async def run(self, interval: float) -> None:
+        """
+        Relay forever; drains back to back while full batches keep coming.
+        Any error (database, connection or publisher) is logged and counted,
+        and the next pass waits `retry_delay` seconds, so the loop never dies.
+        """
+        while True:
+            try:
+                claimed = await self.relay_once()
+            except Exception as e:
+                metrics.incr("outbox.relay_errors")
+                logger.error(f"Outbox relay failed: {str(e)}")
+                await asyncio.sleep(self.retry_delay)
+                continue
+            if claimed >= self.batch_size:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+outbox_relay = OutboxRelay(
+    SessionLocal,
+    task_dispatcher,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    retry_delay=settings.OUTBOX_RETRY_DELAY,
+    lease=settings.OUTBOX_LEASE,
+)
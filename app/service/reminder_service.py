@@ -1,7 +1,19 @@
+from collections.abc import AsyncIterator, Iterable
 from datetime import timezone
-from app.repository.reminder_repo import ReminderRepository
+
+from pydantic import BaseModel
+
+from app.core.cache import note_cache
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.core.task_dispatcher import TaskMessage, task_dispatcher
+from app.repository.reminder_repo import TRIGGER_TASK, ReminderRepository, reminder_event
+from app.service.outbox_service import outbox_relay
 from app.schemas.schemas import ReminderCreate, ReminderUpdate, ReminderResponse
-from app.core.celery_app import celery_app
+from app.utils.fieldsets import sparse_model
+from app.utils.pagination import next_cursor, sort_direction
+
+logger = get_logger(__name__)
 
 
 class ReminderService:
@@ -31,6 +43,7 @@ class ReminderService:
         # data.reminder_time = reminder_time_utc
         
         new_reminder = await self.repository.create(data, note_id, current_user)
+        await note_cache.invalidate(new_reminder.note_id)
         
         # if new_reminder.reminder_time.tzinfo is None:
         #     new_reminder.reminder_time = new_reminder.reminder_time.replace(
@@ -38,29 +51,8 @@ class ReminderService:
         #     )
         result = ReminderResponse.model_validate(new_reminder)
 
-        # 推送 CRUD 创建通知
-        reminder_data = {
-            "action": "create",
-            "reminder_id": result.id,
-            "reminder_time": result.reminder_time,
-            "message": result.message,
-            "is_acknowledged": result.is_acknowledged,
-            "is_triggered": result.is_triggered,
-            "user_id": result.user_id,
-            "note_id": result.note_id,
-        }
-        celery_app.send_task(
-            "app.tasks.reminder_task.notify_reminder_action",
-            args=[reminder_data],
-            task_id=f"notify_reminder_create_{result.id}",
-        )
-
-        celery_app.send_task(
-            "app.tasks.reminder_task.trigger_reminder",
-            args=[reminder_data],
-            eta=result.reminder_time,
-            task_id=f"trigger_reminder_{result.id}",  # 唯一任务 ID
-        )
+        # 创建通知和触发任务已随提醒一起写入发件箱，唤醒本进程的 relay 尽快投递
+        outbox_relay.notify()
 
         return result
 
@@ -81,19 +73,61 @@ class ReminderService:
         note_id: int | None,
         search: str | None,
         order_by: str | None,
+        limit: int,
+        offset: int,
         current_user,
-    ) -> list[ReminderResponse]:
+        cursor: str | None = None,
+        search_mode: str | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> tuple[list[BaseModel], str | None]:
         """
-        Retrieve all reminders for the current user.
+        Retrieve a page of reminders for the current user.
         Args:
             current_user: The user for whom to retrieve reminders.
+            cursor (str | None): Keyset cursor returned with the previous page.
         Returns:
-            A list of ReminderResponse objects representing the user's reminders.
+            tuple[list[BaseModel], str | None]: The reminders on the page and the cursor
+            of the next page, or None when there is no next page or the listing is unordered.
         """
         reminders = await self.repository.get_all(
-            note_id=note_id, search=search, order_by=order_by, current_user=current_user
+            note_id=note_id,
+            search=search,
+            order_by=order_by,
+            limit=limit,
+            offset=offset,
+            current_user=current_user,
+            cursor=cursor,
+            search_mode=search_mode,
+            fields=fields,
         )
-        return [ReminderResponse.model_validate(reminder) for reminder in reminders]
+        model = sparse_model(ReminderResponse, frozenset(fields)) if fields else ReminderResponse
+        items = [model.model_validate(reminder) for reminder in reminders]
+        return items, next_cursor(reminders, limit, sort_direction(order_by, cursor))
+
+    async def stream_reminders(
+        self,
+        note_id: int | None,
+        search: str | None,
+        order_by: str | None,
+        current_user,
+        search_mode: str | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> AsyncIterator[BaseModel]:
+        """
+        Yield every reminder a listing matches, one response model at a time.
+        Returns:
+            AsyncIterator[BaseModel]: ReminderResponse objects, or narrowed models when `fields` is given.
+        """
+        model = sparse_model(ReminderResponse, frozenset(fields)) if fields else ReminderResponse
+        async for reminder in self.repository.stream_all(
+            note_id=note_id,
+            search=search,
+            order_by=order_by,
+            current_user=current_user,
+            search_mode=search_mode,
+            fields=fields,
+        ):
+            yield model.model_validate(reminder)
 
     async def update_reminder(
         self, data: ReminderUpdate, reminder_id: int, current_user
@@ -108,21 +142,9 @@ class ReminderService:
             ReminderResponse: The updated reminder response.
         """
         reminder = await self.repository.update(data, reminder_id, current_user)
+        await note_cache.invalidate(reminder.note_id)
         result = ReminderResponse.model_validate(reminder)
-        reminder_data = {
-            "action": "update",
-            "reminder_id": result.id,
-            "reminder_time": result.reminder_time,
-            "message": result.message,
-            "is_acknowledged": result.is_acknowledged,
-            "user_id": result.user_id,
-            "note_id": result.note_id,
-        }
-        celery_app.send_task(
-            "app.tasks.reminder_task.notify_reminder_action",
-            args=[reminder_data],
-            task_id=f"notify_reminder_update_{result.id}",
-        )
+        outbox_relay.notify()
         return result
 
     async def delete_reminder(self, reminder_id: int, current_user) -> None:
@@ -134,4 +156,48 @@ class ReminderService:
         Returns:
             None
         """
-        await self.repository.delete(reminder_id, current_user)
+        note_id = await self.repository.delete(reminder_id, current_user)
+        await note_cache.invalidate(note_id)
+
+    async def trigger_due_reminders(self, batch_size: int, max_batches: int) -> int:
+        """
+        Fire trigger_reminder for every reminder that is due; called by the scheduler.
+        Each batch is claimed, published in one go and committed. If publishing
+        fails the batch is rolled back and stays due for the next run; triggers
+        that did go out are then sent again and dropped by task_id on the worker.
+        Args:
+            batch_size (int): Reminders claimed per transaction.
+            max_batches (int): Upper bound on batches per call, so one run stays short.
+        Returns:
+            int: The number of reminders triggered.
+        """
+        triggered = 0
+        for _ in range(max_batches):
+            reminders = await self.repository.claim_due(batch_size)
+            if not reminders:
+                await self.repository.session.rollback()
+                break
+            failed = await task_dispatcher.publish(
+                [
+                    TaskMessage(
+                        name=TRIGGER_TASK,
+                        args=[reminder_event(reminder, "trigger")],
+                        # 同一提醒改期后会再次触发，去重 ID 带上触发时间
+                        options={
+                            "task_id": f"trigger_reminder_{reminder.id}_{int(reminder.reminder_time.timestamp())}"
+                        },
+                    )
+                    for reminder in reminders
+                ]
+            )
+            if failed:
+                await self.repository.session.rollback()
+                metrics.incr("reminder_scheduler.publish_failures")
+                logger.error(f"Failed to publish {len(failed)} reminder triggers, will retry")
+                break
+            await self.repository.session.commit()
+            triggered += len(reminders)
+            if len(reminders) < batch_size:
+                break
+        metrics.incr("reminder_scheduler.triggered", triggered)
+        return triggered
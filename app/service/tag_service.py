@@ -1,5 +1,12 @@
+from collections.abc import Iterable
+
+from pydantic import BaseModel
+
+from app.core.cache import note_cache
 from app.repository.tag_repo import TagRepository
 from app.schemas.schemas import TagCreate, TagUpdate, TagResponse
+from app.utils.etag import make_etag
+from app.utils.fieldsets import sparse_model
 
 
 class TagService:
@@ -25,7 +32,10 @@ class TagService:
         limit: int,
         offset: int,
         current_user,
-    ) -> list[TagResponse]:
+        search_mode: str | None = None,
+        fields: Iterable[str] | None = None,
+        with_counts: bool = False,
+    ) -> list[BaseModel]:
         
         tags = await self.repository.get_all(
             search=search,
@@ -33,17 +43,39 @@ class TagService:
             limit=limit,
             offset=offset,
             current_user=current_user,
+            search_mode=search_mode,
+            fields=fields,
+            with_counts=with_counts,
         )
-        
-        return [TagResponse.model_validate(tag) for tag in tags]
+        model = sparse_model(TagResponse, frozenset(fields)) if fields else TagResponse
+        return [model.model_validate(tag) for tag in tags]
+
+    async def get_tags_version(
+        self,
+        search: str | None,
+        current_user,
+        search_mode: str | None = None,
+        with_counts: bool = False,
+    ) -> str:
+        aggregate = await self.repository.get_list_version(
+            search=search,
+            current_user=current_user,
+            search_mode=search_mode,
+            with_counts=with_counts,
+        )
+        return make_etag(*aggregate)
 
     async def update_tag(
         self, data: TagUpdate, tag_id: int, current_user
     ) -> TagResponse:
         
         tag = await self.repository.update(data, tag_id, current_user)
+        # 标签名嵌在笔记响应里，改名后带该标签的笔记缓存都要失效
+        await note_cache.invalidate(*await self.repository.get_note_ids(tag_id))
         return TagResponse.model_validate(tag)
 
     async def delete_tag(self, tag_id: int, current_user) -> None:
         
+        note_ids = await self.repository.get_note_ids(tag_id)
         await self.repository.delete(tag_id, current_user)
+        await note_cache.invalidate(*note_ids)
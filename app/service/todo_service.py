@@ -1,5 +1,20 @@
+from collections.abc import AsyncIterator, Iterable
+from typing import Literal
+
+from pydantic import BaseModel
+
+from app.core.cache import note_cache
 from app.repository.todo_repo import TodoRepository
-from app.schemas.schemas import TodoCreate, TodoUpdate, TodoResponse
+from app.schemas.schemas import (
+    BulkItemResult,
+    BulkResponse,
+    TodoCreate,
+    TodoUpdate,
+    TodoResponse,
+)
+from app.utils.etag import make_etag
+from app.utils.fieldsets import sparse_model
+from app.utils.pagination import next_cursor, sort_direction
 
 
 class TodoService:
@@ -22,8 +37,25 @@ class TodoService:
             TodoResponse: The response model containing the details of the newly created todo item.
         """
         new_todo = await self.repository.create(data, note_id, current_user)
+        await note_cache.invalidate(new_todo.note_id)
         return TodoResponse.model_validate(new_todo)
 
+    async def bulk_create_todos(
+        self, items: list[TodoCreate], note_id: int | None, current_user
+    ) -> list[TodoResponse]:
+        """
+        Create many todo items in one statement and one transaction.
+        Args:
+            items (list[TodoCreate]): The todo items to create.
+            note_id (int | None): The ID of the note to attach them to, if any.
+            current_user: The current user creating the todo items.
+        Returns:
+            list[TodoResponse]: The created todo items, in request order.
+        """
+        todos = await self.repository.bulk_create(items, note_id, current_user)
+        await note_cache.invalidate(note_id)
+        return [TodoResponse.model_validate(todo) for todo in todos]
+
     async def get_todo(self, todo_id: int, current_user) -> TodoResponse:
         """
         Retrieve a todo item by its ID for the current user.
@@ -43,23 +75,86 @@ class TodoService:
         status: str | None,
         search: str | None,
         order_by: str | None,
+        limit: int,
+        offset: int,
         current_user,
-    ) -> list[TodoResponse]:
+        cursor: str | None = None,
+        search_mode: str | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> tuple[list[BaseModel], str | None]:
         """
-        Asynchronously retrieves a list of todos for the current user.
+        Asynchronously retrieves a page of todos for the current user.
         Args:
             current_user: The user for whom to retrieve the todos.
+            cursor (str | None): Keyset cursor returned with the previous page.
         Returns:
-            list[TodoResponse]: A list of TodoResponse objects representing the todos.
+            tuple[list[BaseModel], str | None]: The todos on the page and the cursor
+            of the next page, or None when there is no next page or the listing is unordered.
         """
         todos = await self.repository.get_all(
             note_id=note_id,
             status=status,
             search=search,
             order_by=order_by,
+            limit=limit,
+            offset=offset,
             current_user=current_user,
+            cursor=cursor,
+            search_mode=search_mode,
+            fields=fields,
         )
-        return [TodoResponse.model_validate(todo) for todo in todos]
+        model = sparse_model(TodoResponse, frozenset(fields)) if fields else TodoResponse
+        items = [model.model_validate(todo) for todo in todos]
+        return items, next_cursor(todos, limit, sort_direction(order_by, cursor))
+
+    async def stream_todos(
+        self,
+        note_id: int | None,
+        status: str | None,
+        search: str | None,
+        order_by: str | None,
+        current_user,
+        search_mode: str | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> AsyncIterator[BaseModel]:
+        """
+        Yield every todo a listing matches, one response model at a time.
+        Returns:
+            AsyncIterator[BaseModel]: TodoResponse objects, or narrowed models when `fields` is given.
+        """
+        model = sparse_model(TodoResponse, frozenset(fields)) if fields else TodoResponse
+        async for todo in self.repository.stream_all(
+            note_id=note_id,
+            status=status,
+            search=search,
+            order_by=order_by,
+            current_user=current_user,
+            search_mode=search_mode,
+            fields=fields,
+        ):
+            yield model.model_validate(todo)
+
+    async def get_todos_version(
+        self,
+        note_id: int | None,
+        status: str | None,
+        search: str | None,
+        current_user,
+        search_mode: str | None = None,
+    ) -> str:
+        """
+        Version of the set of todos a listing matches, without loading them.
+        Returns:
+            str: An opaque version string for building the listing's ETag.
+        """
+        aggregate = await self.repository.get_list_version(
+            note_id=note_id,
+            status=status,
+            search=search,
+            current_user=current_user,
+            search_mode=search_mode,
+        )
+        return make_etag(*aggregate)
 
     async def update_todo(
         self, data: TodoUpdate, todo_id: int, current_user
@@ -74,7 +169,43 @@ class TodoService:
             TodoResponse: The updated todo item validated against the TodoResponse model.
         """
         todo = await self.repository.update(data, todo_id, current_user)
+        await note_cache.invalidate(todo.note_id)
         return TodoResponse.model_validate(todo)
 
+    async def bulk_set_completed(
+        self, todo_ids: list[int], is_completed: bool, current_user
+    ) -> BulkResponse:
+        """
+        Mark many todo items as finished or unfinished in one statement.
+        Returns:
+            BulkResponse: Per-id results; ids the user does not own are not_found.
+        """
+        rows = await self.repository.bulk_set_completed(
+            todo_ids, is_completed, current_user
+        )
+        return await self._bulk_response(todo_ids, rows, "updated")
+
+    async def bulk_delete_todos(self, todo_ids: list[int], current_user) -> BulkResponse:
+        """
+        Delete many todo items in one statement.
+        Returns:
+            BulkResponse: Per-id results; ids the user does not own are not_found.
+        """
+        rows = await self.repository.bulk_delete(todo_ids, current_user)
+        return await self._bulk_response(todo_ids, rows, "deleted")
+
+    @staticmethod
+    async def _bulk_response(
+        todo_ids: list[int], rows: list, status: Literal["updated", "deleted"]
+    ) -> BulkResponse:
+        await note_cache.invalidate(*{row.note_id for row in rows})
+        affected = {row.id for row in rows}
+        results = [
+            BulkItemResult(id=todo_id, status=status if todo_id in affected else "not_found")
+            for todo_id in dict.fromkeys(todo_ids)
+        ]
+        return BulkResponse(affected=len(affected), results=results)
+
     async def delete_todo(self, todo_id: int, current_user) -> None:
-        await self.repository.delete(todo_id, current_user)
+        note_id = await self.repository.delete(todo_id, current_user)
+        await note_cache.invalidate(note_id)
@@ -0,0 +1,36 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import redis
+
+from app.core.config import settings
+
+
+dedup_client = redis.from_url(f"redis://{settings.REDIS_HOST}/0", health_check_interval=30)
+
+
+@contextmanager
+def deduplicate(task_id: str | None) -> Iterator[bool]:
+    """
+    Guard a task body against repeated deliveries of the same task_id.
+    Outbox messages are delivered at least once, so a task may arrive again
+    after it already ran. Yields False for a repeat; the body should then skip
+    its side effects. While the body runs the id is only held for
+    TASK_DEDUP_PENDING_TTL seconds, so a worker that dies mid-task does not
+    swallow the redelivery; it is kept for TASK_DEDUP_TTL once the body
+    succeeds, and released right away if the body raises.
+    """
+    if not task_id:
+        yield True
+        return
+    key = f"task_done:{task_id}"
+    if not dedup_client.set(key, 1, nx=True, ex=settings.TASK_DEDUP_PENDING_TTL):
+        print(f"Skipping duplicate delivery of task {task_id}")
+        yield False
+        return
+    try:
+        yield True
+    except BaseException:
+        dedup_client.delete(key)
+        raise
+    dedup_client.expire(key, settings.TASK_DEDUP_TTL)
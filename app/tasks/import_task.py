@@ -0,0 +1,28 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.celery_app import celery_app
+from app.core.database import POSTGRES_DATABASE_URL
+from app.repository.import_repo import ImportRepository
+from app.service.import_service import ImportService
+
+
+async def _run_import(job_id: int) -> None:
+    # 每次任务都在新的事件循环中运行，asyncpg 连接不能跨循环复用，因此不使用连接池
+    engine = create_async_engine(POSTGRES_DATABASE_URL, poolclass=NullPool)
+    try:
+        session_factory = async_sessionmaker(
+            class_=AsyncSession, expire_on_commit=False, bind=engine
+        )
+        async with session_factory() as session:
+            await ImportService(ImportRepository(session)).run_import(job_id)
+    finally:
+        await engine.dispose()
+
+
+# acks_late: worker 崩溃时任务重新投递，从最后提交的批次继续
+@celery_app.task(name="app.tasks.import_task.run_import", acks_late=True)
+def run_import(job_id: int):
+    asyncio.run(_run_import(job_id))
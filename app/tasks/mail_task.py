@@ -2,13 +2,14 @@ import resend
 
 from app.core.config import settings
 from app.core.celery_app import celery_app
+from app.tasks.dedup import deduplicate
 
 
 resend.api_key = settings.RESEND_API_KEY
 
 
-@celery_app.task()
-def register_email(user_data: dict):
+@celery_app.task(bind=True)
+def register_email(self, user_data: dict):
     params: resend.Emails.SendParams = {
         "from": "onboarding@resend.dev",
         "to": [user_data["email"]],
@@ -35,4 +36,6 @@ def register_email(user_data: dict):
         </div>    
     """,
     }
-    resend.Emails.send(params)
+    with deduplicate(self.request.id) as first:
+        if first:
+            resend.Emails.send(params)
@@ -5,6 +5,7 @@ from datetime import datetime
 import redis
 
 from app.core.celery_app import celery_app
+from app.tasks.dedup import deduplicate
 
 redis_host = os.getenv("REDIS_HOST", "localhost:6379")
 REDIS_URL = f"redis://{redis_host}/0"
@@ -22,24 +23,34 @@ class CustomJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
-@celery_app.task(name="app.tasks.reminder_task.notify_reminder_action")
-def notify_reminder_action(message: dict):
-    # user_id = message["user_id"]
-    # channel = f"reminder_notifications_{user_id}"
-    channel = "reminder_notifications"
-    print(f"Publishing to {channel}: {message}")
-    message_json = json.dumps(message, cls=CustomJSONEncoder)
-    # 发布到 Pub/Sub 频道
-    redis_client.publish(channel, message_json)
-
-
-@celery_app.task(name="app.tasks.reminder_task.trigger_reminder")
-def trigger_reminder(reminder_data: dict):
-    reminder_data["action"] = "trigger"
-    # user_id = reminder_data["user_id"]
-    # channel = f"reminder_notifications_{user_id}"
-    channel = "reminder_notifications"
-    print(f"Publishing to {channel}: {reminder_data}")
-    message_json = json.dumps(reminder_data, cls=CustomJSONEncoder)
-    # 发布到 Pub/Sub 频道
-    redis_client.publish(channel, message_json)
+@celery_app.task(bind=True, name="app.tasks.reminder_task.notify_reminder_action")
+def notify_reminder_action(self, message: dict):
+    with deduplicate(self.request.id) as first:
+        if not first:
+            return
+        # user_id = message["user_id"]
+        # channel = f"reminder_notifications_{user_id}"
+        channel = "reminder_notifications"
+        print(f"Publishing to {channel}: {message}")
+        message_json = json.dumps(message, cls=CustomJSONEncoder)
+        # 发布到 Pub/Sub 频道
+        redis_client.publish(channel, message_json)
+
+
+@celery_app.task(bind=True, name="app.tasks.reminder_task.trigger_reminder")
+def trigger_reminder(self, reminder_data: dict):
+    # 调度器投递的触发任务不带 ETA，带 ETA 的都是旧的按提醒调度的任务，提醒可能已改期或删除
+    if self.request.eta:
+        print(f"Dropping legacy ETA trigger {self.request.id}")
+        return
+    with deduplicate(self.request.id) as first:
+        if not first:
+            return
+        reminder_data["action"] = "trigger"
+        # user_id = reminder_data["user_id"]
+        # channel = f"reminder_notifications_{user_id}"
+        channel = "reminder_notifications"
+        print(f"Publishing to {channel}: {reminder_data}")
+        message_json = json.dumps(reminder_data, cls=CustomJSONEncoder)
+        # 发布到 Pub/Sub 频道
+        redis_client.publish(channel, message_json)
@@ -0,0 +1,63 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import POSTGRES_DATABASE_URL
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.repository.reminder_repo import TRIGGER_TASK, ReminderRepository
+from app.service.reminder_service import ReminderService
+
+logger = get_logger(__name__)
+
+
+async def _trigger_due_reminders() -> int:
+    # 每次任务都在新的事件循环中运行，asyncpg 连接不能跨循环复用，因此不使用连接池
+    engine = create_async_engine(POSTGRES_DATABASE_URL, poolclass=NullPool)
+    try:
+        session_factory = async_sessionmaker(
+            class_=AsyncSession, expire_on_commit=False, bind=engine
+        )
+        async with session_factory() as session:
+            return await ReminderService(ReminderRepository(session)).trigger_due_reminders(
+                batch_size=settings.REMINDER_SCHEDULER_BATCH_SIZE,
+                max_batches=settings.REMINDER_SCHEDULER_MAX_BATCHES,
+            )
+    finally:
+        await engine.dispose()
+
+
+# 由 celery beat 周期性投递；多个 worker 同时执行时靠 SKIP LOCKED 领取不同的提醒
+@celery_app.task(name="app.tasks.scheduler_task.trigger_due_reminders")
+def trigger_due_reminders() -> int:
+    return asyncio.run(_trigger_due_reminders())
+
+
+# 一次性任务，部署调度器后手动执行一次，不放在 beat 中：inspect 会阻塞 worker 线程等待回复
+@celery_app.task(name="app.tasks.scheduler_task.reconcile_reminder_triggers")
+def reconcile_reminder_triggers() -> int:
+    """
+    Revoke every ETA trigger_reminder task that workers still hold.
+    Reminders are fired by the scheduler now, so such tasks are leftovers of
+    per-reminder scheduling and refer to reminders that may have moved or gone.
+    Revoking only flags the ids on each worker; the messages stay in the
+    worker's timer until they fall due and are dropped, or until the worker
+    restarts and discards them on redelivery (needs a worker --statedb so the
+    flags survive the restart).
+    """
+    inspector = celery_app.control.inspect(timeout=settings.REMINDER_RECONCILE_TIMEOUT)
+    scheduled = inspector.scheduled() or {}
+    task_ids = [
+        entry["request"]["id"]
+        for entries in scheduled.values()
+        for entry in entries
+        if entry["request"]["name"] == TRIGGER_TASK
+    ]
+    if task_ids:
+        celery_app.control.revoke(task_ids)
+        logger.info(f"Revoked {len(task_ids)} orphaned reminder triggers")
+    metrics.incr("reminder_scheduler.revoked", len(task_ids))
+    return len(task_ids)
@@ -0,0 +1,57 @@
+from collections.abc import Iterable
+from functools import lru_cache
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import Column, inspect
+from sqlalchemy.orm import load_only, noload, selectinload
+
+
+@lru_cache(maxsize=128)
+def sparse_model(model: type[BaseModel], fields: frozenset[str]) -> type[BaseModel]:
+    """
+    Build (once per field set) a copy of `model` narrowed to `fields`.
+    `id` is always kept so clients can address the rows they receive.
+    """
+    definitions = {
+        name: (info.annotation, info)
+        for name, info in model.model_fields.items()
+        if name in fields or name == "id"
+    }
+    return create_model(
+        f"{model.__name__}Sparse",
+        __config__=ConfigDict(from_attributes=True),
+        __module__=model.__module__,  # 在原模块中解析前向引用的类型
+        **definitions,
+    )  # type: ignore[call-overload]
+
+
+def sparse_load_options(entity, fields: Iterable[str]) -> list:
+    """
+    Loader options that only SELECT the requested columns of `entity`.
+    id and created_at are always loaded because cursors are built from them.
+    Relationships are selectin-loaded only when asked for and skipped otherwise.
+    Columns that were not selected raise on access instead of lazy loading, so a
+    field slipping into the narrowed response model fails loudly.
+    """
+    fields = set(fields)
+    mapper = inspect(entity)
+    columns = [
+        getattr(entity, attr.key)
+        for attr in mapper.column_attrs
+        # query_expression() 属性没有对应的表列，由仓储层通过 with_expression 填充
+        if isinstance(attr.expression, Column)
+        and (attr.key in fields or attr.key in ("id", "created_at"))
+    ]
+    options = [load_only(*columns, raiseload=True)]
+    for relationship in mapper.relationships:
+        attr = getattr(entity, relationship.key)
+        options.append(selectinload(attr) if relationship.key in fields else noload(attr))
+    return options
+
+
+def sparse_response(items: list[BaseModel], headers: dict | None = None) -> JSONResponse:
+    """Serialize narrowed models directly, bypassing the route's full response_model."""
+    return JSONResponse(
+        content=[item.model_dump(mode="json") for item in items], headers=headers
+    )
@@ -0,0 +1,93 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import Select, asc, desc, tuple_
+
+from app.core.exceptions import BadRequestException
+
+
+# 流式导出时服务端游标每次拉取的行数
+STREAM_BATCH_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, last_id: int, direction: str) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+    Args:
+        created_at (datetime): created_at of the last row on the page.
+        last_id (int): id of the last row on the page.
+        direction (str): Sort direction of the page, "asc" or "desc".
+    Returns:
+        str: A URL-safe cursor string.
+    """
+    payload = json.dumps(
+        {"c": created_at.isoformat(), "i": last_id, "d": direction},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int, str]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    Args:
+        cursor (str): The opaque cursor string sent by the client.
+    Returns:
+        tuple[datetime, int, str]: (created_at, id, direction) of the last row seen.
+    Raises:
+        BadRequestException: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        created_at = datetime.fromisoformat(payload["c"])
+        last_id = int(payload["i"])
+        direction = payload["d"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise BadRequestException("Invalid cursor")
+    if direction not in ("asc", "desc"):
+        raise BadRequestException("Invalid cursor")
+    return created_at, last_id, direction
+
+
+def sort_direction(order_by: str | None, cursor: str | None) -> str | None:
+    """
+    Resolve the (created_at, id) sort direction of a listing.
+    The direction stored in the cursor wins, so follow-up pages keep the order of
+    the first page even if the client drops `order_by`. Returns None for
+    unordered listings, which cannot be continued with a cursor.
+    """
+    if cursor:
+        return decode_cursor(cursor)[2]
+    if order_by == "created_at desc":
+        return "desc"
+    if order_by == "created_at asc":
+        return "asc"
+    return None
+
+
+def apply_keyset(query: Select, model, direction: str, cursor: str | None) -> Select:
+    """
+    Order a query by (created_at, id) and, given a cursor, seek past the last row seen.
+    The row-value comparison lets Postgres walk a (..., created_at, id) index
+    straight to the next page instead of counting off skipped rows.
+    """
+    key = tuple_(model.created_at, model.id)
+    if cursor:
+        created_at, last_id, _ = decode_cursor(cursor)
+        if direction == "asc":
+            query = query.where(key > tuple_(created_at, last_id))
+        else:
+            query = query.where(key < tuple_(created_at, last_id))
+    order = asc if direction == "asc" else desc
+    return query.order_by(order(model.created_at), order(model.id))
+
+
+def next_cursor(items: list, limit: int, direction: str | None) -> str | None:
+    """Build the cursor for the page after `items`, or None if this was the last page."""
+    if direction is None or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id, direction)
@@ -0,0 +1,64 @@
+import re
+
+from sqlalchemy import Select, func, literal, or_
+
+
+# 笔记全文检索使用的文本搜索配置，'simple' 不做词干化；
+# 但它按空格和标点切词，一段连续的中日韩文字只是一个词，搜其中的词无法命中
+NOTE_SEARCH_CONFIG = "simple"
+
+# 平假名/片假名、CJK 统一表意文字（含扩展 A 和兼容区）、韩文音节
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]")
+
+
+def contains_cjk(search: str) -> bool:
+    """Whether the text has CJK characters, which full-text search cannot split into words."""
+    return _CJK.search(search) is not None
+
+
+def to_prefix_tsquery(search: str) -> str | None:
+    """
+    Turn free text typed by a user into a prefix-matching tsquery expression.
+    Every word must match and the last characters typed may still be incomplete,
+    so "quick bro" becomes "quick:* & bro:*". Punctuation is dropped, so the
+    result is always valid tsquery syntax.
+    Args:
+        search (str): The raw search text.
+    Returns:
+        str | None: The tsquery expression, or None if the text has no searchable words.
+    """
+    terms = re.findall(r"\w+", search)
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_trigram_search(query: Select, column, search: str, mode: str | None):
+    """
+    Filter a query by `search` in a way the pg_trgm GIN index on `column` can serve.
+    "substring" keeps the ILIKE '%term%' semantics (wildcards in the term are
+    escaped); "fuzzy" matches words similar to the term, which tolerates typos.
+    Args:
+        query (Select): The query to filter.
+        column: The trigram-indexed column to search.
+        search (str): The search text.
+        mode (str | None): "substring" (default) or "fuzzy".
+    Returns:
+        tuple[Select, ColumnElement | None]: The filtered query and, for fuzzy
+        searches, a similarity expression to order the results by.
+    """
+    if mode == "fuzzy":
+        # `term <% column` 以 word_similarity 判定，可以使用 gin_trgm_ops 索引
+        query = query.where(literal(search).op("<%")(column))
+        return query, func.word_similarity(search, column)
+    return query.where(column.ilike(f"%{_escape_like(search)}%", escape="\\")), None
+
+
+def apply_substring_search(query: Select, columns, search: str) -> Select:
+    """Keep rows where any of `columns` contains `search`; served by pg_trgm GIN indexes."""
+    pattern = f"%{_escape_like(search)}%"
+    return query.where(or_(*(column.ilike(pattern, escape="\\") for column in columns)))
@@ -0,0 +1,51 @@
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator
+
+from pydantic import BaseModel
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# 攒够这么多字节再发送，避免每行一次 ASGI send
+NDJSON_CHUNK_SIZE = 64 * 1024
+
+
+async def ndjson_lines(items: AsyncIterable[BaseModel]) -> AsyncIterator[bytes]:
+    """Serialize models one JSON document per line, sent in chunks of about NDJSON_CHUNK_SIZE."""
+    buffer = bytearray()
+    async for item in items:
+        buffer += item.model_dump_json().encode()
+        buffer += b"\n"
+        if len(buffer) >= NDJSON_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Whether an Accept-Encoding header allows a gzip body ("gzip;q=0" refuses it)."""
+    qualities = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    # 明确列出的 gzip 优先于通配符 *
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+async def gzip_chunks(chunks: AsyncIterable[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream into a single gzip member, incrementally."""
+    # wbits=31 让 zlib 输出 gzip 头和尾，而不是裸 deflate 流
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
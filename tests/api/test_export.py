@@ -0,0 +1,33 @@
+import json
+
+from httpx import AsyncClient
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(authorized_client:AsyncClient):
+    tag_id = (await authorized_client.post("/tags", json={"name": "export-tag"})).json()["id"]
+    note_id = (
+        await authorized_client.post("/notes", json={"title": "export", "content": "export content"})
+    ).json()["id"]
+    await authorized_client.post(f"/notes/{note_id}/tags/{tag_id}")
+    await authorized_client.post(f"/todos?note_id={note_id}", json={"content": "export todo"})
+
+    # httpx 默认声明 Accept-Encoding: gzip，并自动解压
+    response = await authorized_client.get("/export")
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    types = [record["type"] for record in records]
+    # 标签先于引用它的笔记和关联记录
+    assert types.index("tag") < types.index("note") < types.index("note_tag")
+    assert {"note_id": note_id, "tag_id": tag_id} in [
+        record["data"] for record in records if record["type"] == "note_tag"
+    ]
+    assert "export todo" in [
+        record["data"]["content"] for record in records if record["type"] == "todo"
+    ]
+
+    response = await authorized_client.get("/export", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert len(response.text.splitlines()) == len(records)
@@ -0,0 +1,124 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import ImportJob, OutboxMessage, Tag, User
+
+from app.repository.import_repo import ImportRepository
+from app.schemas.schemas import UserResponse
+from app.service.import_service import ImportService
+
+
+@pytest.mark.asyncio
+async def test_import_job_loads_notes_tags_and_todos(
+    authorized_client:AsyncClient, db_session:AsyncSession, test_user:UserResponse, mocker
+):
+    lines = [
+        {"title": "imported", "content": "imported content", "tags": ["import-tag"], "todos": [{"content": "imported todo"}]},
+        "not json",
+        # 与第一行内容相同，作为重复笔记跳过
+        {"title": "imported again", "content": "imported content", "todos": [{"content": "skipped todo"}]},
+    ]
+    payload = "".join(
+        (line if isinstance(line, str) else json.dumps(line)) + "\n" for line in lines
+    ).encode()
+    mocker.patch(
+        "app.service.import_service.s3_client.download_fileobj",
+        side_effect=lambda Bucket, Key, Fileobj: Fileobj.write(payload),
+    )
+    mocker.patch("app.service.import_service.s3_client.delete_object")
+
+    repository = ImportRepository(db_session)
+    job = await repository.create_job(
+        object_name="imports/test.ndjson",
+        original_filename="test.ndjson",
+        size=len(payload),
+        current_user=test_user,
+    )
+    await ImportService(repository).run_import(job.id)
+
+    response = await authorized_client.get(f"/imports/{job.id}")
+    assert response.status_code == 200
+    result = response.json()
+    assert result["status"] == "completed"
+    assert result["processed_lines"] == 3
+    assert (result["notes_imported"], result["duplicates"], result["failed_lines"]) == (1, 1, 1)
+    assert result["todos_imported"] == 1
+
+    notes = (await authorized_client.get("/notes?search=imported")).json()
+    assert [note["title"] for note in notes] == ["imported"]
+    assert [tag["name"] for tag in notes[0]["tags"]] == ["import-tag"]
+    assert [todo["content"] for todo in notes[0]["todos"]] == ["imported todo"]
+
+    # 已完成的任务不能再次恢复
+    response = await authorized_client.post(f"/imports/{job.id}/resume")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_resume_stuck_import_job(
+    authorized_client:AsyncClient, db_session:AsyncSession, test_user:UserResponse
+):
+    repository = ImportRepository(db_session)
+    job = await repository.create_job(
+        object_name="imports/stuck.ndjson",
+        original_filename="stuck.ndjson",
+        size=1,
+        current_user=test_user,
+    )
+    # 导入任务与任务记录在同一事务中写入发件箱
+    outbox = await db_session.scalar(
+        select(OutboxMessage).where(OutboxMessage.dedup_id == f"run_import_{job.id}")
+    )
+    assert outbox is not None and outbox.args == [job.id]
+
+    # 仍在推进的任务不能恢复
+    response = await authorized_client.post(f"/imports/{job.id}/resume")
+    assert response.status_code == 400
+
+    await db_session.execute(
+        update(ImportJob)
+        .where(ImportJob.id == job.id)
+        .values(status="running", updated_at=datetime.now(timezone.utc) - timedelta(hours=1))
+    )
+    await db_session.commit()
+    response = await authorized_client.post(f"/imports/{job.id}/resume")
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+
+
+@pytest.mark.asyncio
+async def test_import_tag_named_like_another_users_tag(
+    authorized_client:AsyncClient, db_session:AsyncSession, test_user:UserResponse, mocker
+):
+    # 标签名只在用户内唯一，其他用户的同名标签不影响导入
+    other = User(email="tag-owner@example.com", username="tag-owner", hashed_password="x")
+    db_session.add(other)
+    await db_session.flush()
+    db_session.add(Tag(name="shared-tag", user_id=other.id))
+    await db_session.commit()
+
+    payload = (json.dumps({"title": "t", "content": "shared tag note", "tags": ["shared-tag"]}) + "\n").encode()
+    mocker.patch(
+        "app.service.import_service.s3_client.download_fileobj",
+        side_effect=lambda Bucket, Key, Fileobj: Fileobj.write(payload),
+    )
+    mocker.patch("app.service.import_service.s3_client.delete_object")
+
+    repository = ImportRepository(db_session)
+    job = await repository.create_job(
+        object_name="imports/shared-tag.ndjson",
+        original_filename="shared-tag.ndjson",
+        size=len(payload),
+        current_user=test_user,
+    )
+    await ImportService(repository).run_import(job.id)
+
+    result = (await authorized_client.get(f"/imports/{job.id}")).json()
+    assert result["tags_created"] == 1
+    notes = (await authorized_client.get("/notes?search=shared")).json()
+    assert [tag["name"] for tag in notes[0]["tags"]] == ["shared-tag"]
@@ -43,6 +43,9 @@ async def test_update_note(authorized_client:AsyncClient):
     assert response.status_code == 200
     note = NoteResponse.model_validate(response.json())
     assert note.title == "new"
+    # 更新后的响应仍然包含完整的关联数据
+    assert note.tags == [] and note.todos == []
+    assert note.reminders == [] and note.attachments == []
 
 
 @pytest.mark.asyncio
@@ -136,3 +139,191 @@ async def test_create_note_long_title(authorized_client:AsyncClient):
     long_title = "a" * 256
     response = await authorized_client.post("/notes", json={"title": long_title, "content": "test"})
     assert response.status_code == 422 
+
+
+@pytest.mark.asyncio
+async def test_get_all_notes_with_cursor(authorized_client:AsyncClient):
+    for i in range(3):
+        await authorized_client.post("/notes", json={"title": f"cursor {i}", "content": f"cursor content {i}"})
+    response = await authorized_client.get("/notes?order_by=created_at desc&limit=2")
+    assert response.status_code == 200
+    seen = [note["id"] for note in response.json()]
+    cursor = response.headers.get("X-Next-Cursor")
+    assert cursor is not None
+    # 跟随游标翻完所有页，不应出现重复
+    while cursor:
+        response = await authorized_client.get(f"/notes?limit=2&cursor={cursor}")
+        assert response.status_code == 200
+        seen.extend(note["id"] for note in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+    assert len(seen) == len(set(seen))
+    assert seen == sorted(seen, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_get_all_notes_invalid_cursor(authorized_client:AsyncClient):
+    response = await authorized_client.get("/notes?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_notes_ranked_by_title(authorized_client:AsyncClient):
+    await authorized_client.post("/notes", json={"title": "groceries", "content": "kiwifruit and milk"})
+    await authorized_client.post("/notes", json={"title": "kiwifruit jam", "content": "recipe"})
+    # 前缀匹配，标题命中的笔记排在前面
+    response = await authorized_client.get("/notes?search=kiwi")
+    assert response.status_code == 200
+    notes = response.json()
+    assert [note["title"] for note in notes] == ["kiwifruit jam", "groceries"]
+
+
+@pytest.mark.asyncio
+async def test_search_notes_inside_cjk_text(authorized_client:AsyncClient):
+    await authorized_client.post("/notes", json={"title": "学习笔记", "content": "今天学习了数据库索引的原理"})
+    # 连续的中文不会被分词，句中的词也要能搜到
+    response = await authorized_client.get("/notes?search=数据库")
+    assert response.status_code == 200
+    assert [note["title"] for note in response.json()] == ["学习笔记"]
+
+
+@pytest.mark.asyncio
+async def test_get_note_summary_and_include(authorized_client:AsyncClient):
+    create_resp = await authorized_client.post("/notes", json={"title": "view note", "content": "view content"})
+    note_id = create_resp.json()["id"]
+    response = await authorized_client.get(f"/notes/{note_id}?view=summary")
+    assert response.status_code == 200
+    assert "content" not in response.json()
+    assert "tags" not in response.json()
+    # 只加载请求的关联，其余返回 null
+    response = await authorized_client.get(f"/notes/{note_id}?include=tags")
+    assert response.status_code == 200
+    note = response.json()
+    assert note["tags"] == []
+    assert note["todos"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_all_notes_with_fields(authorized_client:AsyncClient):
+    await authorized_client.post("/notes", json={"title": "fields note", "content": "fields content"})
+    response = await authorized_client.get("/notes?fields=title,updated_at")
+    assert response.status_code == 200
+    for note in response.json():
+        assert set(note) == {"id", "title", "updated_at"}
+    response = await authorized_client.get("/notes?fields=title,bogus")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_duplicate_note_content_conflict(authorized_client:AsyncClient):
+    await authorized_client.post("/notes", json={"title": "a", "content": "same content"})
+    response = await authorized_client.post("/notes", json={"title": "b", "content": "same content"})
+    assert response.status_code == 409
+    # 更新为已存在的内容同样冲突
+    other = await authorized_client.post("/notes", json={"title": "c", "content": "other content"})
+    response = await authorized_client.patch(
+        f"/notes/{other.json()['id']}", json={"content": "same content"}
+    )
+    assert response.status_code == 409
+    # 更新后旧内容的摘要随之释放，新内容的摘要随之占用
+    response = await authorized_client.patch(
+        f"/notes/{other.json()['id']}", json={"content": "renamed content"}
+    )
+    assert response.status_code == 200
+    response = await authorized_client.post("/notes", json={"title": "d", "content": "other content"})
+    assert response.status_code == 201
+    response = await authorized_client.post("/notes", json={"title": "e", "content": "renamed content"})
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_get_note_after_update_not_stale(authorized_client:AsyncClient):
+    create_resp = await authorized_client.post("/notes", json={"title": "cached", "content": "cached v1"})
+    note_id = create_resp.json()["id"]
+    # 两次读取，第二次走缓存
+    for _ in range(2):
+        response = await authorized_client.get(f"/notes/{note_id}")
+        assert response.json()["content"] == "cached v1"
+    await authorized_client.patch(f"/notes/{note_id}", json={"content": "cached v2"})
+    await authorized_client.post(f"/todos?note_id={note_id}", json={"content": "cached todo"})
+    response = await authorized_client.get(f"/notes/{note_id}")
+    assert response.json()["content"] == "cached v2"
+    assert [todo["content"] for todo in response.json()["todos"]] == ["cached todo"]
+    summary = await authorized_client.get(f"/notes/{note_id}?view=summary")
+    assert "content" not in summary.json()
+
+
+@pytest.mark.asyncio
+async def test_get_note_etag_not_modified(authorized_client:AsyncClient):
+    create_resp = await authorized_client.post("/notes", json={"title": "etag", "content": "etag content"})
+    note_id = create_resp.json()["id"]
+    response = await authorized_client.get(f"/notes/{note_id}")
+    etag = response.headers["ETag"]
+    response = await authorized_client.get(f"/notes/{note_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    # 子资源变化后 ETag 随之变化
+    await authorized_client.post(f"/todos?note_id={note_id}", json={"content": "etag todo"})
+    response = await authorized_client.get(f"/notes/{note_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    list_resp = await authorized_client.get("/notes?order_by=created_at desc")
+    response = await authorized_client.get(
+        "/notes?order_by=created_at desc", headers={"If-None-Match": list_resp.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_shared_note_cache_invalidated_on_disable(authorized_client:AsyncClient):
+    create_resp = await authorized_client.post("/notes", json={"title": "shared", "content": "shared content"})
+    note_id = create_resp.json()["id"]
+    share_resp = await authorized_client.post(f"/notes/{note_id}/share")
+    share_code = share_resp.json()["share_code"]
+    response = await authorized_client.get(f"/public/notes/{share_code}")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+    await authorized_client.delete(f"/notes/{note_id}/share")
+    response = await authorized_client.get(f"/public/notes/{share_code}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_notes(authorized_client:AsyncClient):
+    await authorized_client.post("/notes", json={"title": "existing", "content": "bulk existing"})
+    response = await authorized_client.post(
+        "/notes/bulk",
+        json={
+            "items": [
+                {"title": "b1", "content": "bulk one"},
+                {"title": "b2", "content": "bulk existing"},
+                {"title": "b3", "content": "bulk two"},
+                {"title": "b4", "content": "bulk one"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["duplicates"] == 2
+    assert [result["status"] for result in data["results"]] == ["created", "duplicate", "created", "duplicate"]
+    assert data["results"][0]["note"]["title"] == "b1"
+
+
+@pytest.mark.asyncio
+async def test_bulk_tag_notes(authorized_client:AsyncClient):
+    note_ids = [
+        (await authorized_client.post("/notes", json={"title": "bt", "content": f"bulk tag {i}"})).json()["id"]
+        for i in range(3)
+    ]
+    tag_id = (await authorized_client.post("/tags", json={"name": "bulk-tag"})).json()["id"]
+    payload = {"note_ids": note_ids, "tag_ids": [tag_id]}
+    response = await authorized_client.post("/notes/bulk/tags", json=payload)
+    assert response.json() == {"action": "attach", "affected": 3, "notes": 3}
+    # 已存在的关联会被跳过
+    response = await authorized_client.post("/notes/bulk/tags", json=payload)
+    assert response.json()["affected"] == 0
+    response = await authorized_client.get(f"/notes?tag_id={tag_id}")
+    assert len(response.json()) == 3
+    response = await authorized_client.post("/notes/bulk/tags", json={**payload, "action": "detach"})
+    assert response.json() == {"action": "detach", "affected": 3, "notes": 3}
@@ -0,0 +1,110 @@
+from httpx import AsyncClient
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import OutboxMessage, Reminder
+from app.repository.reminder_repo import ReminderRepository
+from app.service.outbox_service import OutboxRelay
+from app.service.reminder_service import ReminderService
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.mark.asyncio
+async def test_create_reminder_writes_outbox(
+    authorized_client: AsyncClient, db_session: AsyncSession, mocker
+):
+    response = await authorized_client.post(
+        "/reminders",
+        json={"reminder_time": "2030-01-01T09:00:00Z", "message": "outbox reminder"},
+    )
+    assert response.status_code == 201
+    reminder_id = response.json()["id"]
+
+    # 提醒本身由调度器触发，发件箱中只有创建通知
+    dedup_ids = {f"notify_reminder_create_{reminder_id}"}
+    rows = (
+        await db_session.scalars(
+            select(OutboxMessage).where(OutboxMessage.dedup_id.in_(dedup_ids))
+        )
+    ).all()
+    assert {row.dedup_id for row in rows} == dedup_ids
+
+    # 投递成功的消息在投递后删除
+    dispatcher = mocker.Mock()
+    dispatcher.publish = mocker.AsyncMock(return_value=[])
+    relay = OutboxRelay(
+        TestingSessionLocal, dispatcher, batch_size=100, retry_delay=1.0, lease=60.0
+    )
+    assert await relay.relay_once() >= 2
+    published = dispatcher.publish.call_args.args[0]
+    assert f"notify_reminder_create_{reminder_id}" in {message.options["task_id"] for message in published}
+    db_session.expunge_all()
+    assert (await db_session.scalars(select(OutboxMessage))).all() == []
+
+
+@pytest.mark.asyncio
+async def test_scheduler_triggers_due_reminders_once(
+    authorized_client: AsyncClient, mocker
+):
+    response = await authorized_client.post(
+        "/reminders",
+        json={"reminder_time": "2020-01-01T09:00:00Z", "message": "due reminder"},
+    )
+    assert response.status_code == 201
+    reminder_id = response.json()["id"]
+    assert response.json()["is_triggered"] is False
+
+    publish = mocker.patch(
+        "app.service.reminder_service.task_dispatcher.publish", return_value=[]
+    )
+    async with TestingSessionLocal() as session:
+        service = ReminderService(ReminderRepository(session))
+        assert await service.trigger_due_reminders(batch_size=100, max_batches=10) >= 1
+        sent = {message.args[0]["reminder_id"] for message in publish.call_args.args[0]}
+        assert reminder_id in sent
+        # 已触发的提醒不会被再次领取
+        publish.reset_mock()
+        assert await service.trigger_due_reminders(batch_size=100, max_batches=10) == 0
+        publish.assert_not_called()
+
+    async with TestingSessionLocal() as session:
+        reminder = await session.get(Reminder, reminder_id)
+        assert reminder.is_triggered is True
+
+
+@pytest.mark.asyncio
+async def test_reschedule_and_delete_reminder(authorized_client: AsyncClient):
+    response = await authorized_client.post(
+        "/reminders",
+        json={"reminder_time": "2030-01-01T09:00:00Z", "message": "rescheduled reminder"},
+    )
+    reminder_id = response.json()["id"]
+    async with TestingSessionLocal() as session:
+        reminder = await session.get(Reminder, reminder_id)
+        reminder.is_triggered = True
+        await session.commit()
+
+    # 修改提醒时间后重新等待调度器触发
+    response = await authorized_client.patch(
+        f"/reminders/{reminder_id}", json={"reminder_time": "2031-01-01T09:00:00Z"}
+    )
+    assert response.status_code == 200
+    assert response.json()["is_triggered"] is False
+
+    # 时间未变的 PATCH 不会让已触发的提醒再次触发
+    async with TestingSessionLocal() as session:
+        reminder = await session.get(Reminder, reminder_id)
+        reminder.is_triggered = True
+        await session.commit()
+    response = await authorized_client.patch(
+        f"/reminders/{reminder_id}",
+        json={"reminder_time": "2031-01-01T09:00:00Z", "message": "same time"},
+    )
+    assert response.status_code == 200
+    assert response.json()["is_triggered"] is True
+
+    response = await authorized_client.delete(f"/reminders/{reminder_id}")
+    assert response.status_code == 204
+    async with TestingSessionLocal() as session:
+        assert await session.get(Reminder, reminder_id) is None
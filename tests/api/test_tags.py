@@ -0,0 +1,24 @@
+from httpx import AsyncClient
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_get_tags_ordered_by_note_count(authorized_client:AsyncClient):
+    popular = (await authorized_client.post("/tags", json={"name": "count-popular"})).json()["id"]
+    unused = (await authorized_client.post("/tags", json={"name": "count-unused"})).json()["id"]
+    for i in range(2):
+        note_id = (
+            await authorized_client.post("/notes", json={"title": "c", "content": f"tag count {i}"})
+        ).json()["id"]
+        await authorized_client.post(f"/notes/{note_id}/tags/{popular}")
+
+    response = await authorized_client.get("/tags?search=count-&order_by=note_count desc")
+    assert response.status_code == 200
+    tags = response.json()
+    assert [(tag["id"], tag["note_count"]) for tag in tags] == [(popular, 2), (unused, 0)]
+
+    response = await authorized_client.get("/tags?search=count-")
+    assert all(tag["note_count"] is None for tag in response.json())
+
+    response = await authorized_client.get(f"/tags/{popular}")
+    assert response.json()["note_count"] == 2
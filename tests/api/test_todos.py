@@ -0,0 +1,92 @@
+import json
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Note
+
+
+@pytest.mark.asyncio
+async def test_bulk_todo_operations(authorized_client:AsyncClient):
+    note_resp = await authorized_client.post("/notes", json={"title": "todo bulk", "content": "todo bulk note"})
+    note_id = note_resp.json()["id"]
+    response = await authorized_client.post(
+        f"/todos/bulk?note_id={note_id}",
+        json={"items": [{"content": "first"}, {"content": "second"}]},
+    )
+    assert response.status_code == 201
+    todos = response.json()
+    assert [todo["content"] for todo in todos] == ["first", "second"]
+    ids = [todo["id"] for todo in todos]
+
+    response = await authorized_client.patch("/todos/bulk", json={"ids": [*ids, 999999]})
+    assert response.status_code == 200
+    assert response.json()["affected"] == 2
+    assert response.json()["results"][-1] == {"id": 999999, "status": "not_found"}
+    response = await authorized_client.get(f"/todos?note_id={note_id}&status=finished")
+    assert len(response.json()) == 2
+
+    response = await authorized_client.post("/todos/bulk/delete", json={"ids": ids})
+    assert response.json()["affected"] == 2
+    response = await authorized_client.get(f"/todos?note_id={note_id}")
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_todos_cursor_pagination_and_stream(authorized_client:AsyncClient):
+    note_resp = await authorized_client.post("/notes", json={"title": "todo pages", "content": "todo pages note"})
+    note_id = note_resp.json()["id"]
+    await authorized_client.post(
+        f"/todos/bulk?note_id={note_id}",
+        json={"items": [{"content": f"page {i}"} for i in range(5)]},
+    )
+    seen = []
+    url = f"/todos?note_id={note_id}&order_by=created_at asc&limit=2"
+    response = await authorized_client.get(url)
+    while True:
+        assert len(response.json()) <= 2
+        seen += [todo["id"] for todo in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = await authorized_client.get(f"{url}&cursor={cursor}")
+    assert len(seen) == len(set(seen)) == 5
+
+    response = await authorized_client.get("/todos?limit=1000")
+    assert response.status_code == 422
+
+    response = await authorized_client.get(f"/todos/stream?note_id={note_id}&fields=content")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["content"] for line in lines] == [f"page {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_create_todo_for_deleted_note(authorized_client:AsyncClient):
+    note_id = (
+        await authorized_client.post("/notes", json={"title": "owner", "content": "owner check"})
+    ).json()["id"]
+    # 第一次校验会缓存笔记所属用户，删除笔记后缓存应失效
+    response = await authorized_client.post(f"/todos?note_id={note_id}", json={"content": "ok"})
+    assert response.status_code == 201
+    await authorized_client.delete(f"/notes/{note_id}")
+    response = await authorized_client.post(f"/todos?note_id={note_id}", json={"content": "gone"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_todo_for_note_deleted_by_another_process(
+    authorized_client:AsyncClient, db_session:AsyncSession
+):
+    note_id = (
+        await authorized_client.post("/notes", json={"title": "owner", "content": "deleted elsewhere"})
+    ).json()["id"]
+    response = await authorized_client.post(f"/todos?note_id={note_id}", json={"content": "ok"})
+    assert response.status_code == 201
+    # 模拟其他进程删除笔记：本进程的所属用户缓存仍然命中，插入时由外键拦截
+    await db_session.execute(delete(Note).where(Note.id == note_id))
+    await db_session.commit()
+    response = await authorized_client.post(f"/todos?note_id={note_id}", json={"content": "gone"})
+    assert response.status_code == 404
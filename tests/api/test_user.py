@@ -1,6 +1,12 @@
 import pytest
 from httpx import AsyncClient
+from fastapi_users.db import SQLAlchemyUserDatabase
+
+from app.core.cache import user_cache
+from app.core.user_manage import UserManager
+from app.models.models import User
 from app.schemas.schemas import UserResponse
+from tests.helper import the_first_user
 
 
 @pytest.mark.filterwarnings("ignore:Accessing argon2.__version__:DeprecationWarning")
@@ -12,3 +18,39 @@ async def test_users_me(authorized_client: AsyncClient, test_user: UserResponse)
     
     assert user_response == test_user
     assert "password_hash" not in response.json()
+
+
+@pytest.mark.asyncio
+async def test_user_manager_caches_users(db_session, test_user: UserResponse, mocker):
+    user_db = SQLAlchemyUserDatabase(db_session, User)
+    manager = UserManager(user_db)
+    user_cache.clear()
+    first = await manager.get(test_user.id)
+    db_get = mocker.spy(user_db, "get")
+    # 命中缓存时不查询数据库，且每次返回独立的实例
+    second = await manager.get(test_user.id)
+    assert db_get.call_count == 0
+    assert second is not first
+    assert second.email == first.email
+
+    await manager.on_after_update(first, {"full_name": "changed"})
+    await manager.get(test_user.id)
+    assert db_get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_jwt_logout_revokes_token(unauthorized_client: AsyncClient, test_user: UserResponse):
+    response = await unauthorized_client.post(
+        "/auth/jwt/login",
+        data={"username": test_user.email, "password": the_first_user["password"]},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = await unauthorized_client.get("/users/me", headers=headers)
+    assert response.status_code == 200
+
+    response = await unauthorized_client.post("/auth/jwt/logout", headers=headers)
+    assert response.status_code == 204
+    response = await unauthorized_client.get("/users/me", headers=headers)
+    assert response.status_code == 401
@@ -8,7 +8,7 @@ from sqlalchemy.pool import NullPool
 
 from app.main import app
 from app.models.models import Base
-from app.core.database import get_db
+from app.core.database import get_db, get_session_factory
 from app.core.security import get_current_user
 from app.repository.user_repo import UserRepository
 from app.schemas.schemas import UserCreate, UserResponse
@@ -67,6 +67,7 @@ async def test_user(db_session: AsyncSession):
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     # 设置依赖项覆盖
     app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
 
     async with AsyncClient(
         transport=ASGITransport(app=app),